@@ -0,0 +1,119 @@
+"""
+events.py — Server-sent events push channel for task progress.
+
+Scraper threads never write to a client. They append to the task as
+before and call ``notify``, which only flags each subscriber's stream as
+dirty. Each stream then sends everything past its own cursors into the
+task's append-only ``progress``/``results`` lists. A slow client just
+has more to send next time, with every update since its last send
+coalesced into one round, and the scraper is never blocked by it.
+"""
+
+import asyncio
+import json
+import threading
+from typing import AsyncIterator
+
+from .models import ScrapeStatus
+
+TERMINAL = ("completed", "failed", "cancelled")
+# Pause after a wake-up so bursts of appends go out as one round
+COALESCE_WINDOW = 0.1
+# Comment line sent when idle, so proxies keep the connection open
+HEARTBEAT = 15.0
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.dirty = asyncio.Event()
+
+    def wake(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.dirty.set)
+        except RuntimeError:
+            pass  # loop already closed; the stream is going away
+
+
+class TaskEvents:
+    """Per-task subscriber registry; ``notify`` is safe to call from any thread."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[_Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    def notify(self, task_id: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(task_id, ()))
+        for subscriber in subscribers:
+            subscriber.wake()
+
+    def subscribers(self, task_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(task_id, ()))
+
+    async def stream(
+        self, task: ScrapeStatus, progress_since: int = 0, results_since: int = 0
+    ) -> AsyncIterator[str]:
+        """
+        SSE frames for *task*: ``progress`` (new lines), ``result`` (one per
+        post) and ``status`` events, ending after the terminal status.
+        Event ids are ``<progress cursor>-<results cursor>`` so a reconnect
+        can resume via ``Last-Event-ID``.
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(task.task_id, set()).add(subscriber)
+        sent_status = None
+        try:
+            while True:
+                # Cleared before reading, so an append during the send wakes us again
+                subscriber.dirty.clear()
+                status, error = task.status, task.error
+                progress = task.progress
+                results = task.results or []
+                progress_end, results_end = len(progress), len(results)
+
+                if progress_end > progress_since:
+                    lines = progress[progress_since:progress_end]
+                    progress_since = progress_end
+                    yield _frame("progress", {"lines": lines}, progress_since, results_since)
+                for result in results[results_since:results_end]:
+                    results_since += 1
+                    yield _frame("result", result.model_dump(), progress_since, results_since)
+                if status != sent_status:
+                    sent_status = status
+                    yield _frame("status", {"status": status, "error": error}, progress_since, results_since)
+                if status in TERMINAL:
+                    return
+
+                try:
+                    await asyncio.wait_for(subscriber.dirty.wait(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                await asyncio.sleep(COALESCE_WINDOW)
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(task.task_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[task.task_id]
+
+
+def parse_event_id(last_event_id: str | None) -> tuple[int, int] | None:
+    """Cursors from a ``Last-Event-ID`` header, or None if absent/garbled."""
+    try:
+        progress, results = (last_event_id or "").split("-")
+        return max(0, int(progress)), max(0, int(results))
+    except ValueError:
+        return None
+
+
+def _frame(event: str, data: dict, progress_cursor: int, results_cursor: int) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"id: {progress_cursor}-{results_cursor}\nevent: {event}\ndata: {payload}\n\n"
+
+
+events = TaskEvents()
@@ -0,0 +1,99 @@
+"""
+export.py — Streaming CSV / NDJSON export of task results or the stored archive.
+
+Rows are produced lazily and written out in chunks of roughly
+``CHUNK_SIZE`` bytes, optionally gzip-compressed on the fly, so memory
+use doesn't grow with the size of the export.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from linkedin_scraper.storage import Storage
+
+from .models import ScrapeResult, ScrapeStatus
+
+FORMATS = ("csv", "ndjson")
+CHUNK_SIZE = 64 * 1024
+CSV_HEADER = ["Post URL", "Comment", "Label", "Author Name", "User Profile URL"]
+
+
+def task_comments(
+    status: ScrapeStatus, labels: list[str] | None = None, post_urls: list[str] | None = None
+) -> Iterator[tuple[str, dict]]:
+    """``(post_url, comment)`` pairs from a task's results, stored as models or plain dicts."""
+    wanted = set(post_urls) if post_urls is not None else None
+    for result in status.results or []:
+        if isinstance(result, ScrapeResult):
+            post_url, comments = result.post_url, result.comments
+        elif isinstance(result, dict):
+            post_url, comments = result.get("post_url", ""), result.get("comments") or []
+        else:
+            continue
+        if wanted is not None and post_url not in wanted:
+            continue
+        yield from _with_label(post_url, comments, labels)
+
+
+def archive_comments(
+    storage: Storage, labels: list[str] | None = None, post_urls: list[str] | None = None
+) -> Iterator[tuple[str, dict]]:
+    """``(post_url, comment)`` pairs from persistent storage, one post decoded at a time."""
+    for post_url, comments in storage.iter_posts(post_urls):
+        yield from _with_label(post_url, comments, labels)
+
+
+def encode(rows: Iterable[tuple[str, dict]], fmt: str = "csv", compress: bool = False) -> Iterator[bytes]:
+    """Serialise rows as CSV or NDJSON in ~``CHUNK_SIZE`` byte chunks, gzipped if asked."""
+    chunks = _csv_chunks(rows) if fmt == "csv" else _ndjson_chunks(rows)
+    return _gzip(chunks) if compress else chunks
+
+
+def _with_label(post_url: str, comments: list[dict], labels: list[str] | None) -> Iterator[tuple[str, dict]]:
+    for comment in comments:
+        if labels is None or comment.get("label") in labels:
+            yield post_url, comment
+
+
+def _csv_chunks(rows: Iterable[tuple[str, dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for post_url, comment in rows:
+        writer.writerow([
+            post_url,
+            comment.get("comment", ""),
+            comment.get("label", ""),
+            comment.get("author_name", "Unknown"),
+            comment.get("user_profile_url", ""),
+        ])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(rows: Iterable[tuple[str, dict]]) -> Iterator[bytes]:
+    lines, size = [], 0
+    for post_url, comment in rows:
+        line = json.dumps({**comment, "post_url": post_url}, ensure_ascii=False, default=str) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines).encode("utf-8")
+            lines, size = [], 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
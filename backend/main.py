@@ -1,12 +1,30 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Query, Request, Response
+from typing import List, Optional, Union
 from fastapi.middleware.cors import CORSMiddleware
-from .models import ScrapeRequest, ScrapeStatus, ScrapeResult
-from .service import run_scraper_task, get_task_status, tasks, start_scraping, load_existing_comments, start_youtube_scraping, start_instagram_scraping
-import csv
-import io
+from .models import ScrapeRequest, ScrapeStatus, StatusDelta, CommentPage
+from .service import run_scraper_task, get_task_status, get_task_delta, tasks, start_scraping, cancel_task, existing_comments_etag, existing_comments_json, get_snapshot, get_comment_index, query_comments, get_stats, get_driver_pool, warm_driver_pool, close_driver_pool, start_youtube_scraping, start_instagram_scraping
+from .events import events, parse_event_id
+from .scheduler import scheduler, QueueFull
+from . import export
+from linkedin_scraper.storage_writer import get_writer
 from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
+import threading
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the /stats aggregates in the background so the first request is instant
+    threading.Thread(target=get_stats, name="stats-warmup", daemon=True).start()
+    # Log a browser in ahead of the first LinkedIn task
+    warm_driver_pool()
+    yield
+    # Let running scrapes finish (up to SCRAPE_DRAIN_TIMEOUT); queued ones are cancelled
+    await asyncio.to_thread(scheduler.drain)
+    tasks.flush()
+    close_driver_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -22,7 +40,7 @@ async def scrape(request: ScrapeRequest):
     if not request.urls:
         raise HTTPException(status_code=400, detail="No URLs provided")
     
-    task_id = start_scraping(request.urls, request.days)
+    task_id = submit(start_scraping, request.urls, request.days, request.priority)
     return tasks[task_id]
 
 @app.post("/scrape/youtube", response_model=ScrapeStatus)
@@ -31,7 +49,7 @@ async def scrape_youtube(request: ScrapeRequest):
         raise HTTPException(status_code=400, detail="No channel URL provided")
         
     # Take the first URL as the channel
-    task_id = start_youtube_scraping(request.urls[0], request.days)
+    task_id = submit(start_youtube_scraping, request.urls[0], request.days, request.priority)
     return tasks[task_id]
 
 @app.post("/scrape/instagram", response_model=ScrapeStatus)
@@ -42,53 +60,164 @@ async def scrape_instagram(request: ScrapeRequest):
     # Take the first URL/String as the username
     # Naive cleanup if full URL is passed
     username = request.urls[0].replace("https://www.instagram.com/", "").strip("/")
-    task_id = start_instagram_scraping(username, request.days)
+    task_id = submit(start_instagram_scraping, username, request.days, request.priority)
     return tasks[task_id]
 
+def submit(start, target, days: int, priority: int) -> str:
+    # Jobs wait in the scheduler's per-platform queue; a full queue is back-pressure, not an error
+    try:
+        return start(target, days, priority=priority)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.post("/tasks/{task_id}/cancel", response_model=ScrapeStatus)
+async def cancel(task_id: str):
+    # Queued tasks are cancelled at once; running ones stop at their next progress step
+    task = get_task_status(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not cancel_task(task_id):
+        raise HTTPException(status_code=409, detail=f"Task already {task.status}")
+    return task
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    # Per-platform limits, running and queued job counts; tasks held in memory vs on disk; browsers
+    return {**scheduler.stats(), "task_store": tasks.stats(), "driver_pool": get_driver_pool().stats()}
+
 @app.get("/load-existing", response_model=ScrapeStatus)
-async def load_existing():
-    status = load_existing_comments()
-    if not status:
+def load_existing(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    post_url: Optional[List[str]] = Query(None),
+):
+    # Without limit/post_url this returns every post, as before
+    etag = existing_comments_etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = existing_comments_json(offset, limit, post_url)
+    if body is None:
         raise HTTPException(status_code=404, detail="No existing data found")
-    return status
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+@app.get("/comments", response_model=CommentPage)
+def list_comments(
+    platform: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    post_url: Optional[List[str]] = Query(None),
+    author: Optional[List[str]] = Query(None),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    sort: str = Query("scraped_at", pattern="^(scraped_at|engagement)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    # Keyset-paginated; served from in-memory indexes over the stored archive
+    try:
+        items, next_cursor = query_comments(
+            label=label, post_url=post_url, author=author, platform=platform,
+            since=since, until=until, sort=sort, descending=order == "desc",
+            limit=limit, cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CommentPage(items=items, next_cursor=next_cursor)
+
+@app.get("/stats")
+def stats(post_url: Optional[str] = None, author: Optional[str] = None):
+    # Running aggregates, kept current from new writes rather than recomputed
+    aggregates = get_stats()
+    if post_url is not None or author is not None:
+        found = aggregates.post(post_url) if post_url is not None else aggregates.author(author)
+        if found is None:
+            raise HTTPException(status_code=404, detail="No comments found")
+        return found
+    return aggregates.summary()
 
-@app.get("/status/{task_id}", response_model=ScrapeStatus)
-async def get_status(task_id: str):
+@app.get("/status/{task_id}", response_model=Union[ScrapeStatus, StatusDelta])
+async def get_status(
+    task_id: str,
+    progress_since: Optional[int] = Query(None, ge=0),
+    results_since: Optional[int] = Query(None, ge=0),
+):
+    if progress_since is not None or results_since is not None:
+        # Only progress lines and results after the client's cursors
+        delta = get_task_delta(task_id, progress_since or 0, results_since or 0)
+        if not delta:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return delta
     status = get_task_status(task_id)
     if not status:
         raise HTTPException(status_code=404, detail="Task not found")
     return status
 
+@app.get("/tasks/{task_id}/events")
+async def task_events(
+    task_id: str,
+    request: Request,
+    progress_since: int = Query(0, ge=0),
+    results_since: int = Query(0, ge=0),
+):
+    # Server-sent events: progress lines, per-post results and status changes
+    task = get_task_status(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    resume = parse_event_id(request.headers.get("last-event-id"))
+    if resume:
+        progress_since, results_since = resume
+    return StreamingResponse(
+        events.stream(task, progress_since, results_since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/storage/metrics")
+async def storage_metrics():
+    # Group-commit batch sizes and write latencies of the shared storage writer
+    return get_writer().stats()
+
+@app.get("/storage/snapshot")
+async def storage_snapshot():
+    # Cache behind /load-existing and /comments: version, size, rebuilds vs incremental refreshes
+    return {**get_snapshot().stats(), "comment_index": get_comment_index().stats()}
+
+# Export ids that stream from persistent storage rather than a task in memory
+ARCHIVE_EXPORTS = ("archive", "existing_data")
+
 @app.get("/export/{task_id}")
-async def export_csv(task_id: str):
-    status = get_task_status(task_id)
-    if not status or status.status != "completed" or not status.results:
-        raise HTTPException(status_code=404, detail="Task not ready or not found")
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Post URL", "Comment", "Label", "Author Name", "User Profile URL"])
-
-    for result in status.results:
-        if isinstance(result, ScrapeResult): # Validate type for safety
-             for comment in result.comments:
-                writer.writerow([
-                    result.post_url,
-                    comment.get("comment", ""),
-                    comment.get("label", ""),
-                    comment.get("author_name", "Unknown"),
-                    comment.get("user_profile_url", "")
-                ])
-        elif isinstance(result, dict):
-             # Handle if it was stored as dict
-             pass 
-
-    output.seek(0)
+def export_comments(
+    task_id: str,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    label: Optional[List[str]] = Query(None),
+    post_url: Optional[List[str]] = Query(None),
+):
+    if task_id in ARCHIVE_EXPORTS:
+        rows = export.archive_comments(get_writer().storage, label, post_url)
+    else:
+        status = get_task_status(task_id)
+        if not status or status.status != "completed" or not status.results:
+            raise HTTPException(status_code=404, detail="Task not ready or not found")
+        rows = export.task_comments(status, label, post_url)
+
+    filename = f"comments_{task_id}.{fmt}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if fmt == "csv" else "application/x-ndjson")
+    # Generated chunk by chunk while the response is sent
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=comments_{task_id}.csv"}
+        export.encode(rows, fmt, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 @app.get("/")
@@ -4,6 +4,7 @@ from typing import List, Optional
 class ScrapeRequest(BaseModel):
     urls: List[str]
     days: int = 30
+    priority: int = 0  # higher starts first when jobs are queued
 
 class ScrapeResult(BaseModel):
     post_url: str
@@ -12,7 +13,28 @@ class ScrapeResult(BaseModel):
 
 class ScrapeStatus(BaseModel):
     task_id: str
-    status: str  # "pending", "processing", "completed", "failed"
+    status: str  # "pending", "queued", "processing", "completed", "failed", "cancelled"
     progress: List[str] = []
     error: Optional[str] = None
     results: Optional[List[ScrapeResult]] = None
+    total_results: Optional[int] = None  # posts available when results is one page
+    platform: Optional[str] = None
+    priority: int = 0
+    queue_position: Optional[int] = None  # 1 = next to start on its platform
+    queued_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+class StatusDelta(BaseModel):
+    """What changed on a task since the client's cursors (see /status?progress_since=&results_since=)."""
+    task_id: str
+    status: str
+    error: Optional[str] = None
+    progress: List[str] = []
+    results: List[ScrapeResult] = []
+    progress_cursor: int  # pass back as progress_since
+    results_cursor: int   # pass back as results_since
+
+class CommentPage(BaseModel):
+    items: List[dict]
+    next_cursor: Optional[str] = None  # pass back as cursor for the next page
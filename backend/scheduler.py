@@ -0,0 +1,267 @@
+"""
+scheduler.py — Bounded scheduler for scrape jobs.
+
+Every platform gets a fixed number of slots, because each running job
+holds a browser or an API session and a set of classifier workers.
+Jobs beyond that wait in a per-platform queue. The queue is ordered by
+priority, and jobs of equal priority run in the order they arrived.
+Cancelling a queued job removes it from the queue straight away. A
+running job is asked to stop, and stops at its next progress report
+(``checkpoint``). On shutdown, ``drain`` stops new jobs from starting,
+cancels the queued ones and waits for the running ones to finish.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from linkedin_scraper.utils import logger
+
+from .events import TERMINAL, events
+from .models import ScrapeStatus
+
+# Jobs of one platform allowed to run at the same time
+PLATFORM_LIMITS = {
+    "linkedin": int(os.environ.get("SCRAPE_MAX_LINKEDIN", "1")),
+    "youtube": int(os.environ.get("SCRAPE_MAX_YOUTUBE", "2")),
+    "instagram": int(os.environ.get("SCRAPE_MAX_INSTAGRAM", "1")),
+}
+# Jobs of one platform allowed to wait; more are rejected
+MAX_QUEUED = int(os.environ.get("SCRAPE_MAX_QUEUED", "20"))
+# Seconds shutdown waits for running jobs before asking them to stop
+DRAIN_TIMEOUT = float(os.environ.get("SCRAPE_DRAIN_TIMEOUT", "30"))
+
+
+class QueueFull(Exception):
+    """The platform's queue is at ``MAX_QUEUED``."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+@dataclass
+class _Job:
+    task: ScrapeStatus
+    platform: str
+    run: Callable[..., None]
+    args: tuple
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    thread: threading.Thread | None = None
+
+
+class JobScheduler:
+    """Per-platform slots and priority queues; safe to call from any thread."""
+
+    def __init__(self, limits: dict[str, int] | None = None, max_queued: int = MAX_QUEUED) -> None:
+        self.limits = {platform: max(1, limit) for platform, limit in (limits or PLATFORM_LIMITS).items()}
+        self.max_queued = max_queued
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+        self._queues: dict[str, list[tuple[int, int, _Job]]] = {platform: [] for platform in self.limits}
+        self._running: dict[str, dict[str, _Job]] = {platform: {} for platform in self.limits}
+        self._seq = itertools.count()
+        self._accepting = True
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, task: ScrapeStatus, platform: str, run: Callable[..., None], *args,
+               priority: int = 0) -> None:
+        """
+        Queue ``run(*args)`` for *task*. Higher *priority* runs first, and
+        equal priorities run in submission order. Raises ``QueueFull``, or
+        ``RuntimeError`` while draining.
+        """
+        if platform not in self.limits:
+            raise ValueError(f"Unknown platform '{platform}'")
+        with self._lock:
+            if not self._accepting:
+                raise RuntimeError("Scheduler is shutting down")
+            queue = self._queues[platform]
+            if len(queue) >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull(f"Too many queued {platform} jobs ({len(queue)})")
+            task.platform = platform
+            task.priority = priority
+            task.queued_at = datetime.now().isoformat()
+            task.status = "queued"
+            heapq.heappush(queue, (-priority, next(self._seq), _Job(task, platform, run, args)))
+            self._dispatch(platform)
+            self._number(platform)
+            if task.queue_position is not None:
+                running = len(self._running[platform])
+                task.progress.append(f"Queued: {running} {platform} job(s) running, position {task.queue_position}.")
+        events.notify(task.task_id)
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Cancel a queued or running job. Returns False if the scheduler
+        doesn't hold it (unknown or already finished).
+        """
+        with self._lock:
+            job = self._dequeue(task_id)
+            if job is None:
+                job = self._find(task_id)
+                if job is None:
+                    return False
+                job.cancelled.set()
+                return True
+            self.cancelled += 1
+        _finish(job.task, "cancelled", "Cancelled before it started.")
+        return True
+
+    def checkpoint(self, task_id: str) -> None:
+        """
+        Raise ``JobCancelled`` if this is the job's own thread and the job
+        was cancelled. Calls from any other thread return without effect.
+        """
+        job = self._find(task_id)
+        if job is not None and job.cancelled.is_set() and threading.current_thread() is job.thread:
+            raise JobCancelled(task_id)
+
+    def cancel_event(self, task_id: str) -> threading.Event | None:
+        """
+        The running job's cancel flag, for threads working for the job that
+        can't ``checkpoint`` (e.g. post workers). None if it isn't running.
+        """
+        with self._lock:
+            job = self._find(task_id)
+        return None if job is None else job.cancelled
+
+    def drain(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """
+        Start nothing new, cancel queued jobs and wait up to *timeout* for
+        running jobs. Jobs still running after that are asked to stop.
+        """
+        with self._lock:
+            self._accepting = False
+            dropped = [job for queue in self._queues.values() for _, _, job in queue]
+            for queue in self._queues.values():
+                queue.clear()
+            self.cancelled += len(dropped)
+        for job in dropped:
+            _finish(job.task, "cancelled", "Cancelled: server shutting down.")
+
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            if self._active():
+                logger.info(f"⏳ Waiting up to {timeout:.0f}s for {self._active()} running job(s)...")
+            while self._active() and time.monotonic() < deadline:
+                self._idle.wait(deadline - time.monotonic())
+            leftover = [job for running in self._running.values() for job in running.values()]
+        for job in leftover:
+            job.cancelled.set()
+        if leftover:
+            logger.warning(f"⚠️ {len(leftover)} job(s) still running at shutdown; asked them to stop")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "platforms": {
+                    platform: {
+                        "limit": limit,
+                        "running": len(self._running[platform]),
+                        "queued": len(self._queues[platform]),
+                    }
+                    for platform, limit in self.limits.items()
+                },
+                "max_queued": self.max_queued,
+                "started": self.started,
+                "finished": self.finished,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "accepting": self._accepting,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _find(self, task_id: str) -> _Job | None:
+        for running in self._running.values():
+            job = running.get(task_id)
+            if job is not None:
+                return job
+        return None
+
+    def _dequeue(self, task_id: str) -> _Job | None:
+        """Remove a queued job (lock held)."""
+        for platform, queue in self._queues.items():
+            for i, (_, _, job) in enumerate(queue):
+                if job.task.task_id == task_id:
+                    queue[i] = queue[-1]
+                    queue.pop()
+                    heapq.heapify(queue)
+                    self._number(platform)
+                    return job
+        return None
+
+    def _active(self) -> int:
+        return sum(len(running) for running in self._running.values())
+
+    def _dispatch(self, platform: str) -> None:
+        """Start queued jobs while the platform has free slots (lock held)."""
+        queue, running = self._queues[platform], self._running[platform]
+        while self._accepting and queue and len(running) < self.limits[platform]:
+            _, _, job = heapq.heappop(queue)
+            job.task.queue_position = None
+            job.task.started_at = datetime.now().isoformat()
+            job.thread = threading.Thread(
+                target=self._run, args=(job,), name=f"scrape-{platform}-{job.task.task_id[:8]}", daemon=True
+            )
+            running[job.task.task_id] = job
+            self.started += 1
+            job.thread.start()
+
+    def _number(self, platform: str) -> None:
+        """Refresh ``queue_position`` (1 = next to start) of the platform's queued tasks."""
+        for position, (_, _, job) in enumerate(sorted(self._queues[platform]), 1):
+            job.task.queue_position = position
+
+    def _run(self, job: _Job) -> None:
+        try:
+            job.run(*job.args)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            # The task functions record their own failures; this is a backstop
+            logger.exception(f"Job {job.task.task_id} crashed: {e}")
+            if job.task.status not in TERMINAL:
+                job.task.error = str(e)
+                _finish(job.task, "failed", f"Error: {e}")
+        finally:
+            if job.task.finished_at is None:
+                job.task.finished_at = datetime.now().isoformat()
+            if job.cancelled.is_set() and job.task.status not in TERMINAL:
+                _finish(job.task, "cancelled", "Cancelled.")
+            with self._lock:
+                del self._running[job.platform][job.task.task_id]
+                self.finished += 1
+                if job.cancelled.is_set():
+                    self.cancelled += 1
+                self._dispatch(job.platform)
+                self._number(job.platform)
+                self._idle.notify_all()
+
+
+def _finish(task: ScrapeStatus, status: str, message: str) -> None:
+    task.progress.append(message)
+    task.finished_at = datetime.now().isoformat()
+    task.queue_position = None
+    task.status = status  # last, so pollers that stop on it have every line
+    events.notify(task.task_id)
+
+
+scheduler = JobScheduler()
@@ -1,46 +1,116 @@
+import os
 import threading
 import uuid
-import time
-from typing import Dict
-from linkedin_scraper.main import init_driver
-from linkedin_scraper.post_scraper import PostScraper
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from linkedin_scraper.driver_pool import DriverPool
+from linkedin_scraper.parallel_scraper import DEFAULT_WORKERS, ParallelPostScraper
 from linkedin_scraper.feed_scraper import FeedScraper
 from linkedin_scraper.classifier import CommentClassifier
-from linkedin_scraper.storage import Storage
-from linkedin_scraper.auth import LinkedInAuth
+from linkedin_scraper.pipeline import ScrapePipeline
+from linkedin_scraper.snapshot import PostSnapshot
+from linkedin_scraper.comment_index import CommentIndex
+from linkedin_scraper.stats import CommentStats
+from linkedin_scraper.storage_writer import get_writer
+from linkedin_scraper.auth import DEFAULT_COOKIE_PATH
 from linkedin_scraper.utils import logger
-from .models import ScrapeStatus, ScrapeResult
+from .models import ScrapeStatus, ScrapeResult, StatusDelta
+from .events import TERMINAL, events
+from .scheduler import JobCancelled, scheduler
+from .task_store import TaskStore
 from youtube_scraper.main import scrape_channel
 from instagram_scraper.main import scrape_instagram_profile
 
-# In-memory storage for task status (replace with proper DB in production)
-tasks: Dict[str, ScrapeStatus] = {}
+# Task status: running tasks in memory, finished ones spilled to disk (see task_store.py)
+tasks = TaskStore()
+
+def report(task: ScrapeStatus, message: str) -> None:
+    """
+    Append a progress line and wake any event streams following the task.
+    On the job's own thread this is also where a cancelled job stops.
+    """
+    task.progress.append(message)
+    events.notify(task.task_id)
+    scheduler.checkpoint(task.task_id)
+
+def publish(task: ScrapeStatus, item, kind: str = "post") -> None:
+    """Append a stored post's result, so pollers and event streams get it straight away."""
+    task.results.append(ScrapeResult(
+        post_url=item.post_url,
+        comment_count=len(item.comments),
+        comments=item.comments
+    ))
+    report(task, f"Finished {kind} {item.seq}")
+
+def set_status(task: ScrapeStatus, status: str) -> None:
+    if status in TERMINAL and task.finished_at is None:
+        # Set before the save below, which is the last write of the task
+        task.finished_at = datetime.now().isoformat()
+    task.status = status
+    events.notify(task.task_id)
+    if status in TERMINAL:
+        # Written out on the worker thread, so requests never pay for it
+        tasks.save(task)
+
+_driver_pool: DriverPool | None = None
+_driver_pool_lock = threading.Lock()
+
+def get_driver_pool() -> DriverPool:
+    """Browsers for LinkedIn tasks: one per post worker of every LinkedIn job slot, unless DRIVER_POOL_SIZE says otherwise."""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            size = int(os.environ.get("DRIVER_POOL_SIZE", scheduler.limits["linkedin"] * DEFAULT_WORKERS))
+            _driver_pool = DriverPool(size=size)
+        return _driver_pool
+
+def warm_driver_pool() -> None:
+    # Only with a saved session: a first login needs someone at the browser
+    if int(os.environ.get("DRIVER_POOL_WARM", "1")) and Path(DEFAULT_COOKIE_PATH).exists():
+        # One per job slot; the pool starts the extra post workers' browsers when a scrape fans out
+        get_driver_pool().warm(scheduler.limits["linkedin"])
+
+def close_driver_pool() -> None:
+    if _driver_pool is not None:
+        _driver_pool.close()
+
+def schedule(platform: str, run, *args, priority: int = 0) -> str:
+    """Register a task and queue ``run(task_id, *args)`` on the job scheduler."""
+    task_id = str(uuid.uuid4())
+    # results only ever grows by append, so results_cursor stays valid for the whole task
+    tasks.add(ScrapeStatus(task_id=task_id, status="pending", results=[]))
+    try:
+        scheduler.submit(tasks[task_id], platform, run, task_id, *args, priority=priority)
+    except Exception:
+        del tasks[task_id]
+        raise
+    return task_id
+
+def cancel_task(task_id: str) -> bool:
+    return scheduler.cancel(task_id)
 
 def run_scraper_task(task_id: str, urls: list[str], days: int = 30):
     task = tasks[task_id]
-    task.status = "processing"
-    task.progress.append(f"Initializing driver (Days limit: {days})...")
+    set_status(task, "processing")
+    report(task, f"Initializing driver (Days limit: {days})...")
     
+    pool = get_driver_pool()
     driver = None
     try:
-        driver = init_driver(headless=False) # Or True if configured
-        
-        # Auth
-        task.progress.append("Authenticating...")
-        auth = LinkedInAuth(driver)
-        if not auth.authenticate():
-            raise Exception("Authentication failed")
+        # A warm, already logged-in browser when one is free
+        driver = pool.checkout()
+        report(task, "Browser ready.")
             
-        post_scraper = PostScraper(driver)
         # We can reuse the existing storage logic or build results in memory.
         # For now, let's build results in memory to return to frontend, 
-        # but also use the existing Storage to persist to JSON as a backup/cache.
-        storage = Storage() 
-        task.results = [] # Initialize results list
+        # but also persist through the shared storage writer as a backup/cache.
+        writer = get_writer()
 
         classifier = CommentClassifier()
+        classifier.seed_clusters(writer.storage.iter_comments())  # reads the archive on the first task only
         if not classifier.client:
-             task.progress.append("Warning: Classifier not initialized (check API key).")
+             report(task, "Warning: Classifier not initialized (check API key).")
 
         # Expand feed URLs
         feed_scraper = FeedScraper(driver, max_days=days)
@@ -48,15 +118,15 @@ def run_scraper_task(task_id: str, urls: list[str], days: int = 30):
         
         for url in urls:
             if "linkedin.com/school/" in url or "linkedin.com/company/" in url or "linkedin.com/in/" in url:
-                task.progress.append(f"Scraping feed: {url}")
+                report(task, f"Scraping feed: {url}")
                 try:
                     posts = feed_scraper.scrape_feed(url)
                     found_urls = [p["post_url"] for p in posts]
-                    task.progress.append(f"Found {len(found_urls)} posts.")
+                    report(task, f"Found {len(found_urls)} posts.")
                     final_urls.extend(found_urls)
                 except Exception as e:
                      logger.error(f"Error scraping feed {url}: {e}")
-                     task.progress.append(f"Error scraping feed: {e}")
+                     report(task, f"Error scraping feed: {e}")
             else:
                 final_urls.append(url)
         
@@ -65,187 +135,264 @@ def run_scraper_task(task_id: str, urls: list[str], days: int = 30):
         total_urls = len(final_urls)
         
         if total_urls == 0:
-            task.progress.append("No posts found to scrape.")
-            task.status = "completed"
+            report(task, "No posts found to scrape.")
+            set_status(task, "completed")
             return
 
-        for i, url in enumerate(final_urls, 1):
-            task.progress.append(f"Scraping post {i}/{total_urls}: {url}")
-            comments = post_scraper.scrape_post(url)
-            
-            # Classification
-            if comments and classifier.client:
-                task.progress.append(f"Classifying {len(comments)} comments...")
-                for comment in comments:
-                    text = comment.get("comment", "")
-                    if text:
-                        comment["label"] = classifier.classify(text)
-                    else:
-                        comment["label"] = "safe"
-
-            # Save to local JSON storage
-            storage.add_comments(comments)
-            storage.save()
-
-            # Append result incrementally for frontend polling
-            task.results.append(ScrapeResult(
-                post_url=url,
-                comment_count=len(comments),
-                comments=comments
-            ))
-            
-            task.progress.append(f"Finished post {i}")
-            time.sleep(2) # rate limit buffer
+        # Posts are scraped by several browsers at once, paced by the shared page budget
+        # on_start runs on worker threads, where report() can't stop the job: hand them the cancel flag
+        post_scraper = ParallelPostScraper(
+            driver, pool, on_start=lambda i, url: report(task, f"Scraping post {i}/{total_urls}: {url}"),
+            cancelled=scheduler.cancel_event(task_id),
+        )
+
+        # Scraping, classification and saving run as overlapping stages
+        with ScrapePipeline(classifier, writer, on_result=lambda item: publish(task, item),
+                            on_progress=lambda message: report(task, message)) as pipeline, \
+                closing(post_scraper.scrape(final_urls)) as scraped:
+            for i, url, comments in scraped:
+                scheduler.checkpoint(task_id)
+                if comments:
+                    report(task, f"Queued {len(comments)} comments for classification...")
+                pipeline.submit(url, comments)
 
-        task.status = "completed"
-        task.progress.append("All tasks completed successfully.")
+        report(task, "All tasks completed successfully.")
+        set_status(task, "completed")  # last, so pollers that stop on it have every line
 
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.exception(f"Task failed: {e}")
-        task.status = "failed"
         task.error = str(e)
-        task.progress.append(f"Error: {str(e)}")
+        report(task, f"Error: {str(e)}")
+        set_status(task, "failed")
     finally:
         if driver:
-            driver.quit()
+            pool.release(driver)
 
-def start_scraping(urls: list[str], days: int = 30) -> str:
-    task_id = str(uuid.uuid4())
-    tasks[task_id] = ScrapeStatus(task_id=task_id, status="pending")
-    
-    thread = threading.Thread(target=run_scraper_task, args=(task_id, urls, days))
-    thread.daemon = True
-    thread.start()
-    
-    return task_id
+def start_scraping(urls: list[str], days: int = 30, priority: int = 0) -> str:
+    return schedule("linkedin", run_scraper_task, urls, days, priority=priority)
 
 def run_youtube_task(task_id: str, channel_url: str, days: int = 30):
     task = tasks[task_id]
-    task.status = "processing"
+    set_status(task, "processing")
     
     def progress_callback(msg):
-        task.progress.append(msg)
+        report(task, msg)
         
     try:
-        results = scrape_channel(channel_url, days, callback=progress_callback)
-        
-        final_results = []
-        for vid in results:
-             # Transform comments if necessary? logic in scrape_channel returns dicts.
-             # but we need to match ScrapeResult expectations if we use it.
-             # ScrapeResult.comments is List[dict].
-             final_results.append(ScrapeResult(
-                 post_url=vid.get('post_url'),
-                 comment_count=vid.get('comment_count'),
-                 comments=vid.get('comments')
-             ))
-        
-        task.results = final_results
-        task.status = "completed"
-        task.progress.append("YouTube scraping completed successfully.")
+        # Results are appended per video as they are stored (see publish)
+        scrape_channel(channel_url, days, callback=progress_callback,
+                       on_result=lambda item: publish(task, item, "video"))
+        report(task, "YouTube scraping completed successfully.")
+        set_status(task, "completed")
         
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.exception(f"YouTube task failed: {e}")
-        task.status = "failed"
         task.error = str(e)
-        task.progress.append(f"Error: {str(e)}")
+        report(task, f"Error: {str(e)}")
+        set_status(task, "failed")
 
-def start_youtube_scraping(channel_url: str, days: int = 30) -> str:
-    task_id = str(uuid.uuid4())
-    tasks[task_id] = ScrapeStatus(task_id=task_id, status="pending")
-    
-    thread = threading.Thread(target=run_youtube_task, args=(task_id, channel_url, days))
-    thread.daemon = True
-    thread.start()
-    
-    return task_id
+def start_youtube_scraping(channel_url: str, days: int = 30, priority: int = 0) -> str:
+    return schedule("youtube", run_youtube_task, channel_url, days, priority=priority)
 
 
 
-import json
-import os
+# Version/ETag of the archive for /load-existing, refreshed from new writes only
+_snapshot: PostSnapshot | None = None
+_snapshot_lock = threading.Lock()
+# (snapshot version, JSON body) of the last full-archive response
+_existing: tuple[int, bytes] | None = None
+# Encoded ScrapeResult per post_url, dropped when a snapshot refresh touches the post
+_post_bodies: dict[str, bytes] = {}
+_bodies_lock = threading.Lock()
+
 
-def load_existing_comments() -> ScrapeStatus:
-    file_path = "comments.json"
-    if not os.path.exists(file_path):
+def get_snapshot() -> PostSnapshot:
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = PostSnapshot(get_writer().storage)
+            _snapshot.add_listener(_drop_post_bodies, replay=False)
+        return _snapshot
+
+
+_comment_index: CommentIndex | None = None
+_comment_index_lock = threading.Lock()
+
+
+def get_comment_index() -> CommentIndex:
+    """Secondary indexes behind /comments, fed by the archive snapshot."""
+    global _comment_index
+    snapshot = get_snapshot()
+    with _comment_index_lock:
+        if _comment_index is None:
+            # Filled from a read of its own, without holding up the snapshot's other users
+            index = CommentIndex()
+            snapshot.add_listener(index.apply)
+            _comment_index = index
+    return _comment_index
+
+
+def query_comments(**filters) -> tuple[list[dict], str | None]:
+    """One page of stored comments (see ``CommentIndex.query``), including the latest writes."""
+    index = get_comment_index()
+    get_snapshot().refresh()
+    return index.query(**filters)
+
+
+_stats: CommentStats | None = None
+
+
+def get_stats() -> CommentStats:
+    """Running aggregates behind /stats; the first call streams the archive once."""
+    global _stats
+    with _snapshot_lock:
+        if _stats is None:
+            _stats = CommentStats(get_writer().storage)
+    _stats.refresh()
+    return _stats
+
+
+def existing_comments_etag() -> str:
+    """Validator for /load-existing; changes only when stored comments do."""
+    snapshot = get_snapshot()
+    snapshot.refresh()
+    return snapshot.etag
+
+
+def load_existing_comments(offset: int = 0, limit: int | None = None,
+                           post_urls: list[str] | None = None) -> ScrapeStatus:
+    storage = get_writer().storage
+    if not storage.filepath.exists():
         return None
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        if not data:
+        total, posts = get_snapshot().posts(offset, limit, post_urls)
+        if not total:
             return None
 
-        # Group by post_url
-        grouped = {}
-        for comment in data:
-            url = comment.get("post_url")
-            if not url:
-                continue
-            if url not in grouped:
-                grouped[url] = []
-            grouped[url].append(comment)
-        
         results = []
-        for url, comments in grouped.items():
+        for url, comments in posts:
             results.append(ScrapeResult(
                 post_url=url,
                 comment_count=len(comments),
                 comments=comments
             ))
             
-        task_id = "existing_data"
         status = ScrapeStatus(
-            task_id=task_id,
+            task_id="existing_data",
             status="completed",
-            progress=["Loaded from existing comments.json"],
-            results=results
+            progress=[f"Loaded from existing {storage.filepath}"],
+            results=results,
+            total_results=total
         )
-        tasks[task_id] = status
         return status
         
     except Exception as e:
         logger.error(f"Failed to load existing comments: {e}")
         return None
 
+
+def existing_comments_json(offset: int = 0, limit: int | None = None,
+                           post_urls: list[str] | None = None) -> bytes | None:
+    """
+    Serialized /load-existing response. The full archive is assembled from
+    per-post bodies; after a write only the posts it touched are encoded
+    again.
+    """
+    global _existing
+    version = get_snapshot().refresh()
+    full = offset == 0 and limit is None and post_urls is None
+    if not full:
+        status = load_existing_comments(offset, limit, post_urls)
+        return status.model_dump_json().encode() if status is not None else None
+    if _existing and _existing[0] == version:
+        return _existing[1]
+    storage = get_writer().storage
+    if not storage.filepath.exists():
+        return None
+    try:
+        with _bodies_lock:
+            order = storage.post_order()
+            missing = [url for url in order if url not in _post_bodies]
+            for url, comments in storage.iter_posts(missing) if missing else ():
+                _post_bodies[url] = ScrapeResult(
+                    post_url=url, comment_count=len(comments), comments=comments
+                ).model_dump_json().encode()
+            results = b",".join(_post_bodies[url] for url in order)
+    except Exception as e:
+        logger.error(f"Failed to load existing comments: {e}")
+        return None
+    if not order:
+        return None
+    status = ScrapeStatus(
+        task_id="existing_data",
+        status="completed",
+        progress=[f"Loaded from existing {storage.filepath}"],
+        results=[],
+        total_results=len(order),
+    )
+    body = status.model_dump_json().encode().replace(b'"results":[]', b'"results":[' + results + b"]", 1)
+    _existing = (version, body)
+    return body
+
+
+def _drop_post_bodies(records: list[dict], reset: bool) -> None:
+    """Snapshot listener: forget the encoded bodies of posts a batch touched."""
+    with _bodies_lock:
+        if reset:
+            _post_bodies.clear()
+        for record in records:
+            _post_bodies.pop(record.get("post_url"), None)
+
 def get_task_status(task_id: str) -> ScrapeStatus:
     return tasks.get(task_id)
 
+def get_task_delta(task_id: str, progress_since: int = 0, results_since: int = 0) -> StatusDelta:
+    task = tasks.get(task_id)
+    if not task:
+        return None
+    # Workers only ever append, so lengths taken first bound a consistent slice
+    status, error = task.status, task.error
+    progress = task.progress
+    results = task.results or []
+    progress_end, results_end = len(progress), len(results)
+    progress_since = min(progress_since, progress_end)
+    results_since = min(results_since, results_end)
+    return StatusDelta(
+        task_id=task_id,
+        status=status,
+        error=error,
+        progress=progress[progress_since:progress_end],
+        results=results[results_since:results_end],
+        progress_cursor=progress_end,
+        results_cursor=results_end
+    )
+
 def run_instagram_task(task_id: str, username: str, days: int = 30):
     task = tasks[task_id]
-    task.status = "processing"
+    set_status(task, "processing")
     
     def progress_callback(msg):
-        task.progress.append(msg)
+        report(task, msg)
         
     try:
-        results = scrape_instagram_profile(username, days, callback=progress_callback)
-        
-        final_results = []
-        for post in results:
-             final_results.append(ScrapeResult(
-                 post_url=post.get('post_url'),
-                 comment_count=post.get('comment_count'),
-                 comments=post.get('comments')
-             ))
-        
-        task.results = final_results
-        task.status = "completed"
-        task.progress.append("Instagram scraping completed successfully.")
+        # Results are appended per post as they are stored (see publish)
+        scrape_instagram_profile(username, days, callback=progress_callback,
+                                 on_result=lambda item: publish(task, item))
+        report(task, "Instagram scraping completed successfully.")
+        set_status(task, "completed")
         
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.exception(f"Instagram task failed: {e}")
-        task.status = "failed"
         task.error = str(e)
-        task.progress.append(f"Error: {str(e)}")
+        report(task, f"Error: {str(e)}")
+        set_status(task, "failed")
 
-def start_instagram_scraping(username: str, days: int = 30) -> str:
-    task_id = str(uuid.uuid4())
-    tasks[task_id] = ScrapeStatus(task_id=task_id, status="pending")
-    
-    thread = threading.Thread(target=run_instagram_task, args=(task_id, username, days))
-    thread.daemon = True
-    thread.start()
-    
-    return task_id
+def start_instagram_scraping(username: str, days: int = 30, priority: int = 0) -> str:
+    return schedule("instagram", run_instagram_task, username, days, priority=priority)
@@ -0,0 +1,225 @@
+"""
+task_store.py — Scrape tasks in memory while they matter, on disk after.
+
+Every task gets a row in a SQLite file when it is created. When it
+finishes, its status, progress and results are written there too,
+compressed. From then on the in-memory copy can be dropped. That
+happens after ``TASK_TTL`` seconds without a read, or sooner, least
+recently used first, once more than ``TASK_MEMORY_TASKS`` finished
+tasks or ``TASK_MEMORY_COMMENTS`` of their comments are held. The next
+read of an evicted task loads it back. Task ids therefore survive a
+restart. Tasks that were still running when the backend stopped come
+back as failed.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from linkedin_scraper.utils import logger
+
+from .events import TERMINAL
+from .models import ScrapeStatus
+
+DEFAULT_STORE_PATH = os.environ.get("TASK_STORE_PATH", "tasks.sqlite3")
+# Seconds a finished task stays in memory after it was last read
+DEFAULT_TTL = float(os.environ.get("TASK_TTL", "900"))
+# Finished tasks / comments across them kept in memory at most
+DEFAULT_MEMORY_TASKS = int(os.environ.get("TASK_MEMORY_TASKS", "20"))
+DEFAULT_MEMORY_COMMENTS = int(os.environ.get("TASK_MEMORY_COMMENTS", "100000"))
+
+_METADATA = ("status", "platform", "priority", "error", "queued_at", "started_at", "finished_at")
+
+
+class TaskStore:
+    """Dict-like ``task_id -> ScrapeStatus`` with a bounded in-memory tier over SQLite."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STORE_PATH,
+        ttl: float = DEFAULT_TTL,
+        memory_tasks: int = DEFAULT_MEMORY_TASKS,
+        memory_comments: int = DEFAULT_MEMORY_COMMENTS,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.memory_tasks = memory_tasks
+        self.memory_comments = memory_comments
+
+        self.evictions = 0
+        self.loads = 0
+
+        self._memory: OrderedDict[str, ScrapeStatus] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        # Finished tasks already saved, so safe to drop: task_id -> comment count
+        self._evictable: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " platform TEXT,"
+            " priority INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT,"
+            " queued_at TEXT,"
+            " started_at TEXT,"
+            " finished_at TEXT,"
+            " results INTEGER NOT NULL DEFAULT 0,"
+            " comments INTEGER NOT NULL DEFAULT 0,"
+            " body BLOB,"
+            " updated REAL NOT NULL)"
+        )
+        interrupted = self._conn.execute(
+            "UPDATE tasks SET status = 'failed', error = 'Interrupted by a backend restart', updated = ?"
+            f" WHERE status NOT IN ({', '.join('?' * len(TERMINAL))})",
+            (time.time(), *TERMINAL),
+        ).rowcount
+        self._conn.commit()
+        known = self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        logger.info(f"Task store ready: {known} task(s) in {self.path}"
+                    + (f", {interrupted} marked interrupted" if interrupted else ""))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add(self, task: ScrapeStatus) -> None:
+        """Start tracking *task* and record its id on disk."""
+        with self._lock:
+            self._forget(task.task_id)
+            self._memory[task.task_id] = task
+            self._last_used[task.task_id] = time.monotonic()
+            self._write(task, body=None)
+            self._sweep()
+
+    def get(self, task_id: str) -> ScrapeStatus | None:
+        """The task from memory, else loaded back from disk; None if unknown."""
+        with self._lock:
+            task = self._memory.get(task_id)
+            if task is None:
+                task = self._load(task_id)
+                if task is None:
+                    return None
+                self._memory[task_id] = task
+                self._evictable[task_id] = _comment_count(task)
+                self.loads += 1
+            self._memory.move_to_end(task_id)
+            self._last_used[task_id] = time.monotonic()
+            self._sweep()
+            return task
+
+    def save(self, task: ScrapeStatus) -> None:
+        """Write a finished task's results to disk, making it evictable."""
+        with self._lock:
+            self._save(task)
+            self._sweep()
+
+    def flush(self) -> None:
+        """Save every finished task still only in memory (on shutdown)."""
+        with self._lock:
+            for task in list(self._memory.values()):
+                self._save(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_memory": len(self._memory),
+                "evictable": len(self._evictable),
+                "comments_in_memory": sum(self._evictable.values()),
+                "stored": self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0],
+                "evictions": self.evictions,
+                "loads": self.loads,
+            }
+
+    def __getitem__(self, task_id: str) -> ScrapeStatus:
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+
+    def __setitem__(self, task_id: str, task: ScrapeStatus) -> None:
+        self.add(task)
+
+    def __delitem__(self, task_id: str) -> None:
+        with self._lock:
+            self._forget(task_id)
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+
+    def __contains__(self, task_id: str) -> bool:
+        with self._lock:
+            if task_id in self._memory:
+                return True
+            return self._conn.execute("SELECT 1 FROM tasks WHERE task_id = ?", (task_id,)).fetchone() is not None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _sweep(self) -> None:
+        """Drop expired, then least recently used, finished tasks over budget (lock held)."""
+        # Tasks that finished without going through save() (e.g. cancelled while queued)
+        for task in [t for t in self._memory.values() if t.status in TERMINAL]:
+            self._save(task)
+
+        expired = time.monotonic() - self.ttl
+        for task_id in [t for t in self._evictable if self._last_used[t] < expired]:
+            self._evict(task_id)
+        comments = sum(self._evictable.values())
+        for task_id in list(self._memory):
+            if len(self._evictable) <= self.memory_tasks and comments <= self.memory_comments:
+                break
+            if task_id in self._evictable:
+                comments -= self._evictable[task_id]
+                self._evict(task_id)
+
+    def _save(self, task: ScrapeStatus) -> None:
+        if task.task_id in self._evictable or task.status not in TERMINAL:
+            return
+        self._write(task, zlib.compress(task.model_dump_json().encode("utf-8"), 6))
+        self._evictable[task.task_id] = _comment_count(task)
+
+    def _evict(self, task_id: str) -> None:
+        self._forget(task_id)
+        self.evictions += 1
+
+    def _forget(self, task_id: str) -> None:
+        self._memory.pop(task_id, None)
+        self._last_used.pop(task_id, None)
+        self._evictable.pop(task_id, None)
+
+    def _write(self, task: ScrapeStatus, body: bytes | None) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tasks (task_id, status, platform, priority, error, queued_at,"
+            " started_at, finished_at, results, comments, body, updated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task.task_id, *(getattr(task, name) for name in _METADATA),
+             len(task.results or []), _comment_count(task), body, time.time()),
+        )
+        self._conn.commit()
+
+    def _load(self, task_id: str) -> ScrapeStatus | None:
+        row = self._conn.execute(
+            f"SELECT body, {', '.join(_METADATA)} FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        body, *metadata = row
+        if body is not None:
+            return ScrapeStatus.model_validate_json(zlib.decompress(body))
+        # Only the metadata was recorded (the task never finished in this store)
+        return ScrapeStatus(task_id=task_id, **dict(zip(_METADATA, metadata)))
+
+
+def _comment_count(task: ScrapeStatus) -> int:
+    total = 0
+    for result in task.results or []:
+        comments = result.get("comments") if isinstance(result, dict) else result.comments
+        total += len(comments or [])
+    return total
@@ -18,86 +18,33 @@ export default function DashboardPage() {
     const [platformStats, setPlatformStats] = useState<any[]>([]);
 
     useEffect(() => {
-        // Fetch data from backend
-        // Reusing the /load-existing endpoint which returns all data
+        // Aggregates are maintained server-side; no need to download the archive
         const fetchData = async () => {
             try {
-                const res = await fetch("http://localhost:8000/load-existing");
+                const res = await fetch("http://localhost:8000/stats");
                 if (res.ok) {
                     const data = await res.json();
-                    const results = data.results || [];
+                    const platforms = data.platforms || {};
+                    const platformOf = (name: string) => platforms[name] || { posts: 0, comments: 0, offensive: 0 };
 
-                    let totalPosts = results.length;
-                    let totalComments = 0;
-                    let hateCount = 0;
-
-                    let linkedinPosts = 0;
-                    let linkedinComments = 0;
-                    let linkedinHate = 0;
-
-                    let youtubeVideos = 0;
-                    let youtubeComments = 0;
-                    let youtubeHate = 0;
-
-                    let instagramPosts = 0;
-                    let instagramComments = 0;
-                    let instagramHate = 0;
-
-                    results.forEach((r: any) => {
-                        totalComments += r.comment_count;
-                        const hate = r.comments.filter((c: any) => c.label === 'hate' || c.label === 'toxic' || c.label === 'severe_toxic' || c.label === 'identity_hate').length;
-                        hateCount += hate;
-
-                        // Identify platform
-                        if (r.post_url && (r.post_url.includes('youtube.com') || r.post_url.includes('youtu.be'))) {
-                            youtubeVideos++;
-                            youtubeComments += r.comment_count;
-                            youtubeHate += hate;
-                        } else if (r.post_url && r.post_url.includes('instagram.com')) {
-                            instagramPosts++;
-                            instagramComments += r.comment_count;
-                            instagramHate += hate;
-                        } else {
-                            linkedinPosts++;
-                            linkedinComments += r.comment_count;
-                            linkedinHate += hate;
-                        }
-                    });
-
-                    let activePlatforms = 0;
-                    if (linkedinPosts > 0) activePlatforms++;
-                    if (youtubeVideos > 0) activePlatforms++;
-                    if (instagramPosts > 0) activePlatforms++;
+                    const activePlatforms = ['linkedin', 'youtube', 'instagram']
+                        .filter((name) => platformOf(name).posts > 0).length;
 
                     setStats({
-                        totalPosts,
-                        totalComments,
-                        hateCount,
+                        totalPosts: data.posts || 0,
+                        totalComments: data.comments || 0,
+                        hateCount: data.offensive || 0,
                         activePlatforms
                     });
 
                     setPlatformStats([
-                        {
-                            platform: 'linkedin',
-                            postsScraped: linkedinPosts,
-                            commentsAnalyzed: linkedinComments,
-                            hateCount: linkedinHate,
-                            isActive: true
-                        },
-                        {
-                            platform: 'youtube',
-                            postsScraped: youtubeVideos,
-                            commentsAnalyzed: youtubeComments,
-                            hateCount: youtubeHate,
-                            isActive: true
-                        },
-                        {
-                            platform: 'instagram',
-                            postsScraped: instagramPosts,
-                            commentsAnalyzed: instagramComments,
-                            hateCount: instagramHate,
+                        ...['linkedin', 'youtube', 'instagram'].map((name) => ({
+                            platform: name,
+                            postsScraped: platformOf(name).posts,
+                            commentsAnalyzed: platformOf(name).comments,
+                            hateCount: platformOf(name).offensive,
                             isActive: true
-                        },
+                        })),
                         {
                             platform: 'facebook',
                             postsScraped: 0,
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { PlatformTaskForm } from "@/components/dashboard/PlatformTaskForm";
 import { StatusCard } from "@/components/dashboard/StatusCard"; // Assuming this exists from original page.tsx, need to check or recreate
 // I need to check StatusCard. If it was in components/dashboard/StatusCard.tsx I should read it or import it.
@@ -13,39 +13,105 @@ import { Platform } from "@/components/dashboard/PlatformIcon";
 // Types from page.tsx
 interface ScrapeStatus {
     task_id: string;
-    status: "pending" | "processing" | "completed" | "failed";
+    status: "pending" | "queued" | "processing" | "completed" | "failed" | "cancelled";
     progress: string[];
     error?: string;
     results?: any[];
 }
 
+// Response of /status/{id}?progress_since=&results_since=
+interface StatusDelta {
+    task_id: string;
+    status: ScrapeStatus["status"];
+    error?: string;
+    progress: string[];
+    results: any[];
+    progress_cursor: number;
+    results_cursor: number;
+}
+
+const TERMINAL: ScrapeStatus["status"][] = ["completed", "failed", "cancelled"];
+
 export default function TasksPage() {
     const [projectId, setProjectId] = useState<string | null>(null); // Not used yet?
     const [taskId, setTaskId] = useState<string | null>(null);
     const [status, setStatus] = useState<ScrapeStatus | null>(null);
     const [isLoading, setIsLoading] = useState(false);
+    // Cursors for delta polling: only new progress lines/results are fetched
+    const cursors = useRef({ progress: 0, results: 0 });
 
-    // Poll for status
+    // Follow task progress: pushed over server-sent events, with delta polling as fallback
     useEffect(() => {
-        let interval: NodeJS.Timeout;
-        // We poll /status/{taskId} which works for both platforms
-        if (taskId && status?.status !== "completed" && status?.status !== "failed") {
+        if (!taskId) return;
+        let interval: NodeJS.Timeout | undefined;
+        let finished = false;
+
+        const finish = () => {
+            finished = true;
+            setIsLoading(false);
+            source.close();
+            clearInterval(interval);
+        };
+
+        const moveCursors = (e: MessageEvent) => {
+            const [progress, results] = e.lastEventId.split("-").map(Number);
+            cursors.current = { progress, results };
+        };
+
+        const { progress, results } = cursors.current;
+        const source = new EventSource(
+            `http://localhost:8000/tasks/${taskId}/events?progress_since=${progress}&results_since=${results}`
+        );
+        source.addEventListener("progress", (e) => {
+            const event = e as MessageEvent;
+            const data: { lines: string[] } = JSON.parse(event.data);
+            moveCursors(event);
+            setStatus(prev => prev && { ...prev, progress: [...prev.progress, ...data.lines] });
+        });
+        source.addEventListener("result", (e) => {
+            const event = e as MessageEvent;
+            const result = JSON.parse(event.data);
+            moveCursors(event);
+            setStatus(prev => prev && { ...prev, results: [...(prev.results ?? []), result] });
+        });
+        source.addEventListener("status", (e) => {
+            const event = e as MessageEvent;
+            const data: { status: ScrapeStatus["status"]; error: string | null } = JSON.parse(event.data);
+            moveCursors(event);
+            setStatus(prev => prev && { ...prev, status: data.status, error: data.error ?? undefined });
+            if (TERMINAL.includes(data.status)) finish();
+        });
+        source.onerror = () => {
+            if (finished || interval) return;
+            // Stream unavailable: poll /status for deltas instead
+            source.close();
             interval = setInterval(async () => {
                 try {
-                    const res = await fetch(`http://localhost:8000/status/${taskId}`);
+                    const { progress, results } = cursors.current;
+                    const res = await fetch(
+                        `http://localhost:8000/status/${taskId}?progress_since=${progress}&results_since=${results}`
+                    );
                     if (res.ok) {
-                        const data: ScrapeStatus = await res.json();
-                        setStatus(data);
-                        if (data.status === "completed" || data.status === "failed") {
-                            setIsLoading(false);
-                            clearInterval(interval);
-                        }
+                        const data: StatusDelta = await res.json();
+                        cursors.current = { progress: data.progress_cursor, results: data.results_cursor };
+                        setStatus(prev => ({
+                            task_id: data.task_id,
+                            status: data.status,
+                            error: data.error,
+                            progress: [...(prev?.progress ?? []), ...data.progress],
+                            results: [...(prev?.results ?? []), ...data.results],
+                        }));
+                        if (TERMINAL.includes(data.status)) finish();
                     }
                 } catch (e) { console.error(e); }
             }, 2000);
-        }
-        return () => clearInterval(interval);
-    }, [taskId, status?.status]);
+        };
+
+        return () => {
+            source.close();
+            clearInterval(interval);
+        };
+    }, [taskId]);
 
     const handleStartScrape = async (platform: Platform, urls: string[], days: number) => {
         setIsLoading(true);
@@ -65,6 +131,7 @@ export default function TasksPage() {
 
             if (res.ok) {
                 const data = await res.json();
+                cursors.current = { progress: data.progress.length, results: data.results?.length ?? 0 };
                 setTaskId(data.task_id);
                 setStatus(data);
             } else {
@@ -78,6 +145,14 @@ export default function TasksPage() {
         }
     };
 
+    const handleCancel = async () => {
+        if (!taskId) return;
+        try {
+            // The final "cancelled" status arrives through the event stream
+            await fetch(`http://localhost:8000/tasks/${taskId}/cancel`, { method: "POST" });
+        } catch (e) { console.error(e); }
+    };
+
     const handleDownload = () => {
         if (taskId) window.location.href = `http://localhost:8000/export/${taskId}`;
     };
@@ -102,6 +177,7 @@ export default function TasksPage() {
                             status={status?.status || "idle"}
                             progress={status?.progress || []}
                             onDownload={handleDownload}
+                            onCancel={handleCancel}
                         />
                     </div>
                 </div>
@@ -1,6 +1,6 @@
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
-import { Download, Loader2 } from "lucide-react";
+import { Download, Loader2, X } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { useEffect, useRef } from "react";
 
@@ -8,9 +8,10 @@ interface StatusCardProps {
     status: string;
     progress: string[];
     onDownload: () => void;
+    onCancel?: () => void;
 }
 
-export function StatusCard({ status, progress, onDownload }: StatusCardProps) {
+export function StatusCard({ status, progress, onDownload, onCancel }: StatusCardProps) {
     const logsRef = useRef<HTMLDivElement>(null);
 
     // Auto-scroll logs
@@ -29,6 +30,12 @@ export function StatusCard({ status, progress, onDownload }: StatusCardProps) {
                         {status === "processing" && <Loader2 className="mr-1 h-3 w-3 animate-spin" />}
                         {status.toUpperCase()}
                     </Badge>
+                    {onCancel && (status === "queued" || status === "processing") && (
+                        <Button size="sm" variant="outline" onClick={onCancel}>
+                            <X className="mr-2 h-4 w-4" />
+                            Cancel
+                        </Button>
+                    )}
                     {status === "completed" && (
                         <Button size="sm" variant="outline" onClick={onDownload}>
                             <Download className="mr-2 h-4 w-4" />
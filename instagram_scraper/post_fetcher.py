@@ -31,19 +31,26 @@ class PostFetcher:
         """
         Fetches posts and comments from a user profile within the last N days.
         """
+        posts_data = list(self.iter_posts(username, days_back))
+        logger.info(f"Fetched {len(posts_data)} posts from {username}")
+        return posts_data
+
+    def iter_posts(self, username, days_back):
+        """
+        Yields posts (with their comments) one at a time, newest first, so
+        callers can process a post while the next one is being fetched.
+        """
         cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
         
         try:
             profile = instaloader.Profile.from_username(self.L.context, username)
         except instaloader.ProfileNotExistsException:
             logger.error(f"Profile {username} does not exist.")
-            return []
+            return
         except Exception as e:
              logger.error(f"Error loading profile {username}: {e}")
-             return []
+             return
 
-        posts_data = []
-        
         logger.info(f"Fetching posts for {username} since {cutoff}...")
         
         for post in profile.get_posts():
@@ -68,7 +75,7 @@ class PostFetcher:
             except Exception as e:
                 logger.error(f"Error fetching comments for post {post.shortcode}: {e}")
 
-            posts_data.append({
+            yield {
                 "post_url": post_url,
                 "shortcode": post.shortcode,
                 "caption": post.caption,
@@ -76,9 +83,6 @@ class PostFetcher:
                 "comments": comments_data,
                 "comment_count": len(comments_data),
                 "thumbnail_url": post.url 
-            })
+            }
             
             time.sleep(2) # Avoid rate limiting
-            
-        logger.info(f"Fetched {len(posts_data)} posts from {username}")
-        return posts_data
@@ -0,0 +1,293 @@
+"""
+async_classifier.py — Concurrent, rate-limit-aware request engine around AsyncGroq.
+
+One engine per API key runs its own event loop on a daemon thread, so every
+worker thread (service tasks, CLI) shares the same concurrency limit and
+token buckets. Requests are bounded by an AIMD concurrency limiter, paced by
+requests-per-minute and tokens-per-minute buckets, and retried with
+exponential backoff + jitter, honouring ``retry-after`` on 429s.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from groq import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncGroq,
+    RateLimitError,
+)
+
+from linkedin_scraper.utils import logger
+
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("GROQ_MAX_CONCURRENCY", "8"))
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "30"))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get("GROQ_TOKENS_PER_MINUTE", "8000"))
+
+# Latency above which the limiter stops growing and starts shrinking.
+DEFAULT_TARGET_LATENCY = 8.0
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: float, capacity: float | None = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single oversized request must still be able to pass eventually
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) tokens once real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter. The limit grows by ~1 per window while latency
+    stays under target and errors are rare, and is halved on throttling.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 32,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self.error_ewma = 0.0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: float, ok: bool, throttled: bool = False) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self.latency_ewma = latency if not self.latency_ewma else 0.8 * self.latency_ewma + 0.2 * latency
+            self.error_ewma = 0.9 * self.error_ewma + (0.0 if ok else 0.1)
+
+            now = time.monotonic()
+            # Decrease at most once per observed latency so one burst of
+            # failures does not collapse the limit to the minimum.
+            can_decrease = now - self._last_decrease > max(self.latency_ewma, 1.0)
+            if throttled or self.error_ewma > 0.2 or self.latency_ewma > 2 * self.target_latency:
+                if can_decrease:
+                    factor = 0.5 if throttled else 0.75
+                    self.limit = max(self.minimum, self.limit * factor)
+                    self._last_decrease = now
+            elif ok and self.latency_ewma <= self.target_latency:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class AsyncClassificationEngine:
+    """Shared, rate-limited executor for Groq chat completions."""
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+        # Retries are handled here, not inside the SDK
+        self.client = AsyncGroq(api_key=api_key, max_retries=0)
+        self._cooldown_until = 0.0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="groq-engine", daemon=True
+        )
+        self._thread.start()
+        # Primitives are created on the engine loop they will be used from
+        self.run(self._setup())
+        logger.info(
+            f"⚡ Async classification engine started "
+            f"(concurrency ≤{self.max_concurrency}, {requests_per_minute} RPM, {tokens_per_minute} TPM)."
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def run(self, coro):
+        """Run a coroutine on the engine loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def complete(self, **request) -> str:
+        """
+        Perform one chat completion with pacing, bounded concurrency and
+        retries. Returns the message content; raises after ``max_retries``.
+        """
+        estimate = _estimate_tokens(request)
+        last_error: Exception | None = None
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_cooldown()
+            await self._request_bucket.acquire(1)
+            await self._token_bucket.acquire(estimate)
+
+            await self._limiter.acquire()
+            started = time.monotonic()
+            delay = None
+            try:
+                self.requests += 1
+                completion = await self.client.chat.completions.create(**request)
+            except RateLimitError as e:
+                self.throttled += 1
+                await self._limiter.release(time.monotonic() - started, ok=False, throttled=True)
+                delay = _retry_after(e) or self._backoff(attempt)
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                last_error = e
+            except (APIConnectionError, APITimeoutError) as e:
+                await self._limiter.release(time.monotonic() - started, ok=False)
+                delay = self._backoff(attempt)
+                last_error = e
+            except APIStatusError as e:
+                await self._limiter.release(time.monotonic() - started, ok=False)
+                if e.status_code < 500:
+                    self.failures += 1
+                    raise
+                delay = self._backoff(attempt)
+                last_error = e
+            else:
+                await self._limiter.release(time.monotonic() - started, ok=True)
+                usage = getattr(completion, "usage", None)
+                if usage and getattr(usage, "total_tokens", None):
+                    self._token_bucket.adjust(usage.total_tokens - estimate)
+                return completion.choices[0].message.content or ""
+
+            if attempt < self.max_retries:
+                self.retries += 1
+                logger.warning(
+                    f"Groq request failed ({type(last_error).__name__}); "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s."
+                )
+                await asyncio.sleep(delay)
+
+        self.failures += 1
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": round(self._limiter.limit, 2),
+            "in_flight": self._limiter.in_flight,
+            "latency_ewma": round(self._limiter.latency_ewma, 3),
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _setup(self) -> None:
+        self._request_bucket = TokenBucket(self.requests_per_minute)
+        self._token_bucket = TokenBucket(self.tokens_per_minute)
+        self._limiter = AdaptiveLimiter(
+            initial=min(4, self.max_concurrency), maximum=self.max_concurrency
+        )
+
+    async def _wait_for_cooldown(self) -> None:
+        remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+
+# ---------------------------------------------------------------------------
+# Shared engines (one per API key)
+# ---------------------------------------------------------------------------
+
+_engines: dict[str, AsyncClassificationEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(api_key: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> AsyncClassificationEngine:
+    """Return the process-wide engine for *api_key*, creating it on first use."""
+    with _engines_lock:
+        engine = _engines.get(api_key)
+        if engine is None:
+            engine = AsyncClassificationEngine(api_key, max_concurrency=max_concurrency)
+            _engines[api_key] = engine
+        return engine
+
+
+def _estimate_tokens(request: dict) -> int:
+    """Rough token estimate (~4 chars/token) for the prompt plus a reply allowance."""
+    chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+    return chars // 4 + 256
+
+
+def _retry_after(error: RateLimitError) -> float | None:
+    """Seconds to wait according to the 429 response headers, if present."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
@@ -2,19 +2,91 @@
 classifier.py — Uses Groq API to classify comments as hate/toxic/sarcasm/safe.
 """
 
+import asyncio
+import json
 import os
+import re
+import threading
+from typing import Iterable
 from dotenv import load_dotenv
 from groq import Groq
+from linkedin_scraper.async_classifier import AsyncClassificationEngine, get_engine
+from linkedin_scraper.label_cache import LabelCache
+from linkedin_scraper.near_dup import NearDupIndex, get_near_dup_index
+from linkedin_scraper.triage import Triage
 from linkedin_scraper.utils import logger
+from linkedin_scraper.watchlist import Watchlist
 
 load_dotenv()
 
+MODEL = "openai/gpt-oss-120b"
+# Bump whenever the prompts below change so cached labels are not reused.
+PROMPT_VERSION = "1"
+VALID_LABELS = {"hate", "sarcasm", "safe"}
+
+# Number of comments packed into a single chat-completion request.
+DEFAULT_BATCH_SIZE = 25
+# Times a failed batch request is sent (as a batch) before its rows become 'error'
+BATCH_ATTEMPTS = 2
+
+SYSTEM_PROMPT = (
+    "You are a content moderation AI. "
+    "Classify the following text into exactly one of these labels: "
+    "'hate', 'sarcasm', 'safe'. "
+    "Return ONLY the label, nothing else."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a content moderation AI. "
+    "You will receive a JSON array of objects with an integer 'id' and a 'text'. "
+    "Classify every text into exactly one of these labels: 'hate', 'sarcasm', 'safe'. "
+    "Return ONLY a JSON array with one object per input, in the same order, "
+    'shaped like {"id": <id>, "label": "<label>"}. No prose, no code fences.'
+)
+
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+# Only one run seeds the shared near-dup index from storage
+_seed_lock = threading.Lock()
+
 
 class CommentClassifier:
     """Wrapper for Groq API classification."""
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache: LabelCache | None = None,
+        use_cache: bool = True,
+        use_async: bool = True,
+        triage: Triage | None = None,
+        use_triage: bool = True,
+        watchlist: Watchlist | None = None,
+        use_watchlist: bool = True,
+        near_dup: NearDupIndex | None = None,
+        use_near_dup: bool = True,
+    ) -> None:
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
+        self.batch_size = max(1, batch_size)
+        self.cache = cache
+        self.engine: AsyncClassificationEngine | None = None
+        self.triage = triage
+        if self.triage is None and use_triage:
+            self.triage = Triage.from_path()
+        self.watchlist = watchlist
+        if self.watchlist is None and use_watchlist:
+            try:
+                self.watchlist = Watchlist.from_path()
+            except Exception as e:
+                logger.warning(f"Watchlist unavailable, continuing without it: {e}")
+        self.near_dup = near_dup
+        if self.near_dup is None and use_near_dup:
+            self.near_dup = get_near_dup_index()
+        if self.cache is None and use_cache:
+            try:
+                self.cache = LabelCache(namespace=f"{MODEL}:{PROMPT_VERSION}")
+            except Exception as e:
+                logger.warning(f"Label cache unavailable, continuing without it: {e}")
         if not self.api_key:
             logger.warning("GROQ_API_KEY missing. Classification will be disabled.")
             self.client = None
@@ -25,6 +97,15 @@ class CommentClassifier:
             except Exception as e:
                 logger.error(f"Failed to initialize Groq client: {e}")
                 self.client = None
+        if self.client and use_async:
+            try:
+                self.engine = get_engine(self.api_key)
+            except Exception as e:
+                logger.warning(f"Async engine unavailable, classifying sequentially: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
 
     def classify(self, text: str) -> str:
         """
@@ -34,43 +115,309 @@ class CommentClassifier:
         if not self.client or not text:
             return "unknown"
 
-        try:
-            # Using specific model requested by user
-            completion = self.client.chat.completions.create(
-                model="openai/gpt-oss-120b",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a content moderation AI. "
-                            "Classify the following text into exactly one of these labels: "
-                            "'hate', 'sarcasm', 'safe'. "
-                            "Return ONLY the label, nothing else."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": text
-                    }
-                ],
-                temperature=0.1,
-                max_completion_tokens=1024,
-                top_p=1,
-                stream=False
+        if self.cache:
+            cached = self.cache.get(text)
+            if cached:
+                return cached
+
+        label = self._classify_single(text)
+        if self.cache and label in VALID_LABELS:
+            self.cache.put(text, label)
+        return label
+
+    def classify_batch(self, texts: list[str]) -> list[str]:
+        """
+        Classify many texts with one request per ``batch_size`` chunk.
+        Returns one label per input, in input order. Rows the model skipped
+        or labelled with something invalid are re-sent as single requests;
+        a batch request that fails outright is retried as a batch, and its
+        rows are 'error' if it keeps failing.
+        Chunks run concurrently through the shared async engine when available.
+        With a triage model, confident texts are labelled locally and only
+        the uncertain band reaches the LLM.
+        """
+        labels = ["unknown"] * len(texts)
+        pending = [i for i, text in enumerate(texts) if text]
+        if self.client and self.cache and pending:
+            cached = self.cache.get_many([texts[i] for i in pending])
+            for pos, label in cached.items():
+                labels[pending[pos]] = label
+            pending = [i for pos, i in enumerate(pending) if pos not in cached]
+
+        escalated: dict[int, tuple[str, bool]] = {}
+        if self.triage and pending:
+            auto, escalate = self.triage.route([texts[i] for i in pending])
+            for pos, label in auto.items():
+                labels[pending[pos]] = label
+            escalated = {pending[pos]: guess for pos, guess in escalate.items()}
+            pending = [i for pos, i in enumerate(pending) if pos not in auto]
+
+        if not self.client:
+            return labels
+
+        # Identical texts inside one call are only sent once
+        groups: dict[str, list[int]] = {}
+        for i in pending:
+            key = self.cache.key(texts[i]) if self.cache else texts[i]
+            groups.setdefault(key, []).append(i)
+        unique = [members[0] for members in groups.values()]
+        unique_texts = [texts[i] for i in unique]
+        if not unique_texts:
+            return labels
+
+        if self.engine:
+            results = self.engine.run(self._classify_unique_async(unique_texts))
+        else:
+            results = self._classify_unique(unique_texts)
+
+        for members, label in zip(groups.values(), results):
+            for i in members:
+                labels[i] = label
+            # One observation per text sent, however many times it occurs
+            escalated_member = next((i for i in members if i in escalated), None)
+            if escalated_member is not None:
+                guess, audit = escalated[escalated_member]
+                self.triage.observe(guess, label, audit)
+        if self.cache:
+            self.cache.put_many([
+                (text, label) for text, label in zip(unique_texts, results) if label in VALID_LABELS
+            ])
+        return labels
+
+    def label_comments(self, comments: list[dict], text_key: str = "comment") -> None:
+        """
+        Set ``label`` in-place on a list of comment dicts.
+        Empty comments are 'safe'; anything left unlabelled without a client is 'unknown'.
+        Watchlist hits get ``matched_terms`` and are 'hate' straight away; in
+        'prioritize' mode they are still sent to the LLM, ahead of the rest.
+        Other comments are grouped into near-duplicate clusters (``cluster_id``)
+        and only one comment per cluster is classified.
+        """
+        texts = [c.get(text_key) or "" for c in comments]
+        hits: list[int] = []
+        if self.watchlist:
+            for i, terms in enumerate(self.watchlist.scan(texts)):
+                if terms:
+                    comments[i]["matched_terms"] = terms
+                    hits.append(i)
+
+        labels = ["hate"] * len(texts)
+        if hits and self.watchlist.mode == "prioritize":
+            for i, label in zip(hits, self.classify_batch([texts[i] for i in hits])):
+                if label in VALID_LABELS:
+                    labels[i] = label
+        flagged = set(hits)
+        rest = [i for i, text in enumerate(texts) if text and i not in flagged]
+
+        if self.near_dup and rest:
+            clusters: dict[str, list[int]] = {}
+            for i, cluster_id in zip(rest, self.near_dup.assign([texts[i] for i in rest])):
+                comments[i]["cluster_id"] = cluster_id
+                clusters.setdefault(cluster_id, []).append(i)
+            cluster_labels = {cid: self.near_dup.label_of(cid) for cid in clusters}
+            unlabelled = [cid for cid, label in cluster_labels.items() if label is None]
+            results = self.classify_batch([texts[clusters[cid][0]] for cid in unlabelled])
+            for cluster_id, label in zip(unlabelled, results):
+                cluster_labels[cluster_id] = label
+                if label in VALID_LABELS:
+                    self.near_dup.remember(cluster_id, label)
+            for cluster_id, members in clusters.items():
+                for i in members:
+                    labels[i] = cluster_labels[cluster_id]
+        else:
+            for i, label in zip(rest, self.classify_batch([texts[i] for i in rest])):
+                labels[i] = label
+
+        for comment, text, label in zip(comments, texts, labels):
+            comment["label"] = label if text else "safe"
+
+    def seed_clusters(self, records: Iterable[dict], text_key: str = "comment") -> None:
+        """
+        Let this run reuse the labels of near-duplicate clusters already in
+        storage. The index is seeded once; after that it is kept current by
+        ``label_comments``, and *records* (which may be a lazy iterator over
+        the archive) is not read at all.
+        """
+        if not self.near_dup:
+            return
+        with _seed_lock:
+            if self.near_dup.seeded:
+                return
+            known: dict[str, dict] = {}
+            for record in records:
+                cluster_id = record.get("cluster_id")
+                if cluster_id and record.get(text_key) and record.get("label") in VALID_LABELS:
+                    known.setdefault(cluster_id, record)
+            self.near_dup.seed(
+                [r[text_key] for r in known.values()],
+                list(known),
+                [r["label"] for r in known.values()],
             )
-            label = completion.choices[0].message.content.strip().lower()
-            
-            # Simple validation to ensure valid label
-            valid_labels = {"hate", "sarcasm", "safe"}
-            # Clean punctuation just in case
-            cleaned_label = label.strip('."').lower()
-            
-            if cleaned_label in valid_labels:
-                return cleaned_label
-            
-            # If model returned something else, log it but return raw output
-            return label
-            
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _classify_single(self, text: str) -> str:
+        """One request for one text, without the cache (callers have looked it up already)."""
+        try:
+            completion = self.client.chat.completions.create(**_single_request(text))
+            return _label_from_reply(completion.choices[0].message.content)
         except Exception as e:
             logger.error(f"Classification error for text '{text[:30]}...': {e}")
             return "error"
+
+    def _classify_unique(self, texts: list[str]) -> list[str]:
+        """Sequential path: one batch request per chunk, singles for the leftovers."""
+        results = []
+        for start in range(0, len(texts), self.batch_size):
+            chunk = texts[start:start + self.batch_size]
+            parsed = None
+            for attempt in range(1, BATCH_ATTEMPTS + 1):
+                try:
+                    # The client backs off and retries 429s itself
+                    completion = self.client.chat.completions.create(**_batch_request(chunk))
+                except Exception as e:
+                    logger.error(f"Batch classification error for {len(chunk)} text(s) "
+                                 f"(attempt {attempt}/{BATCH_ATTEMPTS}): {e}")
+                    continue
+                parsed = _parse_batch_reply(completion.choices[0].message.content, len(chunk))
+                break
+            if parsed is None:
+                # A failed request says nothing about the rows; singles would only multiply it
+                results.extend(["error"] * len(chunk))
+                continue
+            for pos, text in enumerate(chunk):
+                # Already missed the cache in classify_batch; results are cached there too
+                results.append(parsed[pos] if pos in parsed else self._classify_single(text))
+        return results
+
+    async def _classify_unique_async(self, texts: list[str]) -> list[str]:
+        """Concurrent path: all chunks in flight at once, then singles for the leftovers."""
+        chunks = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        replies = await asyncio.gather(*(self._complete_batch(chunk) for chunk in chunks))
+
+        results: list[str | None] = []
+        for chunk, parsed in zip(chunks, replies):
+            if parsed is None:
+                # A failed request says nothing about the rows; singles would only multiply it
+                results.extend(["error"] * len(chunk))
+            else:
+                results.extend(parsed.get(pos) for pos in range(len(chunk)))
+
+        missing = [i for i, label in enumerate(results) if label is None]
+        singles = await asyncio.gather(
+            *(self.engine.complete(**_single_request(texts[i])) for i in missing),
+            return_exceptions=True,
+        )
+        for i, reply in zip(missing, singles):
+            if isinstance(reply, Exception):
+                logger.error(f"Classification error for text '{texts[i][:30]}...': {reply}")
+                results[i] = "error"
+            else:
+                results[i] = _label_from_reply(reply)
+        return results
+
+    async def _complete_batch(self, chunk: list[str]) -> dict[int, str] | None:
+        """Parsed labels for one chunk, or None if the request kept failing after the engine's retries."""
+        for attempt in range(1, BATCH_ATTEMPTS + 1):
+            try:
+                reply = await self.engine.complete(**_batch_request(chunk))
+            except Exception as e:
+                logger.error(f"Batch classification error for {len(chunk)} text(s) "
+                             f"(attempt {attempt}/{BATCH_ATTEMPTS}): {e}")
+                continue
+            return _parse_batch_reply(reply, len(chunk))
+        return None
+
+
+def _single_request(text: str) -> dict:
+    return dict(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text},
+        ],
+        temperature=0.1,
+        max_completion_tokens=1024,
+        top_p=1,
+        stream=False,
+    )
+
+
+def _batch_request(texts: list[str]) -> dict:
+    payload = json.dumps(
+        [{"id": i, "text": text} for i, text in enumerate(texts)],
+        ensure_ascii=False,
+    )
+    return dict(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": payload},
+        ],
+        temperature=0.1,
+        max_completion_tokens=1024 + 32 * len(texts),
+        top_p=1,
+        stream=False,
+    )
+
+
+def _label_from_reply(content: str | None) -> str:
+    """Validated label, or the raw model output if it is not a known label."""
+    label = (content or "").strip().lower()
+    cleaned_label = _clean_label(label)
+    return cleaned_label if cleaned_label in VALID_LABELS else label
+
+
+def _parse_batch_reply(content: str | None, expected: int) -> dict[int, str]:
+    parsed = parse_batch_response(content or "", expected)
+    if len(parsed) < expected:
+        logger.warning(
+            f"Batch response covered {len(parsed)}/{expected} text(s); "
+            "falling back to single requests for the rest."
+        )
+    return parsed
+
+
+def parse_batch_response(content: str, expected: int) -> dict[int, str]:
+    """
+    Parse a JSON-array batch response into ``{id: label}``.
+    Rows with an out-of-range id or an invalid label are dropped; rows
+    without an id are aligned by their position in the array.
+    """
+    match = _JSON_ARRAY_RE.search(content)
+    if not match:
+        return {}
+    try:
+        rows = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(rows, list):
+        return {}
+
+    labels: dict[int, str] = {}
+    for pos, row in enumerate(rows):
+        if isinstance(row, dict):
+            row_id = row.get("id", pos)
+            label = row.get("label")
+        elif isinstance(row, str):
+            row_id, label = pos, row
+        else:
+            continue
+
+        try:
+            row_id = int(row_id)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= row_id < expected or row_id in labels or not isinstance(label, str):
+            continue
+
+        cleaned = _clean_label(label)
+        if cleaned in VALID_LABELS:
+            labels[row_id] = cleaned
+    return labels
+
+
+def _clean_label(label: str) -> str:
+    return label.strip().strip('."\'').lower()
@@ -0,0 +1,251 @@
+"""
+comment_index.py — In-memory secondary indexes for paged comment queries.
+
+For every label, post, author and platform (and for "everything") the
+index keeps the comments' ``index`` numbers sorted by ``scraped_at`` and
+by engagement (YouTube ``votes`` / Instagram ``likes``). A query walks
+the smallest posting list that satisfies one of its filters, starting
+right after a keyset cursor, and checks the other filters as it goes, so
+a page costs about its own size instead of a scan of the archive.
+
+It is fed by a ``PostSnapshot``, so it sees each append once, as the
+snapshot refreshes.
+"""
+
+import base64
+import heapq
+import json
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Iterable, Iterator
+
+SORTS = ("scraped_at", "engagement")
+# Fields that can be filtered on; "all" is the posting list of everything
+DIMENSIONS = ("label", "post_url", "author", "platform")
+# Above this many additions a posting list is re-sorted instead of insorted
+_RESORT_BATCH = 64
+
+_COUNT_RE = re.compile(r"^\s*([\d.,]+)\s*([KkMmBb]?)\s*$")
+_MULTIPLIERS = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def platform_of(post_url: str) -> str:
+    """Platform a post URL belongs to (same heuristic as the dashboard)."""
+    if "youtube.com" in post_url or "youtu.be" in post_url:
+        return "youtube"
+    if "instagram.com" in post_url:
+        return "instagram"
+    return "linkedin"
+
+
+def engagement(entry: dict) -> int:
+    """Votes or likes as a number; YouTube reports counts like ``"1.2K"``."""
+    value = entry.get("votes")
+    if value is None:
+        value = entry.get("likes")
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _COUNT_RE.match(str(value or ""))
+    if not match:
+        return 0
+    try:
+        number = float(match.group(1).replace(",", ""))
+    except ValueError:
+        return 0
+    return int(number * _MULTIPLIERS[match.group(2).lower()])
+
+
+class CommentIndex:
+    """Posting lists per (dimension, value), each kept sorted by both sort keys."""
+
+    def __init__(self) -> None:
+        self._entries: dict[int, dict] = {}
+        self._keys: dict[str, dict[int, tuple]] = {sort: {} for sort in SORTS}
+        self._postings: dict[tuple[str, str | None], dict[str, list[int]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def apply(self, records: list[dict], reset: bool = False) -> None:
+        """Add new records and newer versions of known ones (``PostSnapshot`` listener)."""
+        with self._lock:
+            if reset:
+                self._entries = {}
+                self._keys = {sort: {} for sort in SORTS}
+                self._postings = {}
+            # A batch can hold several versions of a record (e.g. a log re-read after
+            # a relabel); only the last one is indexed
+            latest: dict[int, dict] = {}
+            for record in records:
+                index = record.get("index")
+                if index is not None and record.get("post_url"):
+                    latest[index] = record
+            added: dict[tuple, list[int]] = {}
+            for index, record in latest.items():
+                old = self._entries.get(index)
+                if old is not None:
+                    self._remove(index, old)
+                self._entries[index] = record
+                self._keys["scraped_at"][index] = (record.get("scraped_at") or "", index)
+                self._keys["engagement"][index] = (engagement(record), index)
+                for posting in _postings_of(record):
+                    added.setdefault(posting, []).append(index)
+            for posting, indexes in added.items():
+                lists = self._postings.setdefault(posting, {sort: [] for sort in SORTS})
+                for sort in SORTS:
+                    keys = self._keys[sort]
+                    if len(indexes) > _RESORT_BATCH:
+                        lists[sort].extend(indexes)
+                        lists[sort].sort(key=keys.__getitem__)
+                    else:
+                        for index in indexes:
+                            insort(lists[sort], index, key=keys.__getitem__)
+
+    def query(
+        self,
+        label: list[str] | None = None,
+        post_url: list[str] | None = None,
+        author: list[str] | None = None,
+        platform: list[str] | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        sort: str = "scraped_at",
+        descending: bool = True,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        One page of comments matching every filter (values within a filter
+        are alternatives; ``scraped_at`` in ``[since, until)``), ordered by
+        *sort*. Returns the page and the cursor for the next one, if any.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort '{sort}' (expected one of {', '.join(SORTS)})")
+        filters = {
+            dimension: set(values)
+            for dimension, values in zip(DIMENSIONS, (label, post_url, author, platform))
+            if values is not None
+        }
+        after = _decode_cursor(cursor)
+        if after is not None and not isinstance(after[0], str if sort == "scraped_at" else int):
+            raise ValueError(f"Cursor does not belong to a query sorted by {sort}")
+        with self._lock:
+            keys = self._keys[sort]
+            driver = self._driver(filters)
+            runs = [
+                self._walk(self._postings.get((driver, value), {}).get(sort, []), keys, sort,
+                           descending, after, since, until)
+                for value in (filters.pop(driver) if driver != "all" else [None])
+            ]
+            # Each run is already ordered; merge them lazily
+            merged = heapq.merge(*runs, key=keys.__getitem__, reverse=descending) if len(runs) > 1 else runs[0]
+            page = []
+            for index in merged:
+                entry = self._entries[index]
+                if not _matches(entry, filters, since, until):
+                    continue
+                page.append(index)
+                if len(page) > limit:
+                    break
+            more = len(page) > limit
+            page = page[:limit]
+            next_cursor = _encode_cursor(keys[page[-1]]) if more and page else None
+            return [self._entries[index] for index in page], next_cursor
+
+    def stats(self) -> dict:
+        return {
+            "comments": len(self._entries),
+            "posting_lists": len(self._postings),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _driver(self, filters: dict[str, set]) -> str:
+        """The filtered dimension with the fewest candidates ("all" if there are no filters)."""
+        best, best_size = "all", len(self._entries)
+        for dimension, values in filters.items():
+            size = sum(len(self._postings.get((dimension, value), {}).get("scraped_at", [])) for value in values)
+            if size <= best_size:
+                best, best_size = dimension, size
+        return best
+
+    def _walk(
+        self, postings: list[int], keys: dict[int, tuple], sort: str, descending: bool,
+        after: tuple | None, since: str | None, until: str | None,
+    ) -> Iterator[int]:
+        """Indexes from one posting list in sort order, starting past the cursor."""
+        lo, hi = 0, len(postings)
+        if sort == "scraped_at":
+            # The date range is a contiguous slice of this ordering
+            if since is not None:
+                lo = bisect_left(postings, (since,), key=keys.__getitem__)
+            if until is not None:
+                hi = bisect_left(postings, (until,), key=keys.__getitem__)
+        if after is not None:
+            if descending:
+                hi = min(hi, bisect_left(postings, after, key=keys.__getitem__))
+            else:
+                lo = max(lo, bisect_right(postings, after, key=keys.__getitem__))
+        if descending:
+            return (postings[i] for i in range(hi - 1, lo - 1, -1))
+        return islice(postings, lo, hi)
+
+    def _remove(self, index: int, old: dict) -> None:
+        for posting in _postings_of(old):
+            lists = self._postings.get(posting)
+            if not lists:
+                continue
+            for sort in SORTS:
+                postings = lists[sort]
+                key = self._keys[sort][index]
+                i = bisect_left(postings, key, key=self._keys[sort].__getitem__)
+                if i < len(postings) and postings[i] == index:
+                    del postings[i]
+            if not lists["scraped_at"]:
+                del self._postings[posting]
+
+
+def _postings_of(record: dict) -> Iterable[tuple[str, str | None]]:
+    yield ("all", None)
+    yield ("label", record.get("label"))
+    yield ("post_url", record["post_url"])
+    yield ("author", record.get("author_name") or "")
+    yield ("platform", platform_of(record["post_url"]))
+
+
+def _matches(entry: dict, filters: dict[str, set], since: str | None, until: str | None) -> bool:
+    for dimension, values in filters.items():
+        if dimension == "author":
+            value = entry.get("author_name") or ""
+        elif dimension == "platform":
+            value = platform_of(entry["post_url"])
+        else:
+            value = entry.get(dimension)
+        if value not in values:
+            return False
+    scraped_at = entry.get("scraped_at") or ""
+    return not ((since is not None and scraped_at < since) or (until is not None and scraped_at >= until))
+
+
+def _encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str | None) -> tuple | None:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, index = json.loads(base64.urlsafe_b64decode(padded))
+        return (value, int(index))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
@@ -0,0 +1,167 @@
+"""
+dedup_index.py — Persistent 64-bit fingerprint index for comment dedup.
+
+Each comment's dedup key (its URN, else post URL + text) is reduced to a
+64-bit BLAKE2b fingerprint. Fingerprints live in a sorted ``uint64`` array
+(memory-mapped ``.npy``, so opening it is a few milliseconds regardless of
+size) plus a small delta of recent additions that is appended to a raw
+side file on every save and folded into the sorted array now and then.
+
+8 bytes per comment instead of a Python tuple of full strings. With
+64-bit fingerprints the chance of a false "duplicate" is ~n / 2**64 per
+lookup (about 1 in 10**13 at a million comments), so no exact check is
+needed on hits.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from linkedin_scraper.utils import logger
+
+# Fold the delta into the sorted base once it holds this many fingerprints.
+DEFAULT_MERGE_THRESHOLD = 50_000
+
+
+def dedup_key(urn: str | None, post_url: str, text: str) -> int:
+    """64-bit fingerprint of a comment's identity (URN first, else post URL + text)."""
+    raw = f"u\x1f{urn}" if urn else f"t\x1f{post_url}\x1f{text}"
+    return int.from_bytes(hashlib.blake2b(raw.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class DedupIndex:
+    """
+    Set of fingerprints persisted next to a storage file as
+    ``<file>.idx.npy`` (sorted base), ``<file>.idx.delta`` (appended
+    fingerprints) and ``<file>.idx.json`` (metadata).
+    """
+
+    def __init__(self, storage_path: str | Path, merge_threshold: int = DEFAULT_MERGE_THRESHOLD) -> None:
+        storage_path = Path(storage_path)
+        self.base_path = storage_path.with_name(storage_path.name + ".idx.npy")
+        self.delta_path = storage_path.with_name(storage_path.name + ".idx.delta")
+        self.meta_path = storage_path.with_name(storage_path.name + ".idx.json")
+        self.merge_threshold = merge_threshold
+
+        self._base = np.zeros(0, dtype=np.uint64)
+        self._delta: set[int] = set()
+        self._unflushed: list[int] = []
+        # Rebuilt in memory and not written yet: the next flush writes the whole base
+        self._rebuilt = False
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._delta)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._delta or self._in_base(np.array([key], dtype=np.uint64))[0]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def load(self) -> dict | None:
+        """Open the persisted index. Returns its metadata, or None if absent/unreadable."""
+        if not self.meta_path.exists():
+            return None
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            base = np.load(self.base_path, mmap_mode="r") if self.base_path.exists() else np.zeros(0, dtype=np.uint64)
+            delta = np.fromfile(self.delta_path, dtype="<u8") if self.delta_path.exists() else np.zeros(0, dtype=np.uint64)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Dedup index unreadable, it will be rebuilt: {exc}")
+            return None
+        if meta.get("fingerprints") != len(base) + len(delta):
+            return None
+        self._base = base
+        self._delta = set(delta.tolist())
+        self._unflushed = []
+        self._rebuilt = False
+        return meta
+
+    def add_new(self, keys: list[int]) -> list[bool]:
+        """Add fingerprints; returns for each whether it was new (duplicates in *keys* included)."""
+        if not keys:
+            return []
+        in_base = self._in_base(np.array(keys, dtype=np.uint64))
+        fresh = []
+        for key, known in zip(keys, in_base.tolist()):
+            if known or key in self._delta:
+                fresh.append(False)
+                continue
+            self._delta.add(key)
+            self._unflushed.append(key)
+            fresh.append(True)
+        return fresh
+
+    def flush(self, meta: dict) -> None:
+        """Persist fingerprints added since the last flush (all of them after a rebuild), then the metadata."""
+        if self._rebuilt or len(self._delta) >= self.merge_threshold:
+            self._merge()
+            self._rebuilt = False
+        elif self._unflushed:
+            with open(self.delta_path, "ab") as fh:
+                fh.write(np.array(self._unflushed, dtype="<u8").tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+        self._unflushed = []
+        self._write_meta(meta)
+
+    def rebuild(self, keys: list[int]) -> None:
+        """
+        Replace the index with exactly *keys* (used when it is missing or
+        stale). Only in memory: the files are rewritten by the next
+        ``flush``, i.e. by whoever saves, so a reader leaves them alone.
+        """
+        self._base = np.unique(np.array(keys, dtype=np.uint64))
+        self._delta = set()
+        self._unflushed = []
+        self._rebuilt = True
+        logger.info(f"🔑 Rebuilt dedup index with {len(self._base)} fingerprint(s).")
+
+    def stats(self) -> dict:
+        return {
+            "fingerprints": len(self),
+            "base": len(self._base),
+            "delta": len(self._delta),
+            "base_bytes": int(self._base.nbytes),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _in_base(self, keys: np.ndarray) -> np.ndarray:
+        if not len(self._base):
+            return np.zeros(len(keys), dtype=bool)
+        pos = np.searchsorted(self._base, keys)
+        np.minimum(pos, len(self._base) - 1, out=pos)
+        return np.asarray(self._base[pos]) == keys
+
+    def _merge(self) -> None:
+        merged = np.union1d(np.asarray(self._base), np.array(sorted(self._delta), dtype=np.uint64))
+        self._base = merged
+        self._delta = set()
+        self._write_base()
+
+    def _write_base(self) -> None:
+        tmp = self.base_path.with_name(self.base_path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(self._base, dtype="<u8"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.base_path)
+        # The delta is now part of the base
+        with open(self.delta_path, "wb"):
+            pass
+        self._base = np.load(self.base_path, mmap_mode="r")
+
+    def _write_meta(self, meta: dict) -> None:
+        meta = {**meta, "fingerprints": len(self)}
+        tmp = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self.meta_path)
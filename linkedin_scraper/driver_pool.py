@@ -0,0 +1,293 @@
+"""
+driver_pool.py — Warm, logged-in Chrome instances shared by LinkedIn tasks.
+
+Starting Chrome, installing the CDP scripts and restoring the LinkedIn
+session takes 10–20 seconds. The pool pays that once per browser and
+then lends the same browser to task after task. A checkout first
+health-checks the browser: the page must still answer, and the
+``li_at`` session cookie must still be present (if it isn't, the
+session is restored again). A browser is retired after ``max_uses``
+tasks, or when its JS heap grows past ``max_heap_mb``. A replacement
+is then started in the background, so the next task doesn't wait for
+it.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from linkedin_scraper.auth import LinkedInAuth
+from linkedin_scraper.utils import logger
+
+# Browsers alive at once (the LinkedIn job limit is a sensible value)
+DEFAULT_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "1"))
+# Tasks served by one browser before it is replaced
+DEFAULT_MAX_USES = int(os.environ.get("DRIVER_MAX_USES", "25"))
+# JS heap (MB) of the main tab above which a browser is replaced
+DEFAULT_MAX_HEAP_MB = float(os.environ.get("DRIVER_MAX_HEAP_MB", "768"))
+DEFAULT_HEADLESS = os.environ.get("DRIVER_HEADLESS", "").lower() in ("1", "true", "yes")
+
+SESSION_COOKIE = "li_at"
+LINKEDIN_URL = "https://www.linkedin.com/"
+
+
+@dataclass
+class _Pooled:
+    driver: WebDriver
+    uses: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+
+class DriverPool:
+    """Bounded pool of authenticated Chrome drivers; safe to use from any thread."""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        max_uses: int = DEFAULT_MAX_USES,
+        max_heap_mb: float = DEFAULT_MAX_HEAP_MB,
+        headless: bool = DEFAULT_HEADLESS,
+        factory: Callable[[bool], WebDriver] | None = None,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.max_heap_mb = max_heap_mb
+        self.headless = headless
+        if factory is None:
+            # Deferred: main.py (the CLI) imports this module
+            from linkedin_scraper.main import init_driver as factory
+        self._factory = factory
+
+        self.started = 0
+        self.reused = 0
+        self.retired = 0
+        self.unhealthy = 0
+        self.reauthenticated = 0
+        self._checkout_times: deque[float] = deque(maxlen=200)
+
+        self._idle: deque[_Pooled] = deque()
+        self._leased: dict[int, _Pooled] = {}
+        self._count = 0  # idle + leased + starting
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def checkout(self, timeout: float | None = None, start: bool = True) -> WebDriver:
+        """
+        A healthy, logged-in driver. Starts a new one while under ``size``;
+        otherwise waits (up to *timeout*) for one to be released. With
+        ``start=False`` only an idle browser is lent, never a new one.
+        """
+        began = time.monotonic()
+        deadline = None if timeout is None else began + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    pooled = self._idle.popleft()
+                    break
+                if start and self._count < self.size:
+                    self._count += 1
+                    pooled = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No browser free within {timeout:.0f}s")
+                self._cond.wait(remaining)
+
+        if pooled is not None and not self._healthy(pooled):
+            self.unhealthy += 1
+            _quit(pooled.driver)
+            pooled = None
+        if pooled is None:
+            try:
+                pooled = self._start()
+            except Exception:
+                self._drop()
+                raise
+        else:
+            self.reused += 1
+
+        with self._cond:
+            self._leased[id(pooled.driver)] = pooled
+        self._checkout_times.append(time.monotonic() - began)
+        return pooled.driver
+
+    def release(self, driver: WebDriver) -> None:
+        """Return a driver; it is reset for the next task or retired if worn out."""
+        with self._cond:
+            pooled = self._leased.pop(id(driver), None)
+        if pooled is None:
+            return
+        pooled.uses += 1
+        reason = None
+        if pooled.uses >= self.max_uses:
+            reason = f"{pooled.uses} uses"
+        else:
+            heap = _heap_mb(driver)
+            if heap is not None and heap > self.max_heap_mb:
+                reason = f"{heap:.0f} MB JS heap"
+        if reason is None and not self._closed:
+            try:
+                _reset(driver)
+            except WebDriverException as e:
+                reason = f"reset failed: {e.msg}"
+        if reason is None and not self._closed:
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+            return
+
+        if reason is not None:
+            self.retired += 1
+            logger.info(f"♻️ Retiring browser ({reason})")
+        _quit(driver)
+        self._drop()
+        if not self._closed:
+            # Replace it before the next task asks
+            self.warm(self._count + 1)
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[WebDriver]:
+        driver = self.checkout(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def warm(self, count: int | None = None) -> None:
+        """Start browsers in the background until *count* (default ``size``) exist."""
+        target = self.size if count is None else min(count, self.size)
+
+        def fill() -> None:
+            while True:
+                with self._cond:
+                    if self._closed or self._count >= target:
+                        return
+                    self._count += 1
+                try:
+                    pooled = self._start()
+                except Exception as e:
+                    self._drop()
+                    logger.warning(f"Could not warm a browser: {e}")
+                    return
+                with self._cond:
+                    if not self._closed:
+                        self._idle.append(pooled)
+                        self._cond.notify()
+                        continue
+                _quit(pooled.driver)
+                self._drop()
+                return
+
+        threading.Thread(target=fill, name="driver-pool-warm", daemon=True).start()
+
+    def close(self) -> None:
+        """Quit idle browsers now; leased ones are quit when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            _quit(pooled.driver)
+
+    def stats(self) -> dict:
+        times = sorted(self._checkout_times)
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "started": self.started,
+                "reused": self.reused,
+                "retired": self.retired,
+                "unhealthy": self.unhealthy,
+                "reauthenticated": self.reauthenticated,
+                "checkout_p50_ms": round(times[len(times) // 2] * 1000, 1) if times else 0.0,
+                "checkout_max_ms": round(times[-1] * 1000, 1) if times else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _start(self) -> _Pooled:
+        began = time.monotonic()
+        driver = self._factory(self.headless)
+        try:
+            driver.execute_cdp_cmd("Performance.enable", {})
+            if not LinkedInAuth(driver).authenticate():
+                raise RuntimeError("Authentication failed")
+        except Exception:
+            _quit(driver)
+            raise
+        self.started += 1
+        logger.info(f"🌐 Browser ready in {time.monotonic() - began:.1f}s")
+        return _Pooled(driver)
+
+    def _healthy(self, pooled: _Pooled) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            if _has_session(pooled.driver):
+                return True
+            logger.info("LinkedIn session cookie gone — restoring the session …")
+            self.reauthenticated += 1
+            return LinkedInAuth(pooled.driver).authenticate()
+        except WebDriverException as e:
+            logger.warning(f"Pooled browser failed its health check: {e.msg}")
+            return False
+
+    def _drop(self) -> None:
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+
+
+def _has_session(driver: WebDriver) -> bool:
+    # Via CDP, so it works whatever page the tab is on
+    cookies = driver.execute_cdp_cmd("Network.getCookies", {"urls": [LINKEDIN_URL]}).get("cookies", [])
+    now = time.time()
+    return any(
+        cookie.get("name") == SESSION_COOKIE and (cookie.get("session") or cookie.get("expires", 0) > now)
+        for cookie in cookies
+    )
+
+
+def _heap_mb(driver: WebDriver) -> float | None:
+    try:
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+    except WebDriverException:
+        return None
+    for metric in metrics:
+        if metric.get("name") == "JSHeapUsedSize":
+            return metric.get("value", 0) / (1024 * 1024)
+    return None
+
+
+def _reset(driver: WebDriver) -> None:
+    """Close stray tabs and park the main one on a blank page."""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.get("about:blank")
+
+
+def _quit(driver: WebDriver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
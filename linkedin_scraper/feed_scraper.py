@@ -3,6 +3,7 @@ feed_scraper.py — Scroll the target LinkedIn page feed and collect post URLs
 from the last N days.
 """
 
+import os
 import re
 import time
 from datetime import datetime, timedelta, timezone
@@ -12,6 +13,7 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from linkedin_scraper.network_capture import NetworkCapture
 from linkedin_scraper.utils import (
     get_page_height,
     logger,
@@ -19,6 +21,10 @@ from linkedin_scraper.utils import (
     smooth_scroll,
 )
 
+# "dom": parse the rendered feed; "network": parse the feed API responses
+# captured over CDP, with exact post times (falls back to "dom")
+EXTRACTION_MODE = os.environ.get("FEED_EXTRACTION", "dom").lower()
+
 # Regex that matches a standalone post URL (activity page).
 POST_URL_PATTERN = re.compile(
     r"https://www\.linkedin\.com/feed/update/urn:li:activity:(\d+)"
@@ -77,6 +83,12 @@ class FeedScraper:
                  if url.endswith("/recent-activity/") or url.endswith("/recent-activity"):
                      url = url.rstrip("/") + "/all/"
         
+        capture = None
+        if EXTRACTION_MODE == "network":
+            capture = NetworkCapture(self.driver)
+            if not capture.start():
+                capture = None
+
         logger.info(f"Navigating to feed: {url}")
         self.driver.get(url)
         random_delay(3, 5)
@@ -96,10 +108,17 @@ class FeedScraper:
         max_old_streak = 5                # stop after this many consecutive old posts
         prev_height = 0
         no_change_count = 0
+        from_network = False
 
         while True:
             # --- Extract posts visible on the page ---
-            posts = self._extract_posts()
+            if capture is not None:
+                posts = self._captured_posts(capture)
+                from_network = from_network or bool(posts)
+                if not from_network:
+                    posts = self._extract_posts()
+            else:
+                posts = self._extract_posts()
             for post in posts:
                 aid = post.get("activity_id")
                 if aid and aid not in collected:
@@ -144,6 +163,18 @@ class FeedScraper:
     # Helpers
     # ------------------------------------------------------------------
 
+    def _captured_posts(self, capture: NetworkCapture) -> list[dict]:
+        """Posts from feed API responses received since the last call, dated exactly."""
+        return [
+            {
+                "activity_id": post["activity_id"],
+                "post_url": post["post_url"],
+                "time_text": post["posted_at"].strftime("%Y-%m-%d %H:%M UTC"),
+                "is_recent": post["posted_at"] >= self.cutoff,
+            }
+            for post in capture.posts()
+        ]
+
     def _extract_posts(self) -> list[dict]:
         """Parse all visible feed update containers and return post metadata."""
         posts: list[dict] = []
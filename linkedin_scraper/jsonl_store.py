@@ -0,0 +1,397 @@
+"""
+jsonl_store.py — Append-only JSON-lines log for comment records.
+
+Every save appends one compact JSON object per line; updating a record
+appends a newer version with the same ``index`` and the last one wins on
+load. A torn final line (crash mid-write) is skipped by readers, since
+another process may still be finishing it, and truncated away by the
+first append of this writer. The log is rewritten atomically once
+superseded versions pile up.
+Readers that only need some posts scan a memory-mapped view of the log
+for byte offsets and decode just the records they return.
+"""
+
+import json
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from linkedin_scraper.utils import logger
+
+# Compact once the log holds this many times more lines than live records...
+DEFAULT_COMPACT_RATIO = 1.5
+# ...and at least this many of them are stale.
+DEFAULT_COMPACT_MIN_STALE = 10_000
+
+# Lines are written compactly, so these keys can be pulled straight out of
+# the raw bytes. Inside a JSON string the quotes would be escaped, so a
+# comment that merely mentions them cannot match.
+_INDEX_RE = re.compile(rb'"index":\s*(-?\d+)')
+_POST_URL_RE = re.compile(rb'"post_url":\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
+
+
+class JsonlStore:
+    """File-level engine behind :class:`linkedin_scraper.storage.Storage`."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+        compact_min_stale: int = DEFAULT_COMPACT_MIN_STALE,
+        fsync: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.compact_ratio = compact_ratio
+        self.compact_min_stale = compact_min_stale
+        self.fsync = fsync
+        self.lines = 0
+        self.compactions = 0
+        # Set once this writer has checked the log for a torn last line
+        self._repaired = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def load(self) -> list[dict]:
+        """
+        Read the log and return the latest version of every record, in
+        first-seen order. An incomplete trailing line is skipped, not
+        removed: it may be a record another process is still appending.
+        """
+        records: list[dict] = []
+        positions: dict[int, int] = {}
+        self.lines = 0
+        if not self.path.exists():
+            return records
+
+        skipped = 0
+        with open(self.path, "rb") as fh:
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    skipped += 1
+                    continue
+                self.lines += 1
+                index = record.get("index")
+                if index in positions:
+                    records[positions[index]] = record
+                else:
+                    if index is not None:
+                        positions[index] = len(records)
+                    records.append(record)
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} unreadable line(s) in {self.path}.")
+        return records
+
+    def snapshot(self, size: int | None = None):
+        """
+        ``(view, inode)``: a read-only memory map of the first *size* bytes
+        of the log (default: all of it), for ``post_offsets``/``read_at``,
+        and the inode it maps. It stays valid even if the log is compacted
+        meanwhile, since that replaces the file.
+        """
+        return _mapped(self.path, size)
+
+    def post_offsets(self, view) -> dict[str, np.ndarray]:
+        """
+        Map each ``post_url`` in a snapshot to the byte offsets of its
+        records' latest versions, posts and records in first-seen order,
+        without decoding whole records. An incomplete last line is ignored.
+        """
+        scan = _scan(view)
+        if scan is None:
+            return {}
+        starts, _, latest, post, urls = scan
+        record_post = post[latest]
+        keep = record_post >= 0
+        latest, record_post = latest[keep], record_post[keep]
+        if not len(record_post):
+            return {}
+
+        by_post = np.argsort(record_post, kind="stable")
+        record_post = record_post[by_post]
+        cuts = np.flatnonzero(np.diff(record_post)) + 1
+        heads = np.concatenate(([0], cuts))
+        groups = np.split(starts[latest[by_post]], cuts)
+        # Posts in the order their first record appeared
+        grouped = {}
+        for g in np.argsort(by_post[heads], kind="stable").tolist():
+            url = urls[record_post[heads[g]]]
+            if url:
+                grouped[url] = groups[g]
+        return grouped
+
+    def read_at(self, view, offsets: list[int]) -> list[dict]:
+        """Decode the records starting at the given byte offsets of a snapshot."""
+        records = []
+        for offset in offsets:
+            nl = view.find(b"\n", offset)
+            try:
+                records.append(json.loads(view[offset:nl if nl >= 0 else len(view)]))
+            except ValueError:
+                continue
+        return records
+
+    def read_from(
+        self, cursor: tuple[int, int] | None = None, limit: int | None = None
+    ) -> tuple[list[dict], tuple[int, int], bool]:
+        """
+        Records on complete lines past *cursor* (``(inode, offset)`` from a
+        previous call), at most *limit* of them. Returns them, the cursor to
+        resume from, and whether the log had to be read from the start
+        because it was replaced (compacted) or truncated since, or because
+        no cursor was given.
+        """
+        try:
+            fh = open(self.path, "rb")
+        except FileNotFoundError:
+            return [], (0, 0), True
+        records = []
+        with fh:
+            stat = os.fstat(fh.fileno())
+            inode, offset = cursor or (None, 0)
+            reset = inode != stat.st_ino or stat.st_size < offset
+            if reset:
+                offset = 0
+            fh.seek(offset)
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    break  # still being written
+                offset += len(raw)
+                try:
+                    records.append(json.loads(raw))
+                except ValueError:
+                    continue
+                if limit is not None and len(records) >= limit:
+                    break
+        return records, (stat.st_ino, offset), reset
+
+    def append(self, records: list[dict]) -> None:
+        """Append records (new ones or newer versions of existing ones)."""
+        if not records:
+            return
+        if not self._repaired:
+            self._repair()
+        payload = "".join(_dumps(record) for record in records)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(payload)
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+        self.lines += len(records)
+
+    def needs_compaction(self, live: int) -> bool:
+        stale = self.lines - live
+        return stale >= self.compact_min_stale and self.lines > live * self.compact_ratio
+
+    def compact(self, records: Iterable[dict] | None = None) -> None:
+        """
+        Atomically replace the log with exactly *records*. Without them it
+        keeps the latest version of every record in the log, copying those
+        lines as they are: nothing is decoded or held in memory.
+        """
+        if records is not None:
+            self._replace(_dumps(record).encode("utf-8") for record in records)
+            return
+        with self.snapshot() as (view, _):
+            scan = _scan(view)
+            if scan is None:
+                self._replace(())
+                return
+            starts, ends, latest, _, _ = scan
+            self._replace(view[start:end + 1] for start, end in zip(starts[latest].tolist(), ends[latest].tolist()))
+
+    def migrate_from_json(self, legacy: Path) -> int:
+        """
+        One-time import of a legacy pretty-printed JSON array. The legacy
+        file is renamed to ``*.migrated`` so the import never runs twice.
+        """
+        with open(legacy, "r", encoding="utf-8") as fh:
+            records = json.load(fh)
+        if not isinstance(records, list):
+            raise ValueError(f"{legacy} does not contain a JSON array")
+        self.compact(records)
+        legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+        logger.info(f"📦 Migrated {len(records)} comment(s) from {legacy} to {self.path}.")
+        return len(records)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _replace(self, lines: Iterable[bytes]) -> None:
+        """Write *lines* to a temporary file and move it over the log."""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        kept = 0
+        with open(tmp, "wb") as fh:
+            for line in lines:
+                fh.write(line)
+                kept += 1
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+        stale = self.lines - kept
+        self.lines = kept
+        self.compactions += 1
+        logger.info(f"🗜️  Compacted {self.path}: dropped {max(stale, 0)} stale line(s).")
+
+    def _repair(self) -> None:
+        """Truncate a torn last line (crash mid-write) before this writer appends after it."""
+        self._repaired = True
+        try:
+            fh = open(self.path, "r+b")
+        except FileNotFoundError:
+            return
+        with fh:
+            size = os.fstat(fh.fileno()).st_size
+            if not size:
+                return
+            # Scan back from the end for the last complete line
+            end = size
+            while end > 0:
+                start = max(0, end - (1 << 16))
+                fh.seek(start)
+                nl = fh.read(end - start).rfind(b"\n")
+                if nl >= 0:
+                    end = start + nl + 1
+                    break
+                end = start
+            if end == size:
+                return
+            fh.truncate(end)
+        logger.warning(f"Recovered {self.path}: dropped an incomplete trailing record ({size - end} byte(s)).")
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _scan(view) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[str]] | None:
+    """
+    Line layout of a snapshot, from the raw bytes where possible:
+    ``(starts, ends, latest, post, urls)``. *latest* holds the line of
+    every record's latest version, in first-seen order; *post* maps each
+    line to its ``post_url`` in *urls* (-1: none). Lines that don't decode
+    are left out. None when there is no complete line.
+    """
+    ends = _newlines(view)
+    n = len(ends)
+    if not n:
+        return None
+    starts = np.empty(n, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    stop = int(ends[-1]) + 1
+
+    index = np.zeros(n, dtype=np.int64)
+    index_hits = np.zeros(n, dtype=np.int64)
+    hits = _matches(_INDEX_RE, view, stop, lambda m: int(m.group(1)))
+    if len(hits):
+        lines = np.searchsorted(ends, hits[:, 0])
+        index[lines] = hits[:, 1]
+        index_hits = np.bincount(lines, minlength=n)
+
+    # Post URLs are interned: one id per distinct URL
+    post = np.full(n, -1, dtype=np.int64)
+    post_hits = np.zeros(n, dtype=np.int64)
+    ids: dict[bytes, int] = {}
+    hits = _matches(_POST_URL_RE, view, stop, lambda m: ids.setdefault(m.group(1), len(ids)))
+    # The same URL may be escaped differently on different lines
+    canonical: dict[str, int] = {}
+    remap = np.array([canonical.setdefault(_decode_url(raw), len(canonical)) for raw in ids], dtype=np.int64)
+    if len(hits):
+        lines = np.searchsorted(ends, hits[:, 0])
+        post[lines] = remap[hits[:, 1]]
+        post_hits = np.bincount(lines, minlength=n)
+
+    has_index = index_hits == 1
+    valid = np.ones(n, dtype=bool)
+    for line in np.flatnonzero((index_hits != 1) | (post_hits != 1)).tolist():
+        # Missing keys, null values or odd formatting: decode properly
+        try:
+            record = json.loads(view[starts[line]:ends[line]])
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            valid[line] = False
+            post[line] = -1
+            continue
+        has_index[line] = isinstance(record.get("index"), int)
+        index[line] = record["index"] if has_index[line] else 0
+        url = record.get("post_url")
+        if not isinstance(url, str):
+            post[line] = -1
+            continue
+        post[line] = canonical.setdefault(url, len(canonical))
+
+    # Later versions of an index replace earlier ones, keeping the slot
+    # of the first; lines without an index are records of their own
+    keys = np.where(has_index, index, 0)
+    keys[~has_index] = keys.max() + 1 + np.flatnonzero(~has_index)
+    lines = np.flatnonzero(valid)
+    keys = keys[lines]
+    _, first = np.unique(keys, return_index=True)
+    _, last = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last
+    latest = lines[last[np.argsort(first, kind="stable")]]
+    return starts, ends, latest, post, list(canonical)
+
+
+@contextmanager
+def _mapped(path: Path, size: int | None = None) -> Iterator[tuple[bytes | mmap.mmap, int]]:
+    """Read-only mmap of the first *size* bytes of a file (empty if there are none), and its inode."""
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        yield b"", 0
+        return
+    with fh:
+        stat = os.fstat(fh.fileno())
+        length = stat.st_size if size is None else min(stat.st_size, size)
+        if not length:
+            yield b"", stat.st_ino
+            return
+        with mmap.mmap(fh.fileno(), length, access=mmap.ACCESS_READ) as mm:
+            yield mm, stat.st_ino
+
+
+def _newlines(view, chunk: int = 1 << 22) -> np.ndarray:
+    """Offsets of every ``\\n``, found a few MB at a time to keep memory flat."""
+    buf = np.frombuffer(view, dtype=np.uint8)
+    parts = [np.flatnonzero(buf[i:i + chunk] == 10) + i for i in range(0, len(buf), chunk)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def _matches(pattern: re.Pattern, view, stop: int, value) -> np.ndarray:
+    """(position, value(match)) for every match, as an ``(n, 2)`` int64 array."""
+    flat = chain.from_iterable((m.start(), value(m)) for m in pattern.finditer(view, 0, stop))
+    return np.fromiter(flat, dtype=np.int64).reshape(-1, 2)
+
+
+def _decode_url(raw: bytes) -> str:
+    return json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode("utf-8")
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
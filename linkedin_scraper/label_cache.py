@@ -0,0 +1,181 @@
+"""
+label_cache.py — Persistent, content-addressed cache of classifier labels.
+
+Two tiers: a bounded in-memory LRU in front of an on-disk SQLite table.
+Keys are a hash of the normalized text plus a namespace (model + prompt
+version), so changing either one naturally invalidates old labels.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from linkedin_scraper.utils import logger
+
+DEFAULT_CACHE_PATH = os.environ.get("LABEL_CACHE_PATH", "label_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = 500_000
+DEFAULT_MEMORY_ENTRIES = 20_000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, case-folded, single-spaced."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class LabelCache:
+    """Two-tier (memory LRU + SQLite) label cache with size-based eviction."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        namespace: str = "",
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ) -> None:
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            " key TEXT PRIMARY KEY,"
+            " label TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_labels_last_used ON labels(last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+        logger.info(f"Label cache ready: {self._size} entr(y/ies) in {self.path}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def key(self, text: str) -> str:
+        raw = f"{self.namespace}\x1f{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> str | None:
+        return self.get_many([text]).get(0)
+
+    def get_many(self, texts: list[str]) -> dict[int, str]:
+        """Return ``{position: label}`` for every text that is cached."""
+        found: dict[int, str] = {}
+        disk_keys: dict[str, list[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self.key(text)
+                label = self._memory.get(key)
+                if label is not None:
+                    self._memory.move_to_end(key)
+                    found[i] = label
+                else:
+                    disk_keys.setdefault(key, []).append(i)
+
+            if disk_keys:
+                keys = list(disk_keys)
+                rows = []
+                for start in range(0, len(keys), 500):
+                    part = keys[start:start + 500]
+                    marks = ",".join("?" * len(part))
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, label FROM labels WHERE key IN ({marks})", part
+                    ).fetchall())
+                if rows:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE labels SET last_used = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows],
+                    )
+                    self._conn.commit()
+                for key, label in rows:
+                    self._remember(key, label)
+                    for i in disk_keys[key]:
+                        found[i] = label
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put(self, text: str, label: str) -> None:
+        self.put_many([(text, label)])
+
+    def put_many(self, items: list[tuple[str, str]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = {self.key(text): label for text, label in items}
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO labels (key, label, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET label = excluded.label, last_used = excluded.last_used",
+                [(key, label, now) for key, label in rows.items()],
+            )
+            self._conn.commit()
+            # Conflict updates count as changes too, so re-count only when close to the cap
+            self._size += self._conn.total_changes - before
+            if self._size > self.max_entries:
+                self._size = self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+                self._evict()
+            for key, label in rows.items():
+                self._remember(key, label)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._size,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _remember(self, key: str, label: str) -> None:
+        self._memory[key] = label
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Drop least-recently-used rows until the table is at 90% of the cap."""
+        if self._size <= self.max_entries:
+            return
+        excess = self._size - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM labels WHERE key IN ("
+            " SELECT key FROM labels ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+        self._conn.commit()
+        self._size -= excess
+        self.evictions += excess
+        logger.info(f"Label cache evicted {excess} least-recently-used entr(y/ies).")
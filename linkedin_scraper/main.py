@@ -5,6 +5,8 @@ main.py — Orchestrator for the LinkedIn Scraper.
 import argparse
 import os
 import sys
+import threading
+from contextlib import closing
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -22,16 +24,32 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 
 from linkedin_scraper.auth import LinkedInAuth
-from linkedin_scraper.classifier import CommentClassifier
-from linkedin_scraper.feed_scraper import FeedScraper
-from linkedin_scraper.post_scraper import PostScraper
+from linkedin_scraper.classifier import MODEL, CommentClassifier
+from linkedin_scraper.driver_pool import DriverPool
+from linkedin_scraper.feed_scraper import EXTRACTION_MODE as FEED_EXTRACTION, FeedScraper
+from linkedin_scraper.network_capture import LOGGING_PREFS
+from linkedin_scraper.parallel_scraper import DEFAULT_WORKERS, ParallelPostScraper
+from linkedin_scraper.post_scraper import EXTRACTION_MODE as COMMENT_EXTRACTION
 from linkedin_scraper.storage import Storage
-from linkedin_scraper.utils import logger, random_delay, apply_network_blocking
+from linkedin_scraper.utils import logger, apply_network_blocking
 
 
 # Default target (can be overridden via CLI)
 DEFAULT_TARGET_URL = "https://www.linkedin.com/school/bhagwan-parshuram-institute-of-technology/posts/?feedView=all"
 
+_chromedriver: str | None = None
+_chromedriver_lock = threading.Lock()
+
+
+def chromedriver_path() -> str:
+    """Chromedriver binary (``CHROMEDRIVER_PATH`` or webdriver-manager), resolved once per process."""
+    global _chromedriver
+    with _chromedriver_lock:
+        if _chromedriver is None:
+            _chromedriver = os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+            logger.info(f"Using chromedriver at {_chromedriver}")
+        return _chromedriver
+
 
 def init_driver(headless: bool = False) -> webdriver.Chrome:
     """Initialize Chrome driver with anti-detection options."""
@@ -55,7 +73,11 @@ def init_driver(headless: bool = False) -> webdriver.Chrome:
     # Speed up: don't wait for all resources (images/styles) to finish loading
     options.page_load_strategy = 'eager'
 
-    service = Service(ChromeDriverManager().install())
+    # Record CDP network events when posts or feeds are read from API responses
+    if "network" in (COMMENT_EXTRACTION, FEED_EXTRACTION):
+        options.set_capability("goog:loggingPrefs", LOGGING_PREFS)
+
+    service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     
     # Execute CDP command to mask webdriver
@@ -81,10 +103,14 @@ def main():
     parser.add_argument("--url", type=str, default=DEFAULT_TARGET_URL, help="Target LinkedIn Page URL")
     parser.add_argument("--days", type=int, default=30, help="Max days age for posts")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Browsers scraping posts in parallel (page rate stays within LINKEDIN_PAGES_PER_MINUTE)")
     args = parser.parse_args()
 
     logger.info("🚀 Starting LinkedIn Scraper ...")
     driver = init_driver(headless=args.headless)
+    # Browsers for the extra post workers, started when post scraping begins
+    pool = DriverPool(size=args.workers - 1, headless=args.headless, factory=init_driver) if args.workers > 1 else None
 
     try:
         # 1. Login / Auth
@@ -101,25 +127,22 @@ def main():
             logger.info("No recent posts found. Exiting.")
             return
 
-        # 3. Post Scraping
-        post_scraper = PostScraper(driver)
+        # 3. Post Scraping — parallel across browsers, paced by the shared page budget
+        post_scraper = ParallelPostScraper(
+            driver, pool, workers=args.workers,
+            on_start=lambda i, url: logger.info(f"[{i}/{len(posts)}] Scraping post: {url}"),
+        )
         storage = Storage()
         
-        logger.info(f"Processing {len(posts)} posts ...")
-        for i, post in enumerate(posts, 1):
-            url = post["post_url"]
-            logger.info(f"[{i}/{len(posts)}] Scraping post: {url}")
-            
-            comments = post_scraper.scrape_post(url)
-            if comments:
-                new_count = storage.add_comments(comments)
-                storage.save()
-                logger.info(f"   -> Added {new_count} new comments (Total stored: {storage.total})")
-            else:
-                logger.info("   -> No comments extracted.")
-            
-            # Pause between posts
-            random_delay(2, 4)
+        logger.info(f"Processing {len(posts)} posts with up to {post_scraper.workers} browser(s) ...")
+        with closing(post_scraper.scrape([post["post_url"] for post in posts])) as scraped:
+            for i, url, comments in scraped:
+                if comments:
+                    new_count = storage.add_comments(comments)
+                    storage.save()
+                    logger.info(f"   -> [{i}/{len(posts)}] Added {new_count} new comments (Total stored: {storage.total})")
+                else:
+                    logger.info(f"   -> [{i}/{len(posts)}] No comments extracted.")
 
         logger.info("✨ Scraping complete!")
 
@@ -130,46 +153,51 @@ def main():
         # (Though self.data is already in memory, good practice if modified externally)
         
         # Find pending comments (unknown, pending, or empty string labels)
-        pending_comments = [
-            c for c in storage.data 
-            if not c.get("label") or c.get("label") in ["unknown", "pending", ""]
-        ]
+        pending_comments = storage.unlabelled()
         
         if pending_comments:
             logger.info(f"🔍 Found {len(pending_comments)} comments pending classification.")
             classifier = CommentClassifier()
+            classifier.seed_clusters(storage.iter_comments())
             
             if classifier.client:
                 processed_count = 0
                 errors = 0
                 total_pending = len(pending_comments)
                 
-                logger.info(f"   Using model: openai/gpt-oss-120b (via Groq)")
+                logger.info(f"   Using model: {MODEL} (via Groq)")
                 
-                for i, comment in enumerate(pending_comments, 1):
-                    text = comment.get("comment", "")
-                    if not text:
-                        comment["label"] = "safe" # Empty is safe
-                        processed_count += 1
-                        continue
-
-                    # Classify
-                    label = classifier.classify(text)
-                    comment["label"] = label
-                    
-                    if not label or label == "unknown" or label == "error":
-                        logger.warning(f"   ⚠️  Failed to classify comment {i}: '{text[:20]}...' -> '{label}'")
-                        errors += 1
-                    else:
-                        processed_count += 1
-                        
-                    # Save periodically
-                    if i % 5 == 0:
-                        storage.save()
-                        logger.info(f"   Classified {i}/{total_pending} comments...")
+                step = classifier.batch_size
+                for start in range(0, total_pending, step):
+                    chunk = pending_comments[start:start + step]
+                    classifier.label_comments(chunk)
+
+                    for i, comment in enumerate(chunk, start + 1):
+                        label = comment["label"]
+                        if not label or label == "unknown" or label == "error":
+                            text = comment.get("comment", "")
+                            logger.warning(f"   ⚠️  Failed to classify comment {i}: '{text[:20]}...' -> '{label}'")
+                            errors += 1
+                        else:
+                            processed_count += 1
+
+                    # Save after every batch
+                    storage.update(chunk)
+                    storage.save()
+                    logger.info(f"   Classified {min(start + step, total_pending)}/{total_pending} comments...")
 
                 storage.save()
                 logger.info(f"✅ Batch classification complete! Processed: {processed_count}. Errors: {errors}.")
+                if classifier.cache:
+                    logger.info(f"   Label cache: {classifier.cache.stats()}")
+                if classifier.engine:
+                    logger.info(f"   Groq engine: {classifier.engine.stats()}")
+                if classifier.triage:
+                    logger.info(f"   Triage: {classifier.triage.stats()}")
+                if classifier.watchlist:
+                    logger.info(f"   Watchlist: {classifier.watchlist.stats()}")
+                if classifier.near_dup:
+                    logger.info(f"   Near-dup clusters: {classifier.near_dup.stats()}")
             else:
                 logger.warning("⚠️  Skipping classification — Groq client not available. Check API Key.")
         else:
@@ -180,6 +208,8 @@ def main():
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
     finally:
+        if pool:
+            pool.close()
         driver.quit()
 
 
@@ -0,0 +1,214 @@
+"""
+near_dup.py — MinHash + LSH clustering of near-duplicate comments.
+
+Bot waves repost the same message with small edits. Each comment gets a
+MinHash signature over character shingles of its normalised text; LSH
+bands find candidate clusters and the signature agreement with the
+cluster's leader confirms the match. Only one comment per cluster needs a
+label — everyone else in the cluster inherits it.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from linkedin_scraper.label_cache import normalize_text
+from linkedin_scraper.utils import logger
+
+DEFAULT_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_MAX_CLUSTERS = 200_000
+SHINGLE_SIZE = 4
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_SHINGLE_BASE = np.uint32(0x01000193)
+# Odd 64-bit multipliers combining the rows of one LSH band into a bucket key
+_BAND_MIX = np.random.default_rng(7).integers(1, 2 ** 63, size=64, dtype=np.uint64) | np.uint64(1)
+
+
+def minhash_signatures(texts: list[str], num_perm: int = DEFAULT_NUM_PERM, seed: int = 1) -> np.ndarray:
+    """``(len(texts), num_perm)`` uint32 MinHash signatures over character shingles."""
+    if not texts:
+        return np.zeros((0, num_perm), dtype=np.uint32)
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hashing: odd 64-bit multipliers, keep the high 32 bits
+    multipliers = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    offsets = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    shingles, starts = _shingle_hashes(texts)
+    shingles = shingles.astype(np.uint64)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for k in range(num_perm):
+            hashed = (shingles * multipliers[k] + offsets[k]) >> np.uint64(32)
+            signatures[:, k] = np.minimum.reduceat(hashed, starts)
+    return signatures
+
+
+class NearDupIndex:
+    """
+    Greedy leader clustering over LSH buckets. A text joins the first
+    candidate cluster whose leader signature agrees on at least
+    ``threshold`` of its positions (an estimate of Jaccard similarity);
+    otherwise it becomes the leader of a new cluster.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        max_clusters: int = DEFAULT_MAX_CLUSTERS,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_clusters = max_clusters
+
+        self.assigned = 0
+        self.joined = 0
+        self.seeded = False
+
+        self._leaders: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._buckets: dict[tuple[int, int], str] = {}
+        self._labels: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def assign(self, texts: list[str]) -> list[str]:
+        """Cluster id for every text, creating clusters as needed."""
+        signatures = minhash_signatures(texts, self.num_perm)
+        cluster_ids = []
+        with self._lock:
+            for signature, keys in zip(signatures, self._bucket_keys(signatures)):
+                cluster_id = self._match(signature, keys)
+                if cluster_id is None:
+                    cluster_id = self._add_leader(_cluster_id(signature), signature, keys)
+                else:
+                    self._leaders.move_to_end(cluster_id)
+                    self.joined += 1
+                cluster_ids.append(cluster_id)
+            self.assigned += len(texts)
+        return cluster_ids
+
+    def seed(self, texts: list[str], cluster_ids: list[str], labels: list[str]) -> None:
+        """Register clusters (and their labels) remembered from earlier runs."""
+        signatures = minhash_signatures(texts, self.num_perm)
+        with self._lock:
+            keys = self._bucket_keys(signatures)
+            for signature, bucket_keys, cluster_id, label in zip(signatures, keys, cluster_ids, labels):
+                if cluster_id not in self._leaders:
+                    self._add_leader(cluster_id, signature, bucket_keys)
+                self._labels.setdefault(cluster_id, label)
+            self.seeded = True
+        if texts:
+            logger.info(f"🧬 Near-dup index seeded with {len(self._leaders)} known cluster(s).")
+
+    def label_of(self, cluster_id: str) -> str | None:
+        return self._labels.get(cluster_id)
+
+    def remember(self, cluster_id: str, label: str) -> None:
+        if cluster_id in self._leaders:
+            self._labels[cluster_id] = label
+
+    def stats(self) -> dict:
+        return {
+            "clusters": len(self._leaders),
+            "labelled_clusters": len(self._labels),
+            "assigned": self.assigned,
+            "joined_existing": self.joined,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _bucket_keys(self, signatures: np.ndarray) -> list[list[tuple[int, int]]]:
+        """One ``(band, hash of the band's rows)`` LSH key per band, per signature."""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            hashed = (bands * _BAND_MIX[:self.rows]).sum(axis=2, dtype=np.uint64)
+        return [list(enumerate(row)) for row in hashed.tolist()]
+
+    def _match(self, signature: np.ndarray, keys: list[tuple[int, int]]) -> str | None:
+        tried = set()
+        for key in keys:
+            cluster_id = self._buckets.get(key)
+            if cluster_id is None or cluster_id in tried:
+                continue
+            tried.add(cluster_id)
+            if np.count_nonzero(self._leaders[cluster_id] == signature) >= self.threshold * self.num_perm:
+                return cluster_id
+        return None
+
+    def _add_leader(self, cluster_id: str, signature: np.ndarray, keys: list[tuple[int, int]]) -> str:
+        self._leaders[cluster_id] = signature
+        for key in keys:
+            self._buckets.setdefault(key, cluster_id)
+        while len(self._leaders) > self.max_clusters:
+            old_id, old_signature = self._leaders.popitem(last=False)
+            self._labels.pop(old_id, None)
+            for key in self._bucket_keys(old_signature[None, :])[0]:
+                if self._buckets.get(key) == old_id:
+                    del self._buckets[key]
+        return cluster_id
+
+
+# ---------------------------------------------------------------------------
+# Shared index (one per process)
+# ---------------------------------------------------------------------------
+
+_index: NearDupIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_near_dup_index() -> NearDupIndex:
+    """Return the process-wide index, so clusters and their labels carry over between runs."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NearDupIndex()
+        return _index
+
+
+def _cluster_id(signature: np.ndarray) -> str:
+    """Stable id derived from the founding comment's signature."""
+    return hashlib.blake2b(signature.tobytes(), digest_size=8).hexdigest()
+
+
+def _shingle_hashes(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    32-bit hashes of every character shingle, concatenated across texts,
+    plus the offset where each text's shingles start. Texts shorter than a
+    shingle are padded so every text has at least one.
+    """
+    normalized = [
+        normalize_text(_PUNCTUATION_RE.sub(" ", text)).ljust(SHINGLE_SIZE) for text in texts
+    ]
+    lengths = np.fromiter((len(t) for t in normalized), dtype=np.int64, count=len(normalized))
+    codes = np.frombuffer("".join(normalized).encode("utf-32-le"), dtype=np.uint32)
+
+    with np.errstate(over="ignore"):
+        rolled = codes[:len(codes) - SHINGLE_SIZE + 1].copy()
+        for j in range(1, SHINGLE_SIZE):
+            rolled *= _SHINGLE_BASE
+            rolled += codes[j:len(codes) - SHINGLE_SIZE + 1 + j]
+
+    # Drop shingles that straddle two texts
+    counts = lengths - SHINGLE_SIZE + 1
+    text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    owner = np.repeat(np.arange(len(texts)), lengths)[:len(rolled)]
+    keep = np.arange(len(rolled)) - text_starts[owner] < counts[owner]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return rolled[keep], starts
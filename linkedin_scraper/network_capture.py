@@ -0,0 +1,312 @@
+"""
+network_capture.py — Read LinkedIn's own API responses instead of the DOM.
+
+LinkedIn renders posts, feeds and comments from JSON that the browser
+fetches from its Voyager API (``/voyager/api/``). When Chrome's
+performance log is on, every response appears there as a CDP
+``Network.responseReceived`` event. ``init_driver`` turns the log on
+when ``COMMENT_EXTRACTION`` or ``FEED_EXTRACTION`` is ``network``.
+``NetworkCapture`` picks out the Voyager responses and fetches their
+bodies with ``Network.getResponseBody``. It then turns the entities in
+them into the comment dicts ``Storage.add_comments`` takes and the post
+dicts ``FeedScraper`` returns. The first page of data comes embedded in
+the HTML (``<code>`` payloads) rather than fetched, so it is read from
+there too. URNs and times come straight from the API; comment URNs are
+rewritten to the form the DOM uses (``comment_urn``), so the same
+comment is not stored twice. A post's exact time is encoded in its
+activity id.
+
+The payload shapes are LinkedIn's, undocumented and liable to change.
+Entities that don't parse are skipped, and the scrapers fall back to
+the DOM when nothing usable comes back.
+"""
+
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from typing import Iterator
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from linkedin_scraper.utils import logger
+
+# Chrome capability that records CDP events for driver.get_log("performance")
+LOGGING_PREFS = {"performance": "ALL"}
+VOYAGER_PATH = "/voyager/api/"
+
+ACTIVITY_URN = re.compile(r"urn:li:activity:(\d+)")
+# A reply's entity URN names the comment it belongs to as its thread
+_REPLY_ENTITY_URN = re.compile(r"^urn:li:fsd_comment:\(\d+,(urn:li:comment:.+)\)$")
+# Comment URNs: the DOM's data-id form, (thread, id), and the API's entity forms, (id, thread)
+_COMMENT_URN = re.compile(r"^urn:li:comment:\((.+),(\d+)\)$")
+_COMMENT_ENTITY_URN = re.compile(r"^urn:li:(?:fsd_comment|fs_objectComment|fs_comment):\((\d+),(.+)\)$")
+
+# Payloads LinkedIn renders into the page instead of fetching
+_EMBEDDED_JS = """
+return Array.from(document.querySelectorAll("code[id^='bpr-guid-']"), (el) => el.textContent || "");
+"""
+
+
+class NetworkCapture:
+    """Voyager responses one driver received since ``start``; read them before the tab closes."""
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.responses = 0
+        self.failed = 0
+        self._pending: dict[str, str] = {}  # requestId -> URL, until loading finishes
+        self._payloads: list[dict] = []
+        self._embedded_read = False
+        self._posts_seen: set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """
+        Drop everything logged so far (earlier pages, other tabs). Returns
+        False if the driver has no performance log to read.
+        """
+        try:
+            self.driver.get_log("performance")
+        except WebDriverException as e:
+            logger.warning(f"    Network capture unavailable ({e.msg}); is the performance log enabled?")
+            return False
+        self._pending.clear()
+        self._payloads = []
+        self._embedded_read = False
+        self._posts_seen.clear()
+        return True
+
+    def comments(self, post_url: str) -> list[dict]:
+        """Every comment in the payloads captured since ``start``, once each."""
+        self._collect()
+        found: dict[str, dict] = {}
+        for payload in self._payloads:
+            index = _index(payload)
+            for entity in _entities(payload):
+                comment = _comment(entity, index, post_url)
+                if comment is not None:
+                    found.setdefault(comment["urn"] or comment["comment"], comment)
+        logger.info(f"    🛰️ {self.responses} API response(s) captured → {len(found)} comment(s)"
+                    + (f", {self.failed} unreadable" if self.failed else ""))
+        return list(found.values())
+
+    def posts(self) -> list[dict]:
+        """
+        Feed posts in payloads captured since the last call, in feed order,
+        each reported once: ``{"activity_id", "post_url", "posted_at"}``.
+        """
+        posts = []
+        for payload in self._collect():
+            for entity in _entities(payload):
+                activity_id = _activity_id(entity)
+                if activity_id is None or activity_id in self._posts_seen:
+                    continue
+                self._posts_seen.add(activity_id)
+                posts.append({
+                    "activity_id": activity_id,
+                    "post_url": f"https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}/",
+                    "posted_at": activity_time(activity_id),
+                })
+        return posts
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _collect(self) -> list[dict]:
+        """Payloads that arrived since the last call (plus the embedded ones, once)."""
+        new = []
+        if not self._embedded_read:
+            self._embedded_read = True
+            try:
+                texts = self.driver.execute_script(_EMBEDDED_JS) or []
+            except WebDriverException:
+                texts = []
+            new.extend(payload for payload in map(_parse, texts) if payload is not None)
+        new.extend(self._fetch_finished())
+        self._payloads.extend(new)
+        return new
+
+    def _fetch_finished(self) -> list[dict]:
+        """Bodies of the Voyager responses that finished loading since the last read."""
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException as e:
+            logger.warning(f"    Could not read the performance log: {e.msg}")
+            return []
+        finished = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params") or {}
+            request_id = params.get("requestId")
+            if method == "Network.responseReceived":
+                response = params.get("response") or {}
+                if VOYAGER_PATH in response.get("url", "") and "json" in response.get("mimeType", ""):
+                    self._pending[request_id] = response["url"]
+            elif method == "Network.loadingFinished" and request_id in self._pending:
+                finished.append(request_id)
+            elif method == "Network.loadingFailed":
+                self._pending.pop(request_id, None)
+
+        payloads = []
+        for request_id in finished:
+            url = self._pending.pop(request_id)
+            try:
+                body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except WebDriverException:
+                # Evicted, or loaded by a tab other than the current one
+                self.failed += 1
+                continue
+            text = body.get("body") or ""
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8", "replace")
+            payload = _parse(text)
+            if payload is None:
+                logger.debug(f"Unparseable Voyager response from {url}")
+                self.failed += 1
+                continue
+            self.responses += 1
+            payloads.append(payload)
+        return payloads
+
+
+def comment_urn(urn: str | None) -> str:
+    """
+    One spelling for a comment's URN, whichever page or API it came from:
+    the DOM's ``urn:li:comment:(activity:<post>,<id>)``. Entity URNs
+    (``urn:li:fsd_comment:(<id>,urn:li:activity:<post>)``) and a fully
+    qualified thread are rewritten to it; a reply takes the thread of the
+    comment it answers. Anything else is returned as it is.
+    """
+    urn = (urn or "").strip()
+    match = _COMMENT_URN.match(urn)
+    if match:
+        thread, comment_id = match.groups()
+    else:
+        match = _COMMENT_ENTITY_URN.match(urn)
+        if not match:
+            return urn
+        comment_id, thread = match.groups()
+    parent = _COMMENT_URN.match(comment_urn(thread)) if "comment" in thread else None
+    if parent:
+        thread = parent.group(1)
+    return f"urn:li:comment:({thread.removeprefix('urn:li:')},{comment_id})"
+
+
+def activity_time(activity_id: str) -> datetime:
+    """When a post was created: the top 41 bits of its activity id are epoch milliseconds."""
+    return datetime.fromtimestamp((int(activity_id) >> 22) / 1000, tz=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Payload parsing
+# ---------------------------------------------------------------------------
+
+def _parse(text: str) -> dict | None:
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _entities(node) -> Iterator[dict]:
+    """Every typed entity in a payload: the ``included`` list and anything nested in ``data``."""
+    if isinstance(node, dict):
+        if "$type" in node:
+            yield node
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _entities(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _entities(value)
+
+
+def _index(payload: dict) -> dict[str, dict]:
+    """Entities by URN, to resolve ``*field`` references in normalized responses."""
+    return {entity["entityUrn"]: entity for entity in _entities(payload) if isinstance(entity.get("entityUrn"), str)}
+
+
+def _text(value) -> str:
+    """Text from a plain string, a TextViewModel (``{"text": ...}``) or an AttributedText."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        if "text" in value:
+            return _text(value["text"])
+        if isinstance(value.get("values"), list):
+            return "".join(_text(part.get("value")) for part in value["values"] if isinstance(part, dict)).strip()
+    return ""
+
+
+def _comment(entity: dict, index: dict[str, dict], post_url: str) -> dict | None:
+    if not entity.get("$type", "").endswith(".Comment"):
+        return None
+    text = _text(entity.get("commentary")) or _text(entity.get("commentV2")) or _text(entity.get("comment"))
+    if not text:
+        return None
+    author, profile = _commenter(entity.get("commenter") or {}, index)
+    created = entity.get("createdAt") or entity.get("createdTime")
+    return {
+        "post_url": post_url,
+        "urn": comment_urn(entity.get("urn") or entity.get("entityUrn")),
+        "comment": text,
+        "user_profile_url": profile,
+        "author_name": author or "Unknown",
+        "parent_urn": _parent_urn(entity),
+        "commented_at": (
+            datetime.fromtimestamp(created / 1000, tz=timezone.utc).isoformat()
+            if isinstance(created, (int, float)) else None
+        ),
+    }
+
+
+def _commenter(commenter: dict, index: dict[str, dict]) -> tuple[str, str]:
+    """(name, profile URL) from a commenter view model, or from the actor it references."""
+    name = _text(commenter.get("title"))
+    profile = commenter.get("navigationUrl") or ""
+    if not name:
+        # Older shape: {"com.linkedin.voyager.feed.MemberActor": {"*miniProfile": urn}}
+        for actor in commenter.values():
+            if not isinstance(actor, dict):
+                continue
+            refs = [index.get(value) for key, value in actor.items() if key.startswith("*")]
+            mini = next((ref for ref in refs if ref), None) or actor.get("miniProfile") or actor.get("miniCompany")
+            if not isinstance(mini, dict):
+                continue
+            name = " ".join(filter(None, (mini.get("firstName"), mini.get("lastName")))) or mini.get("name") or ""
+            if mini.get("publicIdentifier"):
+                profile = f"https://www.linkedin.com/in/{mini['publicIdentifier']}/"
+            elif mini.get("universalName"):
+                profile = f"https://www.linkedin.com/company/{mini['universalName']}/"
+            break
+    return name.strip(), profile.split("?")[0]
+
+
+def _parent_urn(entity: dict) -> str | None:
+    for key in ("parentCommentUrn", "*parentComment", "parentComment"):
+        if isinstance(entity.get(key), str):
+            return comment_urn(entity[key])
+    match = _REPLY_ENTITY_URN.match(entity.get("entityUrn") or "")
+    return comment_urn(match.group(1)) if match else None
+
+
+def _activity_id(entity: dict) -> str | None:
+    """The activity id of a feed update entity (None for anything else)."""
+    if not entity.get("$type", "").endswith((".Update", ".UpdateV2")):
+        return None
+    metadata = entity.get("metadata") or entity.get("updateMetadata") or {}
+    for urn in (metadata.get("backendUrn"), metadata.get("urn"), entity.get("entityUrn")):
+        match = ACTIVITY_URN.search(urn or "")
+        if match:
+            return match.group(1)
+    return None
@@ -0,0 +1,193 @@
+"""
+parallel_scraper.py — Scrape several LinkedIn posts at once, politely.
+
+Each worker drives its own browser. The first worker uses the browser
+the caller already has; the others borrow an idle one from a
+``DriverPool``, which starts browsers (in the background, never past its
+size) for them to pick up. A worker that gets none before the posts run
+out never starts, and the caller's browser carries on. Tabs in one browser
+can't be used this way, because WebDriver sends every command to a
+single current window. Every page load, whichever worker makes it,
+first takes a slot from one process-wide ``PageBudget``. That keeps
+the total request rate to LinkedIn the same however many workers or
+tasks run. Results come back in the order the URLs were given. Setting
+the ``cancelled`` event stops the workers after the posts they are on.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterator
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from linkedin_scraper.driver_pool import DriverPool
+from linkedin_scraper.post_scraper import PostScraper
+from linkedin_scraper.utils import logger
+
+DEFAULT_WORKERS = int(os.environ.get("SCRAPE_POST_WORKERS", "3"))
+# Post pages opened per minute across the whole process
+DEFAULT_PAGES_PER_MINUTE = float(os.environ.get("LINKEDIN_PAGES_PER_MINUTE", "12"))
+# Spacing between page loads varies by ± this fraction
+DEFAULT_JITTER = 0.3
+# How often a worker waiting for a pooled browser checks whether posts are left
+_LEASE_POLL = 1.0
+
+
+class PageBudget:
+    """Spaces page loads evenly (with jitter) at ``per_minute``; shared by every thread."""
+
+    def __init__(self, per_minute: float = DEFAULT_PAGES_PER_MINUTE, jitter: float = DEFAULT_JITTER) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.jitter = jitter
+        self.granted = 0
+        self.waited = 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until this caller may load a page; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self.granted += 1
+            self.waited += slot - now
+        if slot > now:
+            time.sleep(slot - now)
+        return slot - now
+
+    def stats(self) -> dict:
+        return {
+            "pages_per_minute": round(60.0 / self.interval, 1) if self.interval else None,
+            "granted": self.granted,
+            "avg_wait_s": round(self.waited / self.granted, 2) if self.granted else 0.0,
+        }
+
+
+_budget: PageBudget | None = None
+_budget_lock = threading.Lock()
+
+
+def get_page_budget() -> PageBudget:
+    """The process-wide budget all LinkedIn post scraping draws from."""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = PageBudget()
+        return _budget
+
+
+class ParallelPostScraper:
+    """Fans post URLs out to up to ``workers`` browsers and yields results in input order."""
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        pool: DriverPool | None = None,
+        workers: int = DEFAULT_WORKERS,
+        budget: PageBudget | None = None,
+        on_start: Callable[[int, str], None] | None = None,
+        cancelled: threading.Event | None = None,
+    ) -> None:
+        self.driver = driver
+        self.pool = pool
+        self.workers = max(1, workers if pool is not None else 1)
+        self.budget = budget or get_page_budget()
+        self.on_start = on_start
+        self.cancelled = cancelled
+
+    def scrape(self, urls: list[str]) -> Iterator[tuple[int, str, list[dict]]]:
+        """
+        Yield ``(position, url, comments)`` for each URL (1-based), in
+        order. Closing the iterator early, or cancelling, stops the workers
+        after the posts they are on; a cancelled scrape ends after the last
+        post that finished in order.
+        """
+        results: dict[int, list[dict]] = {}
+        state = {"next": 0, "alive": 0}
+        stop = threading.Event()
+        cond = threading.Condition()
+
+        def done() -> bool:
+            return stop.is_set() or self._is_cancelled() or state["next"] >= len(urls)
+
+        def take() -> int | None:
+            with cond:
+                if done():
+                    return None
+                state["next"] += 1
+                return state["next"] - 1
+
+        def borrow() -> WebDriver | None:
+            """An idle pooled browser, waited for while posts are left."""
+            while not done():
+                try:
+                    # Idle ones only: a worker thread never starts Chrome itself
+                    return self.pool.checkout(timeout=_LEASE_POLL, start=False)
+                except TimeoutError:
+                    continue
+                except RuntimeError:
+                    return None  # pool closed
+            return None
+
+        def work(driver: WebDriver | None) -> None:
+            leased = driver is None
+            try:
+                if leased:
+                    driver = borrow()
+                    if driver is None:
+                        return  # no browser came free in time; the others carry on
+                scraper = PostScraper(driver)
+                while (i := take()) is not None:
+                    self.budget.acquire()
+                    if self.on_start:
+                        self.on_start(i + 1, urls[i])
+                    try:
+                        comments = scraper.scrape_post(urls[i])
+                    except Exception as e:
+                        logger.error(f"Worker failed on {urls[i]}: {e}")
+                        comments = []
+                    with cond:
+                        results[i] = comments
+                        cond.notify_all()
+            except Exception as e:
+                logger.error(f"Post worker stopped: {e}")
+            finally:
+                if leased and driver is not None:
+                    self.pool.release(driver)
+                with cond:
+                    state["alive"] -= 1
+                    cond.notify_all()
+
+        count = min(self.workers, len(urls))
+        if self.pool is not None and count > 1:
+            # Browsers for the extra workers start in the pool's own thread, up to its size
+            self.pool.warm()
+        state["alive"] = count
+        threads = [
+            threading.Thread(target=work, args=(self.driver if n == 0 else None,), name=f"post-worker-{n}", daemon=True)
+            for n in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for i, url in enumerate(urls):
+                with cond:
+                    while i not in results:
+                        if not state["alive"]:
+                            if self._is_cancelled():
+                                return
+                            raise RuntimeError(f"All post workers stopped before {url}")
+                        cond.wait()
+                    comments = results.pop(i)
+                yield i + 1, url, comments
+        finally:
+            stop.set()
+            # Workers finish their current post; the caller's browser must be free on return
+            for thread in threads:
+                thread.join()
+
+    def _is_cancelled(self) -> bool:
+        return self.cancelled is not None and self.cancelled.is_set()
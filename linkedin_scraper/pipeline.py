@@ -0,0 +1,227 @@
+"""
+pipeline.py — Staged scrape → classify → store pipeline.
+
+Scrapers hand each post's comments to ``submit`` and go straight back to
+scraping. A pool of classifier workers drains a bounded queue, and a
+storage sink hands finished posts to the shared storage writer, which
+group-commits them. When the classifiers fall behind, the queue fills up
+and ``submit`` blocks, which throttles the scraper instead of buffering
+without limit. Posts may finish classification in any order, but
+``on_result`` sees them in the order they were submitted.
+"""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from linkedin_scraper.classifier import CommentClassifier
+from linkedin_scraper.storage_writer import StorageWriter, get_writer
+from linkedin_scraper.utils import logger
+
+DEFAULT_WORKERS = int(os.environ.get("PIPELINE_WORKERS", "2"))
+DEFAULT_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "8"))
+# Maximum number of finished posts handed to the writer at once.
+DEFAULT_STORE_BATCH = 16
+
+_STOP = object()
+
+
+@dataclass
+class PipelineItem:
+    """One post's worth of comments travelling through the pipeline."""
+
+    post_url: str
+    comments: list[dict]
+    meta: dict = field(default_factory=dict)
+    seq: int = 0
+
+
+class ScrapePipeline:
+    """
+    Bounded producer/consumer pipeline shared by the LinkedIn, YouTube and
+    Instagram orchestrators. Use as a context manager, or call ``start``
+    and ``close`` explicitly.
+    """
+
+    def __init__(
+        self,
+        classifier: CommentClassifier,
+        writer: StorageWriter | None = None,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        store_batch: int = DEFAULT_STORE_BATCH,
+        to_records: Callable[[PipelineItem], list[dict]] | None = None,
+        on_result: Callable[[PipelineItem], None] | None = None,
+        on_progress: Callable[[str], None] | None = None,
+    ) -> None:
+        self.classifier = classifier
+        self.writer = writer or get_writer()
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.store_batch = max(1, store_batch)
+        self.to_records = to_records or (lambda item: item.comments)
+        self.on_result = on_result
+        self.on_progress = on_progress
+
+        self._classify_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._store_queue: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Stored items waiting for earlier ones before on_result (store thread only)
+        self._finished: dict[int, PipelineItem] = {}
+        self._next_result = 1
+
+        self.submitted = 0
+        self.classified = 0
+        self.stored = 0
+        self.comments_stored = 0
+        self.duplicates = 0
+        self._started = 0.0
+        self._blocked = 0.0
+        self._classify_busy = 0.0
+        self._store_busy = 0.0
+
+    def __enter__(self) -> "ScrapePipeline":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._classify_loop, name=f"pipeline-classify-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        sink = threading.Thread(target=self._store_loop, name="pipeline-store", daemon=True)
+        sink.start()
+        self._threads.append(sink)
+
+    def submit(self, post_url: str, comments: list[dict], **meta) -> PipelineItem:
+        """Queue a scraped post for classification; blocks while the queue is full."""
+        with self._lock:
+            self.submitted += 1
+            item = PipelineItem(post_url, comments, meta, seq=self.submitted)
+        try:
+            self._classify_queue.put_nowait(item)
+        except queue.Full:
+            self._report(f"Classifier behind — scraping paused ({self._classify_queue.qsize()} post(s) queued).")
+            waited = time.monotonic()
+            self._classify_queue.put(item)
+            self._blocked += time.monotonic() - waited
+        return item
+
+    def close(self) -> dict:
+        """Wait until everything submitted is classified and stored."""
+        for _ in range(self.workers):
+            self._classify_queue.put(_STOP)
+        for thread in self._threads[:-1]:
+            thread.join()
+        self._store_queue.put(_STOP)
+        self._threads[-1].join()
+        stats = self.stats()
+        logger.info(f"🧵 Pipeline finished: {stats}")
+        return stats
+
+    def stats(self) -> dict:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {
+            "submitted": self.submitted,
+            "classified": self.classified,
+            "stored": self.stored,
+            "comments_stored": self.comments_stored,
+            "duplicates": self.duplicates,
+            "classify_queue": self._classify_queue.qsize(),
+            "store_queue": self._store_queue.qsize(),
+            "scrape_utilization": round(max(0.0, 1 - self._blocked / elapsed), 3),
+            "classify_utilization": round(self._classify_busy / (elapsed * self.workers), 3),
+            "store_utilization": round(self._store_busy / elapsed, 3),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _classify_loop(self) -> None:
+        while True:
+            item = self._classify_queue.get()
+            if item is _STOP:
+                return
+            started = time.monotonic()
+            try:
+                if item.comments:
+                    self.classifier.label_comments(item.comments)
+            except Exception as e:
+                logger.error(f"Classification failed for {item.post_url}: {e}")
+            with self._lock:
+                self._classify_busy += time.monotonic() - started
+                self.classified += 1
+            self._store_queue.put(item)
+
+    def _store_loop(self) -> None:
+        done = False
+        while not done:
+            batch = [self._store_queue.get()]
+            while len(batch) < self.store_batch:
+                try:
+                    batch.append(self._store_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                done = True
+                batch = [item for item in batch if item is not _STOP]
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            try:
+                # Submitted together so the writer folds them into one commit
+                futures = [self.writer.submit(self.to_records(item)) for item in batch]
+                for future in futures:
+                    ack = future.result()
+                    self.comments_stored += ack.added
+                    self.duplicates += ack.duplicates
+            except Exception as e:
+                logger.error(f"Storage write failed for {len(batch)} post(s): {e}")
+            self._store_busy += time.monotonic() - started
+
+            self.stored += len(batch)
+            self._release(batch)
+            self._report_stats()
+
+    def _release(self, batch: list[PipelineItem]) -> None:
+        """Hand stored items to ``on_result`` in submission order."""
+        for item in batch:
+            self._finished[item.seq] = item
+        while self._next_result in self._finished:
+            item = self._finished.pop(self._next_result)
+            self._next_result += 1
+            if self.on_result:
+                try:
+                    self.on_result(item)
+                except Exception as e:
+                    logger.error(f"Pipeline result callback failed for {item.post_url}: {e}")
+
+    def _report_stats(self) -> None:
+        s = self.stats()
+        self._report(
+            f"Pipeline: {s['stored']}/{s['submitted']} post(s) stored "
+            f"({s['comments_stored']} new, {s['duplicates']} duplicate comment(s)) · "
+            f"queue {s['classify_queue']}/{self.queue_size} · "
+            f"scrape {s['scrape_utilization']:.0%} · classify {s['classify_utilization']:.0%} · "
+            f"store {s['store_utilization']:.0%}"
+        )
+
+    def _report(self, message: str) -> None:
+        if self.on_progress:
+            self.on_progress(message)
+        else:
+            logger.info(message)
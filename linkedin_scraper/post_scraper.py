@@ -17,6 +17,7 @@ if project_root not in sys.path:
 from selenium.common.exceptions import (
     NoSuchElementException,
     StaleElementReferenceException,
+    WebDriverException,
 )
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
@@ -30,6 +31,127 @@ from linkedin_scraper.utils import (
     short_delay,
     apply_network_blocking,
 )
+from linkedin_scraper.network_capture import NetworkCapture, comment_urn
+
+
+# "js": read every comment in one execute_script; "dom": one WebDriver call per field;
+# "network": parse LinkedIn's API responses captured over CDP (falls back to "js")
+EXTRACTION_MODE = os.environ.get("COMMENT_EXTRACTION", "js").lower()
+
+COMMENT_SELECTOR = "article.comments-comment-entity"
+
+# Same selectors as the per-element path, but run in the page. Fields are
+# looked up in the comment's own subtree, not in the replies nested inside it.
+_EXTRACT_JS = """
+const ARTICLE = arguments[0];
+const own = (el, selector) => {
+    for (const node of el.querySelectorAll(selector)) {
+        if (node.closest(ARTICLE) === el) return node;
+    }
+    return null;
+};
+const text = (node) => node ? ((node.innerText || "").trim() || (node.textContent || "").trim()) : "";
+return Array.from(document.querySelectorAll(ARTICLE), (el) => {
+    let author = "", profile = "";
+    for (const selector of [".comments-comment-meta__actor", ".comments-post-meta__actor"]) {
+        const actor = own(el, selector);
+        if (!actor) continue;
+        const link = actor.querySelector("a");
+        if (link && link.href) profile = link.href.split("?")[0];
+        const name = actor.querySelector(".comments-comment-meta__description-title, span.comments-post-meta__name-text");
+        author = name ? text(name) : (actor.innerText || "").split("\\n")[0].trim();
+        if (author && author !== "Unknown") break;
+    }
+    const parent = el.parentElement ? el.parentElement.closest(ARTICLE) : null;
+    return {
+        text: text(own(el, ".comments-comment-item__main-content")) || text(own(el, "div.update-components-text")),
+        author: author,
+        profile: profile,
+        urn: el.getAttribute("data-id") || el.getAttribute("data-urn") || "",
+        parent: parent ? (parent.getAttribute("data-id") || parent.getAttribute("data-urn") || "") : null,
+    };
+});
+"""
+
+
+# "observer": click every control in one script and wait for the DOM to change;
+# "poll": click one control at a time with fixed sleeps in between
+EXPANSION_MODE = os.environ.get("COMMENT_EXPANSION", "observer").lower()
+# Longest wait (ms) for new comments after a round of clicks
+EXPAND_ROUND_TIMEOUT_MS = int(os.environ.get("COMMENT_EXPAND_TIMEOUT_MS", "8000"))
+# Quiet period (ms) after the last change before a round counts as settled
+EXPAND_QUIET_MS = 300
+MAX_EXPAND_CLICKS = 150
+
+# One expansion round, run with execute_async_script. It clicks every
+# visible "load more comments" / "previous replies" button and each "see
+# more" toggle (once), then resolves when the new comments have arrived.
+# Arrival means: comment count went up, or the clicked buttons left the
+# page, followed by a quiet period. If neither happens it resolves at the
+# timeout.
+_EXPAND_JS = """
+const [ARTICLE, timeoutMs, quietMs, maxClicks, done] = arguments;
+const started = performance.now();
+const count = () => document.querySelectorAll(ARTICLE).length;
+const visible = (el) => el.getClientRects().length > 0 && !el.disabled;
+const before = count();
+const clicked = new Set();
+const loaders = [];
+let toggles = 0;
+
+const loadMore = Array.from(document.querySelectorAll("button.comments-comments-list__load-more-comments-button"));
+for (const span of document.querySelectorAll("span.artdeco-button__text")) {
+    const label = (span.innerText || span.textContent || "").toLowerCase();
+    if (label.includes("load more comments") || label.includes("previous replies")) {
+        loadMore.push(span.closest("button") || span);
+    }
+}
+for (const el of loadMore) {
+    if (clicked.size >= maxClicks) break;
+    if (clicked.has(el) || !visible(el)) continue;
+    el.click();
+    clicked.add(el);
+    loaders.push(el);
+}
+const toggleSelector = "button.comments-comment-item__show-more-button, button.feed-shared-inline-show-more-text__see-more-less-toggle";
+for (const el of document.querySelectorAll(toggleSelector)) {
+    if (clicked.size >= maxClicks) break;
+    // "see more" turns into "see less"; clicking again would collapse it
+    if (el.dataset.scraperExpanded || el.getAttribute("aria-expanded") === "true" || !visible(el)) continue;
+    el.click();
+    el.dataset.scraperExpanded = "1";
+    clicked.add(el);
+    toggles++;
+}
+
+let finished = false, quiet = null, observer = null, deadline = null;
+const finish = (timedOut) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(quiet);
+    clearTimeout(deadline);
+    done({
+        clicked: clicked.size,
+        load_more: loaders.length,
+        toggles: toggles,
+        before: before,
+        after: count(),
+        waited_ms: Math.round(performance.now() - started),
+        timed_out: timedOut,
+    });
+};
+// "see more" expands in place; only "load more" goes to the network
+if (!loaders.length) return finish(false);
+observer = new MutationObserver(() => {
+    if (count() > before || loaders.every((el) => !el.isConnected)) {
+        clearTimeout(quiet);
+        quiet = setTimeout(() => finish(false), quietMs);
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+deadline = setTimeout(() => finish(true), timeoutMs);
+"""
 
 
 class PostScraper:
@@ -51,7 +173,13 @@ class PostScraper:
         
         # Apply network blocking to the new tab
         apply_network_blocking(self.driver)
-        
+
+        capture = None
+        if EXTRACTION_MODE == "network":
+            capture = NetworkCapture(self.driver)
+            if not capture.start():
+                capture = None
+
         try:
             self.driver.get(post_url)
             # time.sleep(3) -> Optimized to wait for content
@@ -66,7 +194,7 @@ class PostScraper:
             self._expand_comments()
             
             # 2. Extract data
-            comments = self._extract_comments(post_url)
+            comments = self._extract_comments(post_url, capture)
             logger.info(f"  -> Extracted {len(comments)} comment(s).")
             return comments
 
@@ -81,7 +209,55 @@ class PostScraper:
                 self.driver.switch_to.window(self.driver.window_handles[0])
             short_delay()
 
-    def _expand_comments(self) -> None:
+    def _expand_comments(self) -> List[Dict]:
+        """
+        Expand every comment and reply on the page, one in-page round at a
+        time. Each round waits only as long as LinkedIn takes to deliver
+        the new comments. Returns the per-round counts (clicks, comments
+        before/after, time waited).
+        """
+        if EXPANSION_MODE != "observer":
+            self._expand_comments_polling()
+            return []
+
+        rounds: List[Dict] = []
+        clicks = 0
+        idle_rounds = 0
+        self.driver.set_script_timeout(EXPAND_ROUND_TIMEOUT_MS / 1000 + 5)
+        while clicks < MAX_EXPAND_CLICKS:
+            try:
+                result = self.driver.execute_async_script(
+                    _EXPAND_JS, COMMENT_SELECTOR, EXPAND_ROUND_TIMEOUT_MS, EXPAND_QUIET_MS,
+                    MAX_EXPAND_CLICKS - clicks,
+                )
+            except WebDriverException as e:
+                logger.warning(f"    In-page expansion failed ({e.msg}); falling back to polling.")
+                self._expand_comments_polling()
+                break
+            rounds.append(result)
+            clicks += result["clicked"]
+            if result["clicked"]:
+                idle_rounds = 0
+                continue
+            # Nothing to click: nudge lazy loading once, then call it done
+            idle_rounds += 1
+            if idle_rounds >= 2:
+                break
+            self.driver.execute_script("window.scrollBy(0, 300);")
+
+        if clicks >= MAX_EXPAND_CLICKS:
+            logger.warning("  ⚠️ Reached max click limit for comments expansion.")
+        if rounds:
+            waited = sum(r["waited_ms"] for r in rounds) / 1000
+            timeouts = sum(1 for r in rounds if r["timed_out"])
+            logger.info(
+                f"    Expanded in {len(rounds)} round(s): {clicks} click(s), "
+                f"{rounds[0]['before']} → {rounds[-1]['after']} comments, {waited:.1f}s waiting"
+                + (f", {timeouts} timeout(s)" if timeouts else "")
+            )
+        return rounds
+
+    def _expand_comments_polling(self) -> None:
         """
         Continuously find and click 'Load more comments', 'View more replies',
         or 'see more' buttons until none remain.
@@ -94,7 +270,7 @@ class PostScraper:
             "span.artdeco-button__text" 
         ]
 
-        max_clicks = 150
+        max_clicks = MAX_EXPAND_CLICKS
         clicks = 0
         consecutive_no_clicks = 0
         
@@ -144,13 +320,50 @@ class PostScraper:
         if clicks >= max_clicks:
             logger.warning("  ⚠️ Reached max click limit for comments expansion.")
 
-    def _extract_comments(self, post_url: str) -> List[Dict[str, str]]:
+    def _extract_comments(self, post_url: str, capture: NetworkCapture | None = None) -> List[Dict[str, str]]:
+        """
+        All comments on the page. With a *capture*, they are taken from the
+        API responses the page loaded; otherwise (or if those held none)
+        they are read in one script call. That falls back to the
+        per-element path if the script fails, or if it finds comment
+        containers but no text in any of them (the selectors have drifted).
+        """
+        if capture is not None:
+            results = capture.comments(post_url)
+            if results:
+                return results
+            logger.warning("    No comments in the captured API responses; reading the DOM instead.")
+        if EXTRACTION_MODE in ("js", "network"):
+            try:
+                raw = self.driver.execute_script(_EXTRACT_JS, COMMENT_SELECTOR) or []
+            except WebDriverException as e:
+                logger.warning(f"    Script extraction failed ({e.msg}); using per-element extraction.")
+            else:
+                results = [
+                    {
+                        "post_url": post_url,
+                        "urn": comment_urn(item.get("urn")),
+                        "comment": item["text"],
+                        "user_profile_url": item.get("profile") or "",
+                        "author_name": (item.get("author") or "Unknown").split("•")[0].strip(),
+                        "parent_urn": comment_urn(item.get("parent")) or None,
+                    }
+                    for item in raw
+                    if item.get("text")
+                ]
+                logger.info(f"    Found {len(raw)} comment candidates in DOM.")
+                if results or not raw:
+                    return results
+                logger.warning("    Script extraction found comments but no text; using per-element extraction.")
+        return self._extract_comments_per_element(post_url)
+
+    def _extract_comments_per_element(self, post_url: str) -> List[Dict[str, str]]:
         """Parse the DOM for comment containers using robust selectors."""
         results = []
         
         # 1. Identify comment entities
         # Use a broad selector for the article container
-        comment_elements = self.driver.find_elements(By.CSS_SELECTOR, "article.comments-comment-entity")
+        comment_elements = self.driver.find_elements(By.CSS_SELECTOR, COMMENT_SELECTOR)
         logger.info(f"    Found {len(comment_elements)} comment candidates in DOM.")
 
         for el in comment_elements:
@@ -219,8 +432,8 @@ class PostScraper:
                 # Clean up author name (remove "Status is online" etc if leaked)
                 author_name = author_name.split("•")[0].strip()
 
-                # Extract URN/ID
-                urn = el.get_attribute("data-id") or el.get_attribute("data-urn") or ""
+                # Extract URN/ID, spelled as the network path spells it
+                urn = comment_urn(el.get_attribute("data-id") or el.get_attribute("data-urn"))
 
                 results.append({
                     "post_url": post_url,
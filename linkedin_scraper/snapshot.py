@@ -0,0 +1,137 @@
+"""
+snapshot.py — Change tracking for the stored comments, grouped by post.
+
+The snapshot follows the archive through ``Storage.read_changes``: after
+the first pass it reads only the records written since (appended log
+lines, or SQLite rows past the last index seen), so a refresh after a
+scrape costs in proportion to what was added. It keeps no records itself.
+Pages are served by ``Storage.posts``, which decodes only the posts it
+returns and reuses its post offsets while the log is unchanged. Its
+``version`` changes only when the content does, which makes it usable as
+an HTTP validator, and listeners (the comment index) get every batch it
+reads.
+"""
+
+import threading
+import uuid
+from typing import Callable
+
+from linkedin_scraper.storage import Storage
+from linkedin_scraper.utils import logger
+
+# Records read per round while catching up
+BATCH_SIZE = 5000
+
+
+class PostSnapshot:
+    """Versioned view of a ``Storage``, refreshed incrementally; pages come from the storage."""
+
+    def __init__(self, storage: Storage) -> None:
+        self.storage = storage
+        self.version = 0
+        self.rebuilds = 0
+        self.refreshes = 0
+
+        self._empty = True
+        self._cursor = None
+        self._listeners: list[Callable[[list[dict], bool], None]] = []
+        self._lock = threading.Lock()
+        # Versions restart with the process, so tag them to keep ETags unique
+        self._epoch = uuid.uuid4().hex[:12]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._epoch}-{self.version}"'
+
+    def add_listener(self, listener: Callable[[list[dict], bool], None], replay: bool = True) -> None:
+        """
+        Call ``listener(records, reset)`` with every batch the snapshot
+        reads (``reset``: the batch replaces everything before it). With
+        *replay* the listener is first fed the whole archive, starting with
+        a reset, from a read of its own: the shared cursor and ``version``
+        are left alone and other callers are not held up meanwhile.
+        Without, it only hears about changes from the next refresh on.
+        """
+        if not replay:
+            with self._lock:
+                self._listeners.append(listener)
+            return
+        with self._lock:
+            started = self._cursor is not None
+        cursor = self._replay(listener, None) if started else None
+        with self._lock:
+            if self._cursor is None:
+                # Nothing read yet: the first refresh replays the archive to everyone
+                self._listeners.append(listener)
+                self._refresh()
+                return
+            # Catch up on what was written during the replay; anything the
+            # shared cursor has not reached yet comes round again, which
+            # listeners take as a newer version of the same record
+            self._refresh()
+            self._replay(listener, cursor)
+            self._listeners.append(listener)
+
+    def refresh(self) -> int:
+        """Pick up records written since the last refresh; returns the current version."""
+        with self._lock:
+            return self._refresh()
+
+    def posts(
+        self, offset: int = 0, limit: int | None = None, post_urls: list[str] | None = None
+    ) -> tuple[int, list[tuple[str, list[dict]]]]:
+        """Same contract as ``Storage.posts``, which serves it."""
+        return self.storage.posts(offset, limit, post_urls)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "comments": self.storage.total,
+            "rebuilds": self.rebuilds,
+            "incremental_refreshes": self.refreshes,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _replay(self, listener: Callable[[list[dict], bool], None], cursor) -> object:
+        """Feed one listener everything after *cursor* (None: from the start); returns the new cursor."""
+        first = cursor is None
+        while True:
+            records, cursor, reset = self.storage.read_changes(cursor, BATCH_SIZE)
+            if records or reset:
+                listener(records, reset or first)
+                first = False
+            if len(records) < BATCH_SIZE:
+                return cursor
+
+    def _refresh(self) -> int:
+        """Catch up with storage a batch at a time (lock held)."""
+        changed = rebuilt = False
+        read = 0
+        while True:
+            records, cursor, reset = self.storage.read_changes(self._cursor, BATCH_SIZE)
+            self._cursor = cursor
+            if reset and (records or not self._empty):
+                rebuilt = True
+            if records or (reset and not self._empty):
+                for listener in self._listeners:
+                    listener(records, reset)
+                changed = True
+                self._empty = reset and not records or (self._empty and not records)
+                read += len(records)
+            if len(records) < BATCH_SIZE:
+                break
+        if changed:
+            self.version += 1
+            if rebuilt:
+                self.rebuilds += 1
+                logger.info(f"📸 Snapshot rebuilt: {read} record(s) read from {self.storage.filepath}")
+            else:
+                self.refreshes += 1
+        return self.version
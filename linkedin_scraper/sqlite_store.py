@@ -0,0 +1,203 @@
+"""
+sqlite_store.py — SQLite engine for comment records (WAL mode).
+
+Safe to share between threads and processes: deduplication is enforced by
+unique indexes rather than an in-memory set, so concurrent scrape tasks
+writing to the same database never overwrite each other. Fields without a
+column of their own (``matched_terms``, ``cluster_id``, ...) are kept in a
+JSON ``extra`` column.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+
+from linkedin_scraper.utils import logger
+
+COLUMNS = ("urn", "post_url", "comment", "user_profile_url", "author_name", "label", "scraped_at")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    "index" INTEGER PRIMARY KEY,
+    urn TEXT,
+    post_url TEXT NOT NULL DEFAULT '',
+    comment TEXT NOT NULL DEFAULT '',
+    user_profile_url TEXT,
+    author_name TEXT,
+    label TEXT,
+    scraped_at TEXT,
+    extra TEXT
+);
+-- Same dedup rule as the JSONL store: URN when present, else (post_url, comment)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_urn ON comments(urn) WHERE urn IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_post_comment ON comments(post_url, comment) WHERE urn IS NULL;
+CREATE INDEX IF NOT EXISTS idx_comments_label ON comments(label);
+CREATE INDEX IF NOT EXISTS idx_comments_post_url ON comments(post_url);
+CREATE INDEX IF NOT EXISTS idx_comments_scraped_at ON comments(scraped_at);
+"""
+
+_SELECT = 'SELECT "index", ' + ", ".join(COLUMNS) + ", extra FROM comments"
+
+
+class SqliteStore:
+    """Indexed comment table; one connection per instance, guarded by a lock."""
+
+    def __init__(self, path: str | Path, busy_timeout: float = 30.0) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=busy_timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Rows written with an empty URN all shared one slot in idx_comments_urn
+        self._conn.execute("UPDATE OR IGNORE comments SET urn = NULL WHERE urn = ''")
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def insert(self, entries: list[dict]) -> list[dict]:
+        """
+        Insert entries in one transaction, skipping duplicates. Returns the
+        entries actually inserted, with their ``index`` filled in.
+        """
+        inserted = []
+        with self._lock, self._conn:
+            for entry in entries:
+                cursor = self._conn.execute(
+                    'INSERT OR IGNORE INTO comments (' + ", ".join(COLUMNS) + ', extra) '
+                    'VALUES (' + ", ".join("?" * (len(COLUMNS) + 1)) + ')',
+                    _to_row(entry),
+                )
+                if cursor.rowcount:
+                    entry["index"] = cursor.lastrowid
+                    inserted.append(entry)
+        return inserted
+
+    def update(self, entries: list[dict]) -> None:
+        rows = [(*_to_row(entry), entry["index"]) for entry in entries if entry.get("index") is not None]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE comments SET " + ", ".join(f"{c} = ?" for c in COLUMNS) + ', extra = ? WHERE "index" = ?',
+                rows,
+            )
+
+    def data_version(self) -> int:
+        """Changes whenever another connection (e.g. another process) commits."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+
+    def query(
+        self,
+        label: str | list[str | None] | None = None,
+        post_url: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after_index: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Entries matching every given filter, ordered by ``index``. ``None`` in *label* matches NULL."""
+        clauses, params = [], []
+        if label is not None:
+            labels = [label] if isinstance(label, str) else list(label)
+            values = [value for value in labels if value is not None]
+            clause = f"label IN ({', '.join('?' * len(values))})" if values else "0"
+            if None in labels:
+                clause = f"({clause} OR label IS NULL)"
+            clauses.append(clause)
+            params.extend(values)
+        if post_url is not None:
+            clauses.append("post_url = ?")
+            params.append(post_url)
+        if since is not None:
+            clauses.append("scraped_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("scraped_at < ?")
+            params.append(until)
+        if after_index is not None:
+            clauses.append('"index" > ?')
+            params.append(after_index)
+        sql = _SELECT
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += ' ORDER BY "index"'
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def post_urls(
+        self, offset: int = 0, limit: int | None = None, only: list[str] | None = None
+    ) -> tuple[int, list[str]]:
+        """Total number of posts and one page of their URLs, ordered by first stored comment."""
+        where, params = "post_url != ''", []
+        if only is not None:
+            where += f" AND post_url IN ({', '.join('?' * len(only))})"
+            params.extend(only)
+        sql = f'SELECT post_url FROM comments WHERE {where} GROUP BY post_url ORDER BY MIN("index") LIMIT ? OFFSET ?'
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(DISTINCT post_url) FROM comments WHERE {where}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(sql, [*params, -1 if limit is None else limit, offset]).fetchall()
+        return total, [row[0] for row in rows]
+
+    def iter_all(self, page_size: int = 1000) -> Iterator[dict]:
+        """Every entry in ``index`` order, fetched one page at a time."""
+        after = 0
+        while True:
+            page = self.query(after_index=after, limit=page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1]["index"]
+
+    def import_entries(self, entries: list[dict]) -> int:
+        """Bulk-load existing entries, keeping their indexes."""
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO comments ("index", ' + ", ".join(COLUMNS) + ', extra) '
+                'VALUES (' + ", ".join("?" * (len(COLUMNS) + 2)) + ')',
+                [(entry.get("index"), *_to_row(entry)) for entry in entries],
+            )
+            imported = self._conn.total_changes - before
+        logger.info(f"📦 Imported {imported} comment(s) into {self.path}.")
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _to_row(entry: dict) -> tuple:
+    extra = {k: v for k, v in entry.items() if k not in COLUMNS and k != "index" and v is not None}
+    row = {c: entry.get(c) for c in COLUMNS}
+    # No URN means (post_url, comment) is the identity, as in dedup_key
+    row["urn"] = row["urn"] or None
+    row["post_url"] = row["post_url"] or ""
+    row["comment"] = row["comment"] or ""
+    return (
+        *row.values(),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    )
+
+
+def _from_row(row: tuple) -> dict:
+    entry = {"index": row[0]}
+    entry.update(zip(COLUMNS, row[1:-1]))
+    if row[-1]:
+        entry.update(json.loads(row[-1]))
+    return entry
@@ -0,0 +1,173 @@
+"""
+stats.py — Running label aggregates over the stored comments.
+
+Counts by label overall, per platform, per post, per author and per day,
+plus the authors with the most offensive comments. They are built in one
+streaming pass over the archive and then kept current from the records
+written since (``Storage.read_changes``), so nothing is ever recomputed
+from scratch unless the storage itself is rewritten.
+"""
+
+import heapq
+import threading
+from collections import Counter, defaultdict
+
+from linkedin_scraper.comment_index import platform_of
+from linkedin_scraper.storage import Storage
+from linkedin_scraper.utils import logger
+
+# Labels the dashboard counts as hate
+OFFENSIVE_LABELS = frozenset({"hate", "toxic", "severe_toxic", "identity_hate"})
+TOP_AUTHORS = 10
+# Records read per round while catching up
+BATCH_SIZE = 5000
+
+
+class CommentStats:
+    """Label counters over a ``Storage``; ``refresh`` applies what was written since."""
+
+    def __init__(self, storage: Storage, top_authors: int = TOP_AUTHORS) -> None:
+        self.storage = storage
+        self.top_authors = top_authors
+        self.version = 0
+        self._cursor = None
+        self._lock = threading.Lock()
+        self._clear()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> int:
+        """Catch up with storage, a batch at a time; returns the current version."""
+        with self._lock:
+            changed = rebuilt = False
+            while True:
+                records, cursor, reset = self.storage.read_changes(self._cursor, BATCH_SIZE)
+                self._cursor = cursor
+                if reset and (records or self.comments):
+                    self._clear()
+                    changed = rebuilt = True
+                if records:
+                    self._apply(records)
+                    changed = True
+                if len(records) < BATCH_SIZE:
+                    break
+            if changed:
+                self.version += 1
+                self._summary = None
+            if rebuilt:
+                logger.info(f"📊 Stats built from {self.storage.filepath}: {self.comments} comment(s)")
+            return self.version
+
+    def summary(self) -> dict:
+        """Totals, per-platform and per-day counts and top authors (cached per version)."""
+        with self._lock:
+            if self._summary is None:
+                self._summary = {
+                    "version": self.version,
+                    "comments": self.comments,
+                    "posts": len(self._posts),
+                    "offensive": self._offensive_total,
+                    "labels": _nonzero(self._labels),
+                    "platforms": {
+                        platform: {
+                            "posts": self._platform_posts[platform],
+                            "comments": sum(labels.values()),
+                            "offensive": _offensive(labels),
+                            "labels": _nonzero(labels),
+                        }
+                        for platform, labels in self._platforms.items()
+                    },
+                    "days": {day: _nonzero(labels) for day, labels in sorted(self._days.items())},
+                    "top_authors": [
+                        {
+                            "author": author,
+                            "offensive": count,
+                            "comments": sum(self._authors[author].values()),
+                        }
+                        for author, count in self._top
+                    ],
+                }
+            return self._summary
+
+    def post(self, post_url: str) -> dict | None:
+        labels = self._posts.get(post_url)
+        return None if labels is None else _breakdown(labels)
+
+    def author(self, author: str) -> dict | None:
+        labels = self._authors.get(author)
+        return None if labels is None else _breakdown(labels)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _clear(self) -> None:
+        self.comments = 0
+        self._offensive_total = 0
+        self._labels: Counter = Counter()
+        self._platforms: defaultdict[str, Counter] = defaultdict(Counter)
+        self._platform_posts: Counter = Counter()
+        self._posts: dict[str, Counter] = {}
+        self._authors: defaultdict[str, Counter] = defaultdict(Counter)
+        self._days: defaultdict[str, Counter] = defaultdict(Counter)
+        self._offenders: Counter = Counter()
+        self._top: list[tuple[str, int]] = []
+        # index -> label last counted, to move a relabelled comment between counts
+        self._seen: dict[int, str] = {}
+        self._summary: dict | None = None
+
+    def _apply(self, records: list[dict]) -> None:
+        offenders_changed = False
+        for record in records:
+            post_url = record.get("post_url")
+            if not post_url:
+                continue
+            label = record.get("label") or "unknown"
+            index = record.get("index")
+            old = self._seen.get(index) if index is not None else None
+            if old == label:
+                continue
+            if index is not None:
+                self._seen[index] = label
+            author = record.get("author_name") or ""
+            if old is not None:
+                self._count(record, post_url, author, old, -1)
+            else:
+                self.comments += 1
+            self._count(record, post_url, author, label, 1)
+            if author and (old in OFFENSIVE_LABELS) != (label in OFFENSIVE_LABELS):
+                offenders_changed = True
+        if offenders_changed:
+            top = heapq.nlargest(self.top_authors, self._offenders.items(), key=lambda item: (item[1], item[0]))
+            self._top = [(author, count) for author, count in top if count > 0]
+
+    def _count(self, record: dict, post_url: str, author: str, label: str, delta: int) -> None:
+        self._labels[label] += delta
+        platform = platform_of(post_url)
+        if post_url not in self._posts:
+            self._posts[post_url] = Counter()
+            self._platform_posts[platform] += 1
+        self._posts[post_url][label] += delta
+        self._platforms[platform][label] += delta
+        self._authors[author][label] += delta
+        day = (record.get("scraped_at") or "")[:10] or "unknown"
+        self._days[day][label] += delta
+        if label in OFFENSIVE_LABELS:
+            self._offensive_total += delta
+            if author:
+                self._offenders[author] += delta
+
+
+def _offensive(labels: Counter) -> int:
+    return sum(count for label, count in labels.items() if label in OFFENSIVE_LABELS)
+
+
+def _breakdown(labels: Counter) -> dict:
+    return {"comments": sum(labels.values()), "offensive": _offensive(labels), "labels": _nonzero(labels)}
+
+
+def _nonzero(labels: Counter) -> dict:
+    # Relabelling leaves zero counts behind
+    return {label: count for label, count in labels.items() if count}
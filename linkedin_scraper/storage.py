@@ -1,28 +1,75 @@
 """
-storage.py — JSON persistence layer: deduplication, auto-indexing, append-only.
+storage.py — Persistence layer: deduplication, auto-indexing, append-only JSONL or SQLite.
 """
 
 import json
+import os
+import threading
+from contextlib import ExitStack
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Iterator
 
+from linkedin_scraper.dedup_index import DedupIndex, dedup_key
+from linkedin_scraper.jsonl_store import JsonlStore
+from linkedin_scraper.sqlite_store import SqliteStore
 from linkedin_scraper.utils import logger
 
-DEFAULT_OUTPUT = "comments.json"
+# "jsonl" (default) or "sqlite"
+DEFAULT_BACKEND = os.environ.get("STORAGE_BACKEND", "jsonl").lower()
+DEFAULT_OUTPUT = "comments.jsonl"
+DEFAULT_SQLITE_OUTPUT = "comments.sqlite3"
 
 
 class Storage:
-    """Stores scraped comments in a JSON file with dedup and auto-incrementing index."""
+    """
+    Stores scraped comments with dedup and auto-incrementing index, either in
+    an append-only JSONL log or in a SQLite database (``STORAGE_BACKEND``).
+    """
 
-    def __init__(self, filepath: str = DEFAULT_OUTPUT) -> None:
-        self.filepath = Path(filepath)
-        self.data: list[dict] = []
-        self._seen: set[tuple[str, str]] = set()  # (post_url, comment_text)
-        self._load()
+    def __init__(self, filepath: str | None = None, backend: str | None = None) -> None:
+        self.backend = (backend or DEFAULT_BACKEND).lower()
+        if self.backend not in ("jsonl", "sqlite"):
+            raise ValueError(f"Unknown storage backend '{self.backend}' (expected 'jsonl' or 'sqlite')")
+        default = DEFAULT_SQLITE_OUTPUT if self.backend == "sqlite" else DEFAULT_OUTPUT
+        path = Path(filepath or os.environ.get("STORAGE_PATH") or default)
 
-    # ------------------------------------------------------------------
-    # Public API
-    # ------------------------------------------------------------------
+        self._data: list[dict] | None = []
+        self._last_index = 0
+        self._live = 0
+        self._pending: list[dict] = []
+        self._updated: dict[int, dict] = {}
+        self._store: JsonlStore | None = None
+        self._index: DedupIndex | None = None
+        self._db: SqliteStore | None = None
+        # In-place SQLite updates, so read_changes knows to re-read everything
+        self._rewrites = 0
+        # ((inode, size) of the log mapped, post_url -> offsets), reused while the log is unchanged
+        self._offsets: tuple[tuple[int, int], dict] | None = None
+        # Guards the JSONL log: the shared writer saves while readers may load
+        self._lock = threading.RLock()
+
+        if self.backend == "sqlite":
+            self.filepath = path
+            self._data = None  # loaded lazily; prefer query()/iter_comments()
+            self._db = SqliteStore(path)
+            if self._db.count() == 0:
+                self._import_into_sqlite(path.with_suffix(".jsonl"), path.with_suffix(".json"))
+            return
+
+        legacy = path.with_suffix(".json")
+        if path.suffix == ".json":
+            # Old-style path: keep working, but on the JSONL log next to it
+            path = path.with_suffix(".jsonl")
+        self.filepath = path
+        self._store = JsonlStore(path)
+        self._index = DedupIndex(path)
+        if not path.exists() and legacy.exists():
+            try:
+                self._store.migrate_from_json(legacy)
+            except (ValueError, OSError) as exc:
+                logger.warning(f"Could not migrate {legacy}: {exc}")
+        self._open()
 
     # ------------------------------------------------------------------
     # Public API
@@ -33,27 +80,22 @@ class Storage:
         Add a batch of comment dicts. Each dict should contain at least:
           - post_url
           - comment
-        Optional keys: user_profile_url, urn
+        Optional keys: user_profile_url, urn, matched_terms, cluster_id, votes, likes,
+        parent_urn, commented_at
         """
-        added = 0
+        entries = []
+        keys = []
         for item in comments:
             urn = item.get("urn")
             post_url = item.get("post_url", "")
             text = item.get("comment", "")
             
-            # Primary key: URN. Fallback: (post_url, text)
-            if urn:
-                key = urn
-            else:
-                key = (post_url, text)
-            
-            if key in self._seen or (not urn and not text):
+            if not urn and not text:
                 continue
-                
-            self._seen.add(key)
 
+            # Primary key: URN. Fallback: (post_url, text)
+            keys.append(dedup_key(urn, post_url, text))
             entry = {
-                "index": self._next_index(),
                 "urn": urn,
                 "post_url": post_url,
                 "comment": text,
@@ -62,47 +104,313 @@ class Storage:
                 "label": item.get("label", "unknown"),
                 "scraped_at": datetime.now(timezone.utc).isoformat(),
             }
-            self.data.append(entry)
-            added += 1
+            if item.get("matched_terms"):
+                entry["matched_terms"] = item["matched_terms"]
+            if item.get("cluster_id"):
+                entry["cluster_id"] = item["cluster_id"]
+            # Engagement: YouTube votes, Instagram likes
+            for key in ("votes", "likes"):
+                if item.get(key) is not None:
+                    entry[key] = item[key]
+            # Thread position and exact time, where the scraper knows them
+            for key in ("parent_urn", "commented_at"):
+                if item.get(key):
+                    entry[key] = item[key]
+            entries.append(entry)
+
+        if self._db is not None:
+            # Unique indexes do the deduplication, across every writer
+            inserted = self._db.insert(entries)
+            if self._data is not None:
+                self._data.extend(inserted)
+            return len(inserted)
 
-        return added
+        with self._lock:
+            entries = [entry for entry, new in zip(entries, self._index.add_new(keys)) if new]
+            for entry in entries:
+                self._last_index += 1
+                entry["index"] = self._last_index
+            if self._data is not None:
+                self._data.extend(entries)
+            self._pending.extend(entries)
+            self._live += len(entries)
+        return len(entries)
+
+    def update(self, entries: list[dict]) -> None:
+        """
+        Mark stored entries (e.g. relabelled in place) to be rewritten on the
+        next save. When the entries are loaded, the given dicts replace them,
+        so updating a copy doesn't leave the old version behind in ``data``.
+        """
+        with self._lock:
+            if self._data is not None:
+                self._replace_loaded(entries)
+        if self._db is not None:
+            self._db.update(entries)
+            self._rewrites += 1
+            return
+        with self._lock:
+            for entry in entries:
+                if entry.get("index") is not None:
+                    self._updated[entry["index"]] = entry
 
     def save(self) -> None:
-        """Persist current data to disk."""
-        with open(self.filepath, "w", encoding="utf-8") as fh:
-            json.dump(self.data, fh, indent=2, ensure_ascii=False)
-        logger.info(f"💾 Saved {len(self.data)} comment(s) to {self.filepath}")
+        """Append new and updated entries to the log; compact it when mostly stale."""
+        if self._db is not None:
+            # Inserts and updates are committed as they happen
+            logger.info(f"💾 {self.total} comment(s) in {self.filepath}")
+            return
+        with self._lock:
+            # Entries added since the last save are written with their current state anyway
+            fresh = {entry["index"] for entry in self._pending}
+            pending = self._pending + [e for i, e in self._updated.items() if i not in fresh]
+            self._store.append(pending)
+            self._pending = []
+            self._updated = {}
+            if self._store.needs_compaction(self._live):
+                # Streams the log's latest versions; the entries need not be loaded
+                self._store.compact()
+            self._index.flush(self._index_meta())
+        logger.info(f"💾 Saved {len(pending)} new/updated comment(s) to {self.filepath} ({self._live} total)")
 
     @property
     def total(self) -> int:
-        return len(self.data)
+        if self._db is not None:
+            return self._db.count()
+        return self._live
+
+    @property
+    def data(self) -> list[dict]:
+        """Every stored entry, loaded on first access; prefer ``query``/``iter_comments``."""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    if self._db is not None:
+                        self._data = list(self._db.iter_all())
+                    else:
+                        # Saved entries from the log, plus any not saved yet
+                        self._data = self._store.load() + self._pending
+        return self._data
+
+    def query(
+        self,
+        label: str | list[str | None] | None = None,
+        post_url: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after_index: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Entries matching every given filter (``scraped_at`` in ``[since, until)``), by index."""
+        if self._db is not None:
+            return self._db.query(label, post_url, since, until, after_index, limit)
+        labels = {label} if isinstance(label, str) else set(label) if label is not None else None
+        found = []
+        for entry in self.data:
+            if labels is not None and entry.get("label") not in labels:
+                continue
+            if post_url is not None and entry.get("post_url") != post_url:
+                continue
+            scraped_at = entry.get("scraped_at") or ""
+            if (since is not None and scraped_at < since) or (until is not None and scraped_at >= until):
+                continue
+            if after_index is not None and (entry.get("index") or 0) <= after_index:
+                continue
+            found.append(entry)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def posts(
+        self, offset: int = 0, limit: int | None = None, post_urls: list[str] | None = None
+    ) -> tuple[int, list[tuple[str, list[dict]]]]:
+        """
+        Comments grouped by ``post_url`` (posts in first-seen order), one page
+        at a time: returns the total number of posts and the requested slice.
+        Only the returned posts' records are decoded.
+        """
+        with ExitStack() as stack:
+            order, load = self._open_posts(stack, post_urls)
+            page = order[offset:None if limit is None else offset + limit]
+            return len(order), [(url, load(url)) for url in page]
+
+    def post_order(self) -> list[str]:
+        """Every post URL in first-seen order, without decoding any records."""
+        with ExitStack() as stack:
+            return self._open_posts(stack, None)[0]
+
+    def iter_posts(self, post_urls: list[str] | None = None) -> Iterator[tuple[str, list[dict]]]:
+        """Like ``posts`` without paging, decoding one post at a time as it is consumed."""
+        with ExitStack() as stack:
+            order, load = self._open_posts(stack, post_urls)
+            for url in order:
+                yield url, load(url)
+
+    def read_changes(self, cursor=None, limit: int | None = None) -> tuple[list[dict], object, bool]:
+        """
+        Saved entries written since *cursor* (from a previous call; None for
+        everything), at most *limit* at a time, the new cursor, and whether
+        this is a full re-read that replaces everything read before. Newer
+        versions of entries already read come back with the same ``index``.
+        """
+        if self._db is None:
+            return self._store.read_from(cursor, limit)
+        # Rewrites in place (ours or another process's) can't be read incrementally
+        after, seen = cursor or (None, None)
+        # Taken before reading, so a change made meanwhile shows up next time
+        now = (self._rewrites, self._db.data_version())
+        reset = seen != now
+        entries = self._db.query(after_index=None if reset else after, limit=limit)
+        after = entries[-1]["index"] if entries else (0 if reset else after)
+        return entries, (after, now), reset
+
+    def iter_comments(self) -> Iterator[dict]:
+        """
+        Stream every entry without materialising the whole store. SQLite
+        pages through it; the JSONL log is decoded one post at a time
+        (latest versions, grouped by post), like ``iter_posts``.
+        """
+        if self._data is not None:
+            return iter(self._data)
+        if self._db is not None:
+            return self._db.iter_all()
+        return (entry for _, comments in self.iter_posts() for entry in comments)
+
+    def unlabelled(self) -> list[dict]:
+        """Entries still waiting for a label (missing, unknown, pending or empty)."""
+        return self.query(label=[None, "unknown", "pending", ""])
 
     # ------------------------------------------------------------------
     # Internals
     # ------------------------------------------------------------------
 
-    def _load(self) -> None:
-        """Load existing JSON data from disk (if any)."""
-        if not self.filepath.exists():
+    def _open_posts(
+        self, stack: ExitStack, post_urls: list[str] | None
+    ) -> tuple[list[str], Callable[[str], list[dict]]]:
+        """Post URLs in first-seen order, and a loader for one post's comments."""
+        wanted = set(post_urls) if post_urls is not None else None
+        if self._db is not None:
+            _, order = self._db.post_urls(only=post_urls)
+            return order, lambda url: self._db.query(post_url=url)
+
+        with self._lock:
+            if self._data is not None:
+                grouped = _group(self._data)
+                order = [url for url in grouped if wanted is None or url in wanted]
+                return order, lambda url: list(grouped[url])
+            # Mapped under the lock so the view and the unsaved entries line up
+            view, inode = stack.enter_context(self._store.snapshot())
+            pending = list(self._pending)
+            updated = dict(self._updated)
+
+        # The log only grows until it is replaced, so the same inode and size
+        # mean the same bytes
+        key = (inode, len(view))
+        cached = self._offsets
+        if cached is not None and cached[0] == key:
+            offsets = cached[1]
+        else:
+            offsets = self._store.post_offsets(view)
+            self._offsets = (key, offsets)
+        unsaved = _group(pending)
+        order = list(offsets) + [url for url in unsaved if url not in offsets]
+        if wanted is not None:
+            order = [url for url in order if url in wanted]
+
+        def load(url: str) -> list[dict]:
+            comments = self._store.read_at(view, offsets.get(url, []))
+            comments = [updated.get(entry.get("index"), entry) for entry in comments]
+            return comments + unsaved.get(url, [])
+
+        return order, load
+
+    def _replace_loaded(self, entries: list[dict]) -> None:
+        """Put *entries* in place of the loaded entries with the same ``index`` (lock held)."""
+        positions = None
+        for entry in entries:
+            index = entry.get("index")
+            if index is None:
+                continue
+            # Indexes are handed out from 1 in load order, so try that slot first
+            i = index - 1
+            if not (0 <= i < len(self._data) and self._data[i].get("index") == index):
+                if positions is None:
+                    positions = {e.get("index"): pos for pos, e in enumerate(self._data)}
+                i = positions.get(index)
+                if i is None:
+                    continue
+            self._data[i] = entry
+
+    def _open(self) -> None:
+        """
+        Open the log. With an up-to-date dedup index only its metadata is
+        read; records are loaded lazily. Otherwise the log is loaded once and
+        the index rebuilt from it.
+        """
+        meta = self._index.load()
+        if meta is not None and meta.get("log") == self._log_signature():
+            self._last_index = meta["last_index"]
+            self._live = meta["live"]
+            self._store.lines = meta["lines"]
+            self._data = None
+            logger.info(f"Opened {self.filepath}: {self._live} existing comment(s)")
             return
+        self._load()
+
+    def _load(self) -> None:
+        """Load existing records from the log (if any) and rebuild the dedup index."""
+        self._data = []
+        if self.filepath.exists():
+            try:
+                self._data = self._store.load()
+                logger.info(f"Loaded {len(self._data)} existing comment(s) from {self.filepath}")
+            except OSError as exc:
+                logger.warning(f"Could not load {self.filepath}: {exc}")
+                self._data = []
+        keys = []
+        for entry in self._data:
+            self._last_index = max(self._last_index, entry.get("index") or 0)
+            # Old data without URN falls back to (post_url, comment)
+            keys.append(dedup_key(entry.get("urn"), entry.get("post_url", ""), entry.get("comment", "")))
+        self._live = len(self._data)
+        # In memory only; the next save writes it, so read-only openers never touch the files
+        self._index.rebuild(keys)
+
+    def _log_signature(self) -> list[int]:
+        """(size, mtime) of the log, to tell whether the index still matches it."""
         try:
-            with open(self.filepath, "r", encoding="utf-8") as fh:
-                self.data = json.load(fh)
-            for entry in self.data:
-                urn = entry.get("urn")
-                if urn:
-                    self._seen.add(urn)
-                else:
-                    # Fallback for old data without URN
-                    key = (entry.get("post_url", ""), entry.get("comment", ""))
-                    self._seen.add(key)
-                    
-            logger.info(f"Loaded {len(self.data)} existing comment(s) from {self.filepath}")
-        except (json.JSONDecodeError, OSError) as exc:
-            logger.warning(f"Could not load {self.filepath}: {exc}")
-            self.data = []
-
-    def _next_index(self) -> int:
-        if not self.data:
-            return 1
-        return max(entry.get("index", 0) for entry in self.data) + 1
+            stat = self.filepath.stat()
+        except OSError:
+            return [0, 0]
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _index_meta(self) -> dict:
+        return {
+            "log": self._log_signature(),
+            "last_index": self._last_index,
+            "live": self._live,
+            "lines": self._store.lines,
+        }
+
+    def _import_into_sqlite(self, jsonl: Path, legacy: Path) -> None:
+        """Seed an empty database from an existing JSONL log or legacy JSON array."""
+        try:
+            if jsonl.exists():
+                entries = JsonlStore(jsonl).load()
+            elif legacy.exists():
+                with open(legacy, "r", encoding="utf-8") as fh:
+                    entries = json.load(fh)
+            else:
+                return
+            self._db.import_entries(entries)
+        except (ValueError, OSError) as exc:
+            logger.warning(f"Could not import existing comments into {self.filepath}: {exc}")
+
+
+def _group(entries: list[dict]) -> dict[str, list[dict]]:
+    grouped: dict[str, list[dict]] = {}
+    for entry in entries:
+        if entry.get("post_url"):
+            grouped.setdefault(entry["post_url"], []).append(entry)
+    return grouped
+
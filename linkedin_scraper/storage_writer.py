@@ -0,0 +1,199 @@
+"""
+storage_writer.py — Single-writer storage service with group commit.
+
+One background thread owns the ``Storage`` instance. Any task can submit a
+batch of comments; the writer coalesces everything that arrives within a
+short window (or until a size threshold) into one add/save round and
+acknowledges each batch with how many comments were new vs duplicates.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from linkedin_scraper.storage import Storage
+from linkedin_scraper.utils import logger
+
+# Commit once this many comments are waiting...
+DEFAULT_MAX_BATCH = int(os.environ.get("STORAGE_GROUP_COMMIT_SIZE", "500"))
+# ...or once the oldest waiting batch is this old (seconds).
+DEFAULT_MAX_DELAY = float(os.environ.get("STORAGE_GROUP_COMMIT_DELAY", "0.05"))
+
+_STOP = object()
+
+
+@dataclass
+class WriteAck:
+    """Acknowledgement for one submitted batch."""
+
+    submitted: int
+    added: int
+    duplicates: int
+    latency: float
+
+
+@dataclass
+class _Request:
+    comments: list[dict]
+    future: Future
+    queued_at: float
+    update: bool = False
+
+
+class StorageWriter:
+    """Owns a ``Storage`` and serialises every write to it through one thread."""
+
+    def __init__(
+        self,
+        storage: Storage | None = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ) -> None:
+        self.storage = storage or Storage()
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay)
+
+        self.batches = 0
+        self.commits = 0
+        self.comments_written = 0
+        self.duplicates = 0
+        self.failures = 0
+        self._latencies: deque[float] = deque(maxlen=1000)
+        self._commit_sizes: deque[int] = deque(maxlen=1000)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, comments: list[dict]) -> "Future[WriteAck]":
+        """Queue a batch for the next group commit; the future resolves to a ``WriteAck``."""
+        future: Future = Future()
+        self._queue.put(_Request(comments, future, time.monotonic()))
+        return future
+
+    def write(self, comments: list[dict]) -> WriteAck:
+        """Submit a batch and wait for its acknowledgement."""
+        return self.submit(comments).result()
+
+    def update(self, entries: list[dict]) -> "Future[WriteAck]":
+        """Queue rewrites of already-stored entries (e.g. after relabelling)."""
+        future: Future = Future()
+        self._queue.put(_Request(entries, future, time.monotonic(), update=True))
+        return future
+
+    def flush(self) -> None:
+        """Block until everything submitted so far is committed."""
+        self.write([])
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        sizes = self._commit_sizes
+        return {
+            "batches": self.batches,
+            "commits": self.commits,
+            "comments_written": self.comments_written,
+            "duplicates": self.duplicates,
+            "failures": self.failures,
+            "queued": self._queue.qsize(),
+            "avg_batches_per_commit": round(self.batches / self.commits, 2) if self.commits else 0.0,
+            "avg_commit_size": round(sum(sizes) / len(sizes), 1) if sizes else 0.0,
+            "write_latency_p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+            "write_latency_p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+            "write_latency_max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            group = [first]
+            size = len(first.comments)
+            deadline = first.queued_at + self.max_delay
+            stop = False
+            while size < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stop = True
+                    break
+                group.append(request)
+                size += len(request.comments)
+            self._commit(group, size)
+            if stop:
+                return
+
+    def _commit(self, group: list[_Request], size: int) -> None:
+        try:
+            added = []
+            for request in group:
+                if request.update:
+                    self.storage.update(request.comments)
+                    added.append(len(request.comments))
+                else:
+                    added.append(self.storage.add_comments(request.comments) if request.comments else 0)
+            if size:
+                self.storage.save()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Storage group commit of {len(group)} batch(es) failed: {e}")
+            for request in group:
+                request.future.set_exception(e)
+            return
+
+        now = time.monotonic()
+        if size:
+            self.commits += 1
+            self._commit_sizes.append(size)
+        for request, count in zip(group, added):
+            latency = now - request.queued_at
+            if not request.comments:
+                request.future.set_result(WriteAck(0, 0, 0, latency))
+                continue
+            self.batches += 1
+            self._latencies.append(latency)
+            duplicates = 0 if request.update else len(request.comments) - count
+            self.comments_written += count
+            self.duplicates += duplicates
+            request.future.set_result(WriteAck(len(request.comments), count, duplicates, latency))
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ---------------------------------------------------------------------------
+# Shared writer (one per process)
+# ---------------------------------------------------------------------------
+
+_writer: StorageWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> StorageWriter:
+    """Return the process-wide writer, creating it (and its Storage) on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = StorageWriter()
+        return _writer
@@ -0,0 +1,338 @@
+"""
+triage.py — Local, CPU-only first-pass classifier.
+
+A hashed character n-gram softmax regression scored with NumPy. Confident
+predictions are labelled locally; only the uncertain band is escalated to
+the LLM. Train it from the labels already in ``comments.jsonl``:
+
+    python -m linkedin_scraper.triage --input comments.jsonl
+"""
+
+import argparse
+import os
+import random
+import sys
+
+import numpy as np
+
+# Ensure project root is in path so `linkedin_scraper` package is importable
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from linkedin_scraper.label_cache import normalize_text
+from linkedin_scraper.utils import logger
+
+DEFAULT_MODEL_PATH = os.environ.get("TRIAGE_MODEL_PATH", "triage_model.npz")
+# Auto-label as 'safe' at or above this probability
+DEFAULT_SAFE_THRESHOLD = float(os.environ.get("TRIAGE_SAFE_THRESHOLD", "0.95"))
+# Auto-label 'hate'/'sarcasm' at or above this probability (> 1 disables)
+DEFAULT_FLAG_THRESHOLD = float(os.environ.get("TRIAGE_FLAG_THRESHOLD", "0.99"))
+# Fraction of auto-labelled comments still sent to the LLM to measure agreement
+DEFAULT_AUDIT_RATE = float(os.environ.get("TRIAGE_AUDIT_RATE", "0.02"))
+
+LABELS = ("hate", "sarcasm", "safe")
+NGRAM_SIZES = (2, 3, 4, 5)
+DEFAULT_FEATURES = 1 << 18
+
+_PRIME = np.uint64(1099511628211)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+def featurize(texts: list[str], n_features: int = DEFAULT_FEATURES) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hash every character n-gram of every text in one vectorized pass.
+    Returns ``(rows, cols, scale)``: document index and feature bucket per
+    n-gram, plus a per-document 1/sqrt(n-grams) normalisation factor.
+    """
+    docs = [f" {normalize_text(t)} " for t in texts]
+    lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+    codes = np.frombuffer("".join(docs).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    doc_of = np.repeat(np.arange(len(docs)), lengths)
+    ends = np.cumsum(lengths)
+
+    rows_parts, cols_parts = [], []
+    with np.errstate(over="ignore"):
+        for n in NGRAM_SIZES:
+            m = len(codes) - n + 1
+            if m <= 0:
+                continue
+            h = np.full(m, n, dtype=np.uint64)
+            for k in range(n):
+                h = h * _PRIME + codes[k:k + m]
+            h ^= h >> np.uint64(33)
+            h *= _MIX
+            h ^= h >> np.uint64(29)
+
+            starts = doc_of[:m]
+            # Drop windows that straddle two documents
+            valid = np.arange(m) + n <= ends[starts]
+            rows_parts.append(starts[valid])
+            cols_parts.append((h[valid] % np.uint64(n_features)).astype(np.int64))
+
+    rows = np.concatenate(rows_parts) if rows_parts else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols_parts) if cols_parts else np.zeros(0, dtype=np.int64)
+    counts = np.bincount(rows, minlength=len(docs)).astype(np.float32)
+    scale = 1.0 / np.sqrt(np.maximum(counts, 1.0))
+    return rows, cols, scale
+
+
+class TriageModel:
+    """Hashed n-gram softmax regression over ``LABELS``."""
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES) -> None:
+        self.n_features = n_features
+        self.weights = np.zeros((n_features, len(LABELS)), dtype=np.float32)
+        self.bias = np.zeros(len(LABELS), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """Return an ``(n_texts, n_labels)`` probability matrix."""
+        if not texts:
+            return np.zeros((0, len(LABELS)), dtype=np.float32)
+        rows, cols, scale = featurize(texts, self.n_features)
+        return self._forward(rows, cols, scale, len(texts))
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def fit(
+        self,
+        texts: list[str],
+        labels: list[str],
+        epochs: int = 6,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        batch_size: int = 512,
+        seed: int = 13,
+    ) -> "TriageModel":
+        """Mini-batch gradient descent with balanced class weights and AdaGrad steps."""
+        y = np.array([LABELS.index(label) for label in labels], dtype=np.int64)
+        freq = np.bincount(y, minlength=len(LABELS)).astype(np.float32)
+        class_weight = np.where(freq > 0, len(y) / (len(LABELS) * np.maximum(freq, 1.0)), 0.0)
+
+        grad_sq_w = np.full_like(self.weights, 1e-8)
+        grad_sq_b = np.full_like(self.bias, 1e-8)
+        rng = np.random.default_rng(seed)
+        order = np.arange(len(texts))
+
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            loss = 0.0
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                rows, cols, scale = featurize([texts[i] for i in idx], self.n_features)
+                probs = self._forward(rows, cols, scale, len(idx))
+
+                yb = y[idx]
+                sample_w = class_weight[yb]
+                loss += float(-(sample_w * np.log(probs[np.arange(len(idx)), yb] + 1e-9)).sum())
+
+                delta = probs
+                delta[np.arange(len(idx)), yb] -= 1.0
+                delta *= (sample_w / len(idx))[:, None]
+
+                # Sparse gradient: only the touched feature rows
+                touched, inverse = np.unique(cols, return_inverse=True)
+                contrib = delta[rows] * scale[rows][:, None]
+                grad = np.stack(
+                    [np.bincount(inverse, weights=contrib[:, c], minlength=len(touched)) for c in range(len(LABELS))],
+                    axis=1,
+                ).astype(np.float32)
+                grad += l2 * self.weights[touched]
+
+                grad_sq_w[touched] += grad ** 2
+                self.weights[touched] -= learning_rate * grad / np.sqrt(grad_sq_w[touched])
+                grad_b = delta.sum(axis=0)
+                grad_sq_b += grad_b ** 2
+                self.bias -= learning_rate * grad_b / np.sqrt(grad_sq_b)
+
+            logger.info(f"   epoch {epoch + 1}/{epochs} — loss {loss / max(len(texts), 1):.4f}")
+        return self
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str = DEFAULT_MODEL_PATH) -> None:
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(LABELS))
+        logger.info(f"💾 Saved triage model to {path}")
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "TriageModel":
+        with np.load(path) as data:
+            if tuple(data["labels"]) != LABELS:
+                raise ValueError(f"Triage model labels {tuple(data['labels'])} do not match {LABELS}")
+            model = cls(n_features=data["weights"].shape[0])
+            model.weights = data["weights"].astype(np.float32)
+            model.bias = data["bias"].astype(np.float32)
+        return model
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _forward(self, rows: np.ndarray, cols: np.ndarray, scale: np.ndarray, n_docs: int) -> np.ndarray:
+        weighted = self.weights[cols]
+        logits = np.stack(
+            [np.bincount(rows, weights=weighted[:, c], minlength=n_docs) for c in range(len(LABELS))],
+            axis=1,
+        ).astype(np.float32)
+        logits = logits * scale[:, None] + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+
+
+class Triage:
+    """
+    Routes texts: confident predictions are labelled locally, the rest are
+    escalated. Tracks escalation rate and agreement with the LLM.
+    """
+
+    def __init__(
+        self,
+        model: TriageModel,
+        safe_threshold: float = DEFAULT_SAFE_THRESHOLD,
+        flag_threshold: float = DEFAULT_FLAG_THRESHOLD,
+        audit_rate: float = DEFAULT_AUDIT_RATE,
+    ) -> None:
+        self.model = model
+        self.safe_threshold = safe_threshold
+        self.flag_threshold = flag_threshold
+        self.audit_rate = audit_rate
+
+        self.seen = 0
+        self.auto_labeled = 0
+        self.escalated = 0
+        self.compared = 0
+        self.agreed = 0
+        self.audited = 0
+        self.audit_agreed = 0
+
+    @classmethod
+    def from_path(cls, path: str = DEFAULT_MODEL_PATH, **kwargs) -> "Triage | None":
+        """Load the saved model if one exists, else return None."""
+        if not os.path.exists(path):
+            return None
+        try:
+            triage = cls(TriageModel.load(path), **kwargs)
+        except Exception as e:
+            logger.warning(f"Could not load triage model {path}: {e}")
+            return None
+        logger.info(f"✅ Triage model loaded from {path}")
+        return triage
+
+    def route(self, texts: list[str]) -> tuple[dict[int, str], dict[int, tuple[str, bool]]]:
+        """
+        Returns ``(auto, escalate)``. ``auto`` maps position → local label.
+        ``escalate`` maps position → (local guess, is_audit) for texts that
+        must go to the LLM.
+        """
+        probs = self.model.predict_proba(texts)
+        best = probs.argmax(axis=1)
+        confidence = probs[np.arange(len(texts)), best]
+        safe_idx = LABELS.index("safe")
+        threshold = np.where(best == safe_idx, self.safe_threshold, self.flag_threshold)
+        confident = confidence >= threshold
+
+        auto: dict[int, str] = {}
+        escalate: dict[int, tuple[str, bool]] = {}
+        for pos in range(len(texts)):
+            guess = LABELS[best[pos]]
+            if not confident[pos]:
+                escalate[pos] = (guess, False)
+            elif self.audit_rate and random.random() < self.audit_rate:
+                escalate[pos] = (guess, True)
+            else:
+                auto[pos] = guess
+
+        self.seen += len(texts)
+        self.auto_labeled += len(auto)
+        self.escalated += sum(1 for _, audit in escalate.values() if not audit)
+        return auto, escalate
+
+    def observe(self, guess: str, llm_label: str, audit: bool) -> None:
+        """Record the LLM's verdict for a text this stage escalated."""
+        if llm_label not in LABELS:
+            return
+        if audit:
+            self.audited += 1
+            self.audit_agreed += guess == llm_label
+        else:
+            self.compared += 1
+            self.agreed += guess == llm_label
+
+    def stats(self) -> dict:
+        return {
+            "seen": self.seen,
+            "auto_labeled": self.auto_labeled,
+            "escalated": self.escalated,
+            "escalation_rate": round(self.escalated / self.seen, 3) if self.seen else 0.0,
+            "escalated_agreement": round(self.agreed / self.compared, 3) if self.compared else None,
+            "audited": self.audited,
+            "audit_agreement": round(self.audit_agreed / self.audited, 3) if self.audited else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Training CLI
+# ---------------------------------------------------------------------------
+
+def load_training_data(path: str) -> tuple[list[str], list[str]]:
+    """Labelled ``(texts, labels)`` from a comment store, skipping unknown/error rows."""
+    from linkedin_scraper.storage import Storage
+
+    storage = Storage(path)
+    texts, labels = [], []
+    for entry in storage.iter_comments():
+        text, label = entry.get("comment"), entry.get("label")
+        if text and label in LABELS:
+            texts.append(text)
+            labels.append(label)
+    return texts, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local triage model")
+    parser.add_argument("--input", type=str, default="comments.jsonl", help="Labelled comment store")
+    parser.add_argument("--output", type=str, default=DEFAULT_MODEL_PATH, help="Where to save the model")
+    parser.add_argument("--epochs", type=int, default=6, help="Training epochs")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction held out for evaluation")
+    args = parser.parse_args()
+
+    texts, labels = load_training_data(args.input)
+    if len(texts) < 20:
+        logger.error(f"Only {len(texts)} labelled comment(s) in {args.input}; need at least 20.")
+        return
+
+    order = list(range(len(texts)))
+    random.Random(7).shuffle(order)
+    cut = int(len(order) * (1 - args.holdout))
+    train, test = order[:cut], order[cut:]
+
+    logger.info(f"🧠 Training triage model on {len(train)} comment(s) ...")
+    model = TriageModel().fit([texts[i] for i in train], [labels[i] for i in train], epochs=args.epochs)
+
+    if test:
+        triage = Triage(model, audit_rate=0.0)
+        auto, escalate = triage.route([texts[i] for i in test])
+        agree = sum(auto[pos] == labels[test[pos]] for pos in auto)
+        for pos, (guess, audit) in escalate.items():
+            triage.observe(guess, labels[test[pos]], audit)
+        logger.info(
+            f"   Holdout: {len(auto)}/{len(test)} auto-labelled "
+            f"(agreement {agree / len(auto):.3f})" if auto else "   Holdout: nothing auto-labelled"
+        )
+        logger.info(f"   Holdout stats: {triage.stats()}")
+
+    model.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
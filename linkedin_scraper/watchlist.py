@@ -0,0 +1,335 @@
+"""
+watchlist.py — Instant flagging of known slurs / coded terms before the LLM.
+
+Terms live in a plain-text file (one per line, ``#`` comments allowed).
+Comments and terms are normalised the same way (NFKC, case-folded,
+leetspeak-folded, elongations squeezed) and split into tokens. An
+Aho-Corasick automaton over those tokens finds every multi-word and
+overlapping hit in one pass. A vectorised NumPy word-hash prefilter runs
+over the whole batch first, so clean comments never enter the automaton.
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from linkedin_scraper.utils import logger
+
+DEFAULT_WATCHLIST_PATH = os.environ.get("WATCHLIST_PATH", "watchlist.txt")
+# "skip": watchlist hits are labelled 'hate' without an LLM call.
+# "prioritize": hits are sent to the LLM first, ahead of everything else.
+DEFAULT_MODE = os.environ.get("WATCHLIST_MODE", "skip")
+
+_LEET_MAP = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s",
+    "7": "t", "8": "b", "9": "g", "@": "a", "$": "s", "€": "e",
+})
+# '!' and '|' only stand in for letters inside a word ("b!tch", "|oser")
+_INNER_BANG_RE = re.compile(r"!(?=\w)")
+_INNER_PIPE_RE = re.compile(r"\|(?=\w)")
+_REPEAT_RE = re.compile(r"(\w)\1{2,}")
+
+_PRIME = 16777619
+_PRIME_INV = pow(_PRIME, -1, 1 << 32)
+_NEWLINE = ord("\n")
+_SPACE = ord(" ")
+
+# isalnum() for every BMP code point; astral ones are looked up on demand
+_BMP_IS_WORD = np.array([chr(c).isalnum() for c in range(0x10000)], dtype=bool)
+# Powers of _PRIME and its inverse (mod 2**32), grown on demand and shared
+_powers = np.ones(1, dtype=np.uint32)
+_inverse_powers = np.ones(1, dtype=np.uint32)
+
+
+def _power_tables(n: int) -> tuple[np.ndarray, np.ndarray]:
+    global _powers, _inverse_powers
+    if len(_powers) < n:
+        size = max(n, 2 * len(_powers))
+        with np.errstate(over="ignore"):
+            powers = np.full(size, _PRIME, dtype=np.uint32)
+            powers[0] = 1
+            inverse = np.full(size, _PRIME_INV, dtype=np.uint32)
+            inverse[0] = 1
+            _powers = np.cumprod(powers, dtype=np.uint32)
+            _inverse_powers = np.cumprod(inverse, dtype=np.uint32)
+    return _powers[:n], _inverse_powers[:n]
+
+
+class FoldedBatch:
+    """
+    A batch of texts normalised for matching in a handful of C/NumPy passes:
+    NFKC + case-fold, leetspeak folding, elongation squeezing and non-word
+    characters turned into spaces. Every folded word gets a 32-bit hash;
+    collisions only cost an extra exact check in the automaton.
+    """
+
+    def __init__(self, texts: list[str]) -> None:
+        self._fold("\n".join(texts))
+        if len(self._newlines) != max(len(texts) - 1, 0):
+            # Some text contained its own newlines
+            self._fold("\n".join(text.replace("\n", " ") for text in texts))
+
+    def lines_with(self, vocabulary_hashes: np.ndarray) -> list[int]:
+        """Indexes of the texts containing at least one word hashed in sorted *vocabulary_hashes*."""
+        if not len(vocabulary_hashes) or not len(self.hashes):
+            return []
+        pos = np.searchsorted(vocabulary_hashes, self.hashes)
+        np.minimum(pos, len(vocabulary_hashes) - 1, out=pos)
+        hit = np.flatnonzero(vocabulary_hashes[pos] == self.hashes)
+        if not len(hit):
+            return []
+        return np.unique(np.searchsorted(self._newlines, self.starts[hit])).tolist()
+
+    def line(self, i: int) -> str:
+        """Folded text of input *i*."""
+        start = self._newlines[i - 1] + 1 if i else 0
+        end = self._newlines[i] if i < len(self._newlines) else len(self._codes)
+        return self._codes[start:end].tobytes().decode(self._encoding)
+
+    def _fold(self, joined: str) -> None:
+        joined = unicodedata.normalize("NFKC", joined).casefold()
+        joined = _INNER_BANG_RE.sub("i", joined)
+        joined = _INNER_PIPE_RE.sub("l", joined)
+        joined = joined.translate(_LEET_MAP)
+
+        if joined.isascii():
+            self._encoding = "ascii"
+            codes = np.frombuffer(joined.encode("ascii"), dtype=np.uint8).copy()
+        else:
+            self._encoding = "utf-32-le"
+            codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).copy()
+        n = len(codes)
+
+        # Word characters: alphanumerics
+        if self._encoding == "ascii" or not n or codes.max() < 0x10000:
+            is_word = np.take(_BMP_IS_WORD, codes)
+        else:
+            bmp = codes < 0x10000
+            is_word = np.zeros(n, dtype=bool)
+            is_word[bmp] = np.take(_BMP_IS_WORD, codes[bmp])
+            astral = np.flatnonzero(~bmp)
+            uniques, inverse = np.unique(codes[astral], return_inverse=True)
+            is_word[astral] = np.array([chr(c).isalnum() for c in uniques.tolist()], dtype=bool)[inverse]
+
+        # Squeeze elongations: runs of 3+ identical word characters become one
+        if n > 2 and ((codes[2:] == codes[1:-1]) & (codes[1:-1] == codes[:-2])).any():
+            new_run = np.empty(n, dtype=bool)
+            new_run[0] = True
+            np.not_equal(codes[1:], codes[:-1], out=new_run[1:])
+            run_id = np.cumsum(new_run) - 1
+            keep = new_run | ~is_word | (np.bincount(run_id)[run_id] < 3)
+            codes, is_word = codes[keep], is_word[keep]
+            n = len(codes)
+        codes[~is_word & (codes != _NEWLINE)] = _SPACE
+
+        # Word spans: +1 where a word starts, -1 one past where it ends
+        flags = is_word.view(np.int8)
+        edges = np.empty(n + 1, dtype=np.int8)
+        if n:
+            edges[0] = flags[0]
+            np.subtract(flags[1:], flags[:-1], out=edges[1:n])
+            edges[n] = -flags[-1]
+        else:
+            edges[0] = 0
+        self.starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        # Polynomial hash per word via prefix sums (mod 2**32)
+        powers, inverse_powers = _power_tables(n)
+        with np.errstate(over="ignore"):
+            prefix = np.zeros(n + 1, dtype=np.uint32)
+            np.cumsum(np.multiply(codes, powers, dtype=np.uint32), dtype=np.uint32, out=prefix[1:])
+            self.hashes = (prefix[ends] - prefix[self.starts]) * inverse_powers[self.starts]
+
+        self._codes = codes
+        self._newlines = np.flatnonzero(codes == _NEWLINE)
+
+
+def fold(text: str) -> list[str]:
+    """Normalise *text* for matching and return its tokens."""
+    return FoldedBatch([text]).line(0).split()
+
+
+class TokenAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is folded tokens. The trie is kept
+    between rebuilds so watchlist edits only insert/retire the changed terms
+    before the failure links and transition table are recomputed.
+    """
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        # Terms ending at each state (several can fold to the same tokens), in insertion order
+        self._terms_at: list[dict[str, None]] = [{}]
+        self._state_of: dict[str, int] = {}
+        # Compiled tables, swapped in atomically by compile()
+        self._tables: tuple[list[dict[str, int]], list[int], list[tuple[str, ...]]] = ([{}], [0], [()])
+        self.vocabulary_hashes = np.zeros(0, dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return len(self._state_of)
+
+    def add(self, term: str) -> bool:
+        tokens = fold(term)
+        if not tokens or term in self._state_of:
+            return False
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                self._goto.append({})
+                self._terms_at.append({})
+                nxt = len(self._goto) - 1
+                self._goto[state][token] = nxt
+            state = nxt
+        self._terms_at[state][term] = None
+        self._state_of[term] = state
+        return True
+
+    def remove(self, term: str) -> bool:
+        state = self._state_of.pop(term, None)
+        if state is None:
+            return False
+        # The state keeps its output while another term still ends there
+        del self._terms_at[state][term]
+        return True
+
+    def compile(self) -> None:
+        """Compute failure links and merged outputs breadth-first."""
+        goto = [dict(edges) for edges in self._goto]
+        fail = [0] * len(goto)
+        outputs: list[tuple[str, ...]] = [()] * len(goto)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # One output per token sequence: the earliest of the terms ending here
+            own = (next(iter(self._terms_at[state])),) if self._terms_at[state] else ()
+            outputs[state] = own + outputs[fail[state]]
+            for token, nxt in goto[state].items():
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = goto[fallback].get(token, 0) if state else 0
+                queue.append(nxt)
+
+        hashes = FoldedBatch(list(self._state_of)).hashes if self._state_of else np.zeros(0, dtype=np.uint32)
+        self._tables, self.vocabulary_hashes = (goto, fail, outputs), np.unique(hashes)
+
+    def match(self, tokens: list[str]) -> list[str]:
+        """Every watchlist term found in *tokens*, in order of first appearance."""
+        goto, fail, outputs = self._tables
+        state = 0
+        found: list[str] = []
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for term in outputs[state]:
+                if term not in found:
+                    found.append(term)
+        return found
+
+
+class Watchlist:
+    """File-backed watchlist that rebuilds its automaton when the file changes."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_WATCHLIST_PATH,
+        mode: str = DEFAULT_MODE,
+        check_interval: float = 5.0,
+    ) -> None:
+        if mode not in ("skip", "prioritize"):
+            raise ValueError(f"Unknown watchlist mode '{mode}' (expected 'skip' or 'prioritize')")
+        self.path = Path(path)
+        self.mode = mode
+        self.check_interval = check_interval
+        self.automaton = TokenAutomaton()
+
+        self.scanned = 0
+        self.flagged = 0
+        self.reloads = 0
+
+        self._signature: tuple[float, int] | None = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload_if_changed(force=True)
+
+    @classmethod
+    def from_path(cls, path: str = DEFAULT_WATCHLIST_PATH, **kwargs) -> "Watchlist | None":
+        """Load the watchlist if the file exists, else return None."""
+        if not os.path.exists(path):
+            return None
+        return cls(path, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def scan(self, texts: list[str]) -> list[list[str]]:
+        """Matched watchlist terms for each text (empty list when clean). Texts must be str."""
+        self.reload_if_changed()
+        automaton = self.automaton
+        results: list[list[str]] = [[] for _ in texts]
+        if not texts or not len(automaton.vocabulary_hashes):
+            return results
+
+        batch = FoldedBatch(texts)
+        # Vectorised prefilter: only texts sharing a word with the watchlist
+        # are tokenised and walked through the automaton.
+        for i in batch.lines_with(automaton.vocabulary_hashes):
+            results[i] = automaton.match(batch.line(i).split())
+        self.scanned += len(texts)
+        self.flagged += sum(1 for terms in results if terms)
+        return results
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Re-read the file if its mtime/size changed; apply only the diff."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            self._last_check = now
+            try:
+                stat = self.path.stat()
+            except OSError:
+                return False
+            signature = (stat.st_mtime, stat.st_size)
+            if not force and signature == self._signature:
+                return False
+
+            terms = set(_read_terms(self.path))
+            current = set(self.automaton._state_of)
+            added = [t for t in terms - current if self.automaton.add(t)]
+            removed = [t for t in current - terms if self.automaton.remove(t)]
+            if added or removed or force:
+                self.automaton.compile()
+            self._signature = signature
+            if not force:
+                self.reloads += 1
+            logger.info(
+                f"🚩 Watchlist {self.path}: {len(self.automaton)} term(s) "
+                f"(+{len(added)} / -{len(removed)})."
+            )
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "terms": len(self.automaton),
+            "scanned": self.scanned,
+            "flagged": self.flagged,
+            "reloads": self.reloads,
+        }
+
+
+def _read_terms(path: Path) -> list[str]:
+    with open(path, "r", encoding="utf-8") as fh:
+        lines = (line.split("#", 1)[0].strip() for line in fh)
+        return [line for line in lines if line]
@@ -1,18 +1,21 @@
 from .channel_fetcher import ChannelFetcher
 from .comment_fetcher import CommentFetcher
-from linkedin_scraper.storage import Storage # Use shared storage
+from linkedin_scraper.storage_writer import get_writer # Use shared storage writer
 from linkedin_scraper.classifier import CommentClassifier # Import classifier
+from linkedin_scraper.pipeline import ScrapePipeline
 import logging
 
 logger = logging.getLogger(__name__)
 
-def scrape_channel(channel_url, days, callback=None):
+def scrape_channel(channel_url, days, callback=None, on_result=None):
     """
     Orchestrates the scraping of a YouTube channel.
     Args:
         channel_url: The URL of the YouTube channel.
         days: How many days back to look for videos.
         callback: Optional function to call with progress updates (str).
+        on_result: Optional function called with each video's PipelineItem
+            once its comments are classified and stored, in video order.
     Returns:
         List of dictionaries containing video info and comments.
     """
@@ -20,8 +23,9 @@ def scrape_channel(channel_url, days, callback=None):
     
     channel_fetcher = ChannelFetcher()
     comment_fetcher = CommentFetcher()
-    storage = Storage()
+    writer = get_writer()
     classifier = CommentClassifier() # Initialize classifier
+    classifier.seed_clusters(writer.storage.iter_comments()) # Reuse labels of known bot-wave clusters
     if not classifier.client:
          if callback: callback("Warning: Classifier not initialized (check API key).")
     
@@ -36,67 +40,63 @@ def scrape_channel(channel_url, days, callback=None):
     if callback: callback(f"Found {len(videos)} videos. Starting comment extraction...")
     
     results = []
-    
-    for i, video in enumerate(videos, 1):
-        video_title = video.get('title', 'Unknown Title')
-        if callback: callback(f"Scraping video {i}/{len(videos)}: {video_title}")
-        
-        # 2. Fetch Comments
-        comments = comment_fetcher.fetch_comments(video.get('video_id'))
-        
-        # Transform comments to standard format immediately
-        transformed_comments = []
-        if callback: callback(f"Classifying {len(comments)} comments...")
-        
-        for c in comments:
-            text = c.get('text', '')
-            label = "unknown"
-            if text and classifier.client:
-                label = classifier.classify(text)
-            elif not text:
-                label = "safe" # Empty comment?
-            
-            transformed_comments.append({
-                "comment_id": c.get('comment_id'), # Keep original ID if needed internally
-                "urn": c.get('comment_id'), # Standard key
-                "comment": text,   # Standard key
-                "author_name": c.get('author'), # Standard key
-                "timestamp": c.get('time'),
-                "votes": c.get('votes'),
-                "photo": c.get('photo'),
-                "label": label 
-            })
-        
-        video_data = {
-            'video_id': video.get('video_id'),
-            'post_url': video.get('video_url'), # Map to post_url for consistency
-            'title': video.get('title'),
-            'upload_date': video.get('upload_date'),
-            'comments': transformed_comments, # Use transformed comments
-            'comment_count': len(transformed_comments),
-            'thumbnails': video.get('thumbnails')
-        }
-        
-        results.append(video_data)
-        
-    # 3. Store incrementally using shared Storage
-        storage = Storage() # Defaults to comments.json
-        
+
+    def to_records(item):
         comments_to_save = []
-        for c in transformed_comments:
+        for c in item.comments:
             comments_to_save.append({
-                "post_url": video.get('video_url'),
+                "post_url": item.post_url,
                 "comment": c.get('comment'),
                 "urn": c.get('urn'),
                 "author_name": c.get('author_name'),
                 "label": c.get('label'),
+                "matched_terms": c.get('matched_terms'),
+                "cluster_id": c.get('cluster_id'),
+                "votes": c.get('votes'),
                 "scraped_at": datetime.now().isoformat()
             })
-            
-        if comments_to_save:
-            storage.add_comments(comments_to_save)
-            storage.save()
-            
+        return comments_to_save
+
+    # Comments are classified and stored in the background while the next video is fetched
+    pipeline = ScrapePipeline(classifier, writer, to_records=to_records, on_result=on_result, on_progress=callback)
+    with pipeline:
+        for i, video in enumerate(videos, 1):
+            video_title = video.get('title', 'Unknown Title')
+            if callback: callback(f"Scraping video {i}/{len(videos)}: {video_title}")
+
+            # 2. Fetch Comments
+            comments = comment_fetcher.fetch_comments(video.get('video_id'))
+
+            # Transform comments to standard format immediately
+            transformed_comments = []
+            for c in comments:
+                transformed_comments.append({
+                    "comment_id": c.get('comment_id'), # Keep original ID if needed internally
+                    "urn": c.get('comment_id'), # Standard key
+                    "comment": c.get('text', ''),   # Standard key
+                    "author_name": c.get('author'), # Standard key
+                    "timestamp": c.get('time'),
+                    "votes": c.get('votes'),
+                    "photo": c.get('photo'),
+                    "label": "unknown"
+                })
+
+            # Labels are filled in place by the pipeline's classifier workers
+            if callback: callback(f"Queued {len(transformed_comments)} comments for classification...")
+            pipeline.submit(video.get('video_url'), transformed_comments)
+
+            video_data = {
+                'video_id': video.get('video_id'),
+                'post_url': video.get('video_url'), # Map to post_url for consistency
+                'title': video.get('title'),
+                'upload_date': video.get('upload_date'),
+                'comments': transformed_comments, # Use transformed comments
+                'comment_count': len(transformed_comments),
+                'thumbnails': video.get('thumbnails')
+            }
+
+            results.append(video_data)
+
     if callback: callback("YouTube scraping completed.")
     return results
 